@@ -0,0 +1,207 @@
+# ai_executor.py
+# Every model call runs on a small, bounded pool so a slow or failing
+# upstream cannot hold every web worker. Settings (environment):
+#
+#   LMS_AI_WORKERS           concurrent model calls              (4)
+#   LMS_AI_QUEUE             calls allowed to wait for a worker  (16)
+#   LMS_AI_TIMEOUT           seconds a caller waits for a result (10)
+#   LMS_AI_BREAKER_FAILURES  consecutive failures that open the breaker (5)
+#   LMS_AI_BREAKER_RESET     seconds before a half-open probe    (30)
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from metrics import REGISTRY
+
+
+class AIUnavailable(RuntimeError):
+    """The call was not made or not finished; serve the fallback."""
+
+
+class CircuitOpenError(AIUnavailable):
+    """The breaker is open after repeated failures."""
+
+
+class QueueFullError(AIUnavailable):
+    """Every worker is busy and the wait queue is full."""
+
+
+class AITimeoutError(AIUnavailable, TimeoutError):
+    """The call did not finish within its deadline."""
+
+
+# -------------------------------
+# Circuit breaker
+# -------------------------------
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open after `reset_timeout` seconds, letting a single probe through;
+    the probe's outcome closes or re-opens the breaker.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_out = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go ahead now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_out = False
+            if self.state == self.HALF_OPEN and not self._probe_out:
+                self._probe_out = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_out = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+                self._probe_out = False
+
+
+class _Task:
+    __slots__ = ("settled",)
+
+    def __init__(self):
+        self.settled = False
+
+
+# -------------------------------
+# Bounded executor
+# -------------------------------
+class AIExecutor:
+    """
+    Runs model calls on `max_workers` threads with at most `max_queue`
+    more waiting. Calls are refused at once (QueueFullError,
+    CircuitOpenError) rather than queued without bound, and a caller waits
+    at most `timeout` seconds. A timed-out call keeps its worker until the
+    upstream returns, which is what keeps the total number of hung calls
+    bounded.
+    """
+
+    def __init__(self, max_workers=4, max_queue=16, timeout=10.0, breaker=None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.counts = {"successes": 0, "failures": 0, "timeouts": 0,
+                       "rejected": 0, "short_circuited": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _settle(self, task, ok):
+        """Record a call's outcome once (a timeout settles it early)."""
+        with self._lock:
+            if task.settled:
+                return
+            task.settled = True
+        if ok:
+            self._count("successes")
+            self.breaker.record_success()
+        else:
+            self._count("failures")
+            self.breaker.record_failure()
+
+    def submit(self, fn, task=None):
+        """Schedule fn() and return its Future, or raise AIUnavailable."""
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError("AI circuit breaker is open")
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            if self.breaker.state == CircuitBreaker.HALF_OPEN:
+                # allow() handed this call the probe; count it as failed.
+                self.breaker.record_failure()
+            raise QueueFullError("AI call queue is full")
+        task = task or _Task()
+        with self._lock:
+            self.queued += 1
+
+        def run():
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                result = fn()
+            except BaseException:
+                self._settle(task, False)
+                raise
+            else:
+                self._settle(task, True)
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                self._slots.release()
+
+        return self._pool.submit(run)
+
+    def call(self, fn, timeout=None):
+        """Run fn() on the pool and return its result within the deadline."""
+        task = _Task()
+        future = self.submit(fn, task)
+        try:
+            return future.result(timeout=self.timeout if timeout is None else timeout)
+        except FutureTimeout:
+            self._count("timeouts")
+            self._settle(task, False)
+            raise AITimeoutError("AI call timed out") from None
+
+    def stats(self):
+        """Queue depth, concurrency, breaker state and outcome counters."""
+        with self._lock:
+            stats = dict(self.counts, queued=self.queued, running=self.running)
+        stats.update(
+            max_workers=self.max_workers,
+            max_queue=self.max_queue,
+            breaker_state=self.breaker.state,
+            consecutive_failures=self.breaker.failures,
+        )
+        return stats
+
+
+ai_executor = AIExecutor(
+    max_workers=int(os.environ.get("LMS_AI_WORKERS", "4")),
+    max_queue=int(os.environ.get("LMS_AI_QUEUE", "16")),
+    timeout=float(os.environ.get("LMS_AI_TIMEOUT", "10")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get("LMS_AI_BREAKER_FAILURES", "5")),
+        reset_timeout=float(os.environ.get("LMS_AI_BREAKER_RESET", "30")),
+    ),
+)
+
+_BREAKER_STATES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+REGISTRY.gauge("lms_ai_executor_calls", "AI calls waiting for or holding a worker.",
+               lambda: {("queued",): ai_executor.queued, ("running",): ai_executor.running},
+               ("state",))
+REGISTRY.gauge("lms_ai_breaker_state", "AI circuit breaker: 0 closed, 1 half-open, 2 open.",
+               lambda: _BREAKER_STATES[ai_executor.breaker.state])
@@ -0,0 +1,75 @@
+# ai_providers.py
+# AI clients are built on first use, so importing the app (and serving pages
+# that never call the AI) does not pay for the vendor SDK imports.
+import os
+import threading
+
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Which registered provider answers chat questions ("gemini", "fake", ...).
+CHAT_PROVIDER = os.environ.get("LMS_AI_PROVIDER", "gemini")
+
+_factories = {}
+_instances = {}
+_lock = threading.Lock()
+
+
+# -------------------------------
+# Registry
+# -------------------------------
+def register_provider(name, factory):
+    """Register a zero-argument factory that builds the client for `name`."""
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+
+def set_provider(name, instance):
+    """Use an already-built client for `name` (e.g. a fake in tests)."""
+    with _lock:
+        _instances[name] = instance
+
+def reset_provider(name=None):
+    """Forget built clients so the next use calls the factory again."""
+    with _lock:
+        if name is None:
+            _instances.clear()
+        else:
+            _instances.pop(name, None)
+
+def get_provider(name):
+    """Return the client for `name`, building it on first use."""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+    with _lock:
+        instance = _instances.get(name)
+        if instance is None:
+            if name not in _factories:
+                raise KeyError(f"Unknown AI provider: {name}")
+            instance = _instances[name] = _factories[name]()
+        return instance
+
+def chat_model():
+    """The model used by get_ai_response and the chat stream."""
+    return get_provider(CHAT_PROVIDER)
+
+
+# -------------------------------
+# Built-in providers
+# -------------------------------
+def _gemini():
+    import google.generativeai as genai
+    genai.configure(api_key=os.environ.get("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE"))
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+def _openai():
+    from openai import OpenAI
+    return OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "YOUR_OPENAI_API_KEY"))
+
+def _fake():
+    from ai_stream import ScheduledFakeModel
+    return ScheduledFakeModel(["This is ", "a stubbed ", "AI answer."], delay=0)
+
+register_provider("gemini", _gemini)
+register_provider("openai", _openai)
+register_provider("fake", _fake)
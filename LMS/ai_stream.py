@@ -0,0 +1,149 @@
+# ai_stream.py
+import json
+import queue
+import threading
+import time
+
+
+def sse_frame(data, event=None):
+    """Encode one Server-Sent Events frame with a JSON payload."""
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data)}\n\n"
+
+
+# -------------------------------
+# SSE streaming with back-pressure
+# -------------------------------
+def _start_thread(fn):
+    def run():
+        try:
+            fn()
+        except Exception:
+            pass    # already reported to the reader through the queue
+    threading.Thread(target=run, daemon=True).start()
+
+
+def stream_answer(generate_stream, prompt, fallback, on_complete=None,
+                  max_pending=8, heartbeat=15.0, submit=None, deadline=None):
+    """
+    Yield SSE frames for the text chunks of `generate_stream(prompt)`.
+
+    The model is read on a worker thread into a queue of at most
+    `max_pending` chunks, so a slow client stalls the upstream read instead
+    of buffering the whole answer. Closing this generator (Flask does so
+    when the client disconnects) cancels the worker. If the model fails
+    before sending anything, `fallback` is streamed instead; a complete
+    answer is passed to `on_complete`.
+
+    `submit(fn)` runs the reader (e.g. AIExecutor.submit, which may refuse
+    and raise; then the fallback is sent at once). If no text arrives within
+    `deadline` seconds the fallback is sent and the reader is cancelled; it
+    then raises TimeoutError so the executor counts the failure.
+    """
+    chunks = queue.Queue(maxsize=max_pending)
+    cancel = threading.Event()
+    timed_out = threading.Event()
+
+    def put(item):
+        while not cancel.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        stream = None
+        try:
+            stream = iter(generate_stream(prompt))
+            for text in stream:
+                if text and not put(("chunk", text)):
+                    break
+            else:
+                put(("done", None))
+        except Exception as e:
+            put(("error", e))
+            raise
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        if timed_out.is_set():
+            raise TimeoutError("no answer before the deadline")
+
+    try:
+        (submit or _start_thread)(produce)
+    except Exception as e:
+        print("⚠️ Gemini AI unavailable:", e)
+        yield sse_frame({"text": fallback})
+        yield sse_frame({}, event="done")
+        return
+
+    sent = []
+    give_up_at = time.monotonic() + deadline if deadline else None
+    try:
+        while True:
+            wait = heartbeat
+            if give_up_at is not None and not sent:
+                wait = min(wait, max(0.0, give_up_at - time.monotonic()))
+            try:
+                kind, payload = chunks.get(timeout=wait)
+            except queue.Empty:
+                if give_up_at is not None and not sent and time.monotonic() >= give_up_at:
+                    timed_out.set()
+                    print("⚠️ Gemini AI Error: no answer within", deadline, "seconds")
+                    yield sse_frame({"text": fallback})
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if kind == "chunk":
+                sent.append(payload)
+                yield sse_frame({"text": payload})
+            elif kind == "error":
+                print("⚠️ Gemini AI Error:", payload)
+                if not sent:
+                    yield sse_frame({"text": fallback})
+                break
+            else:
+                if sent and on_complete is not None:
+                    on_complete("".join(sent).strip())
+                break
+        yield sse_frame({}, event="done")
+    finally:
+        cancel.set()
+
+
+# -------------------------------
+# Local fake model (offline testing)
+# -------------------------------
+class _Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class ScheduledFakeModel:
+    """
+    Stand-in for genai.GenerativeModel that yields `chunks` one by one,
+    sleeping `delay` seconds before each (or delays[i] if a list is given).
+    """
+
+    def __init__(self, chunks, delay=0.05, fail_after=None):
+        self.chunks = list(chunks)
+        self.delay = delay
+        self.fail_after = fail_after
+
+    def _delay(self, i):
+        return self.delay[i] if isinstance(self.delay, (list, tuple)) else self.delay
+
+    def _generate(self):
+        for i, text in enumerate(self.chunks):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise RuntimeError("fake model failure")
+            time.sleep(self._delay(i))
+            yield _Chunk(text)
+
+    def generate_content(self, prompt, stream=False):
+        if stream:
+            return self._generate()
+        return _Chunk("".join(c.text for c in self._generate()))
@@ -1,247 +1,207 @@
 # ai_utils.py
+import os
+import threading
+
+from catalog import catalog
+from curriculum import CurriculumGraph, plan_weeks
+from event_journal import make_journal
+from learner_stats import LearnerStats
+from metrics import REGISTRY, timed
+from progress_io import NDJSONError, import_ndjson
+from progress_store import make_progress_store
+from quiz_grading import make_grading_queue
 
 # -------------------------------
-# Learning dependency graph
+# Learning dependency graph and module contents
+# Both are read from the catalog files (see catalog.py) and follow its
+# hot reloads; module bodies are loaded only when accessed.
 # -------------------------------
-graph = {
-    "Variables": ["Loops", "Data Types"],
-    "Data Types": ["Loops"],
-    "Loops": ["Functions"],
-    "Functions": ["Modules"],
-    "Modules": [],
-    "Classes": ["Inheritance"],
-    "Inheritance": ["Polymorphism"],
-    "Polymorphism": ["OOP Projects"],
-    "OOP Projects": []
-}
+graph = catalog.graph
+module_content = catalog.module_content
 
-# -------------------------------
-# Module contents with detailed study material
-# -------------------------------
-module_content = {
-    "Variables": {
-        "content": """
-Variables are used to store data in memory. In Python, you can assign a value using '='.
-Example:
-x = 10
-y = 'Hello'
-
-Types:
-- int
-- float
-- str
-- bool
-
-Tips:
-- Use meaningful variable names
-- Python is dynamically typed
-""",
-        "hours": 2
-    },
-    "Data Types": {
-        "content": """
-Python Data Types:
-
-1. Numbers: int, float, complex
-2. Strings: str
-3. Boolean: bool
-4. Lists: mutable sequences
-5. Tuples: immutable sequences
-6. Dictionaries: key-value mapping
-7. Sets: unique collection
-
-Operations:
-- Arithmetic operators: +, -, *, /
-- Comparison operators: ==, !=, <, >
-- Logical operators: and, or, not
-
-Best Practices:
-- Choose the correct type for efficiency
-- Use lists for ordered collections
-""",
-        "hours": 2
-    },
-    "Loops": {
-        "content": """
-Loops allow you to repeat a block of code.
-
-Types:
-1. for loop
-   Example:
-   for i in range(5):
-       print(i)
-
-2. while loop
-   Example:
-   x = 0
-   while x < 5:
-       print(x)
-       x += 1
-
-Nested Loops:
-- Loop inside another loop
-- Useful for grids, matrices
-
-Tips:
-- Avoid infinite loops
-- Use break and continue wisely
-""",
-        "hours": 2
-    },
-    "Functions": {
-        "content": """
-Functions help you organize code into reusable blocks.
-
-Syntax:
-def function_name(parameters):
-    '''Docstring'''
-    # code
-    return result
-
-Key Points:
-- Functions can return values
-- Parameters can be positional or keyword
-- Use default arguments for flexibility
-- Modular code improves readability
-""",
-        "hours": 3
-    },
-    "Modules": {
-        "content": """
-Modules are files containing Python code. They allow code reuse and organization.
-
-Usage:
-- import module_name
-- from module_name import function_name
-
-Popular built-in modules:
-- math
-- random
-- datetime
-- os
-- sys
-
-Tips:
-- Use virtual environments for project-specific modules
-- Create your own modules for larger projects
-""",
-        "hours": 2
-    },
-    "Classes": {
-        "content": """
-Classes are blueprints for creating objects.
-
-Syntax:
-class ClassName:
-    def __init__(self, attribute1, attribute2):
-        self.attribute1 = attribute1
-        self.attribute2 = attribute2
-
-Object creation:
-obj = ClassName(value1, value2)
-
-Key Points:
-- Encapsulation: hide internal data
-- Methods operate on objects
-""",
-        "hours": 2
-    },
-    "Inheritance": {
-        "content": """
-Inheritance allows one class to inherit attributes and methods from another class.
-
-Syntax:
-class Parent:
-    ...
-
-class Child(Parent):
-    ...
-
-Key Points:
-- Single inheritance
-- Multiple inheritance
-- Use super() to call parent methods
-
-Benefits:
-- Code reusability
-- Organized class hierarchy
-""",
-        "hours": 2
-    },
-    "Polymorphism": {
-        "content": """
-Polymorphism allows methods to behave differently based on the object.
-
-Types:
-1. Method Overriding
-2. Operator Overloading
-3. Duck Typing in Python
-
-Example:
-class Animal:
-    def sound(self):
-        print('Generic sound')
-
-class Dog(Animal):
-    def sound(self):
-        print('Bark')
-
-Tips:
-- Makes code flexible
-- Important in OOP design
-""",
-        "hours": 2
-    },
-    "OOP Projects": {
-        "content": """
-Project Ideas:
-1. Bank Management System
-2. Library Management System
-3. Student Record System
-4. Simple Game using OOP concepts
-
-Tips:
-- Apply Classes, Inheritance, and Polymorphism
-- Modularize your code using functions and modules
-- Document your code properly
-""",
-        "hours": 3
-    }
-}
+# Prerequisites and in-degrees are indexed once; per-user frontiers live here.
+curriculum = CurriculumGraph(catalog.snapshot().graph)
 
 # -------------------------------
-# Track user progress (username -> {course: {module: True/False}})
+# Track user progress (username -> {course: {module: completion time}})
+# LMS_PROGRESS_BACKEND=sqlite keeps it on disk and shares it across workers;
+# LMS_PROGRESS_BACKEND=compact keeps interned-ID bitsets instead of dicts.
 # -------------------------------
 user_progress = {}
+progress_store = make_progress_store(user_progress, modules=curriculum.order)
+_bitset_ids_match = True
+
+# Per-course completion, hours and mean score. progress_store keeps the
+# quiz scores and the running per-course totals, updated on every write.
+learner_stats = LearnerStats(catalog, lambda: progress_store)
+learner_stats.attach()
+
+# Append-only log of views, completions, quiz submissions and chat questions
+# (LMS_JOURNAL_DIR, see event_journal.py); None when disabled.
+journal = make_journal()
+if journal is not None:
+    REGISTRY.gauge("lms_journal_events", "Learning events by journal state.",
+                   lambda: {(k,): v for k, v in journal.stats().items()
+                            if k in ("appended", "written", "dropped", "failed", "pending")},
+                   ("state",))
+
+# Quiz submissions waiting for background grading (see quiz_grading.py),
+# opened by the first quiz request in each process; grades land in
+# record_quiz_score, so they are kept by progress_store.
+_grading_queue = None
+_grading_lock = threading.Lock()
+
+# Cohort analytics engine (NumPy), created by the first analytics request.
+_cohort_analytics = None
+
+def _on_catalog_reload(snapshot):
+    """Re-index the new graph; frontiers are re-seeded from the store."""
+    global curriculum, _bitset_ids_match
+    curriculum = CurriculumGraph(snapshot.graph)
+    names = getattr(progress_store, "module_names", None)
+    _bitset_ids_match = names is None or names[:len(curriculum.order)] == curriculum.order
+    learner_stats.attach()
+
+catalog.on_reload(_on_catalog_reload)
+
+# Counting walks the whole store, so scrapes reuse the value for 30 seconds.
+REGISTRY.gauge("lms_progress_store_size", "Users and completions in the progress store.",
+               lambda: dict(zip([("users",), ("completions",)], progress_store.size())),
+               ("kind",), ttl=30)
 
 # -------------------------------
 # Functions
 # -------------------------------
+def record_event(kind, username, **fields):
+    """Append a learning event to the journal; never blocks on I/O."""
+    if journal is not None:
+        journal.append(kind, user=username, **fields)
+
+@timed("mark_module_complete")
 def mark_module_complete(username, module, course=None):
     """Mark a module as completed by a specific user."""
-    if username not in user_progress:
-        user_progress[username] = {}
-    if course not in user_progress[username]:
-        user_progress[username][course] = {}
-    user_progress[username][course][module] = True
+    if progress_store.mark_complete(username, module, course):
+        record_event("complete", username, module=module, course=course)
+    curriculum.record_completion(username, module, course)
+    if _cohort_analytics is not None:
+        _cohort_analytics.record(username, module)
+
+def mark_modules_complete(rows):
+    """Mark a batch of (username, module, course) rows completed."""
+    progress_store.mark_many(rows)
+    for username, module, course in rows:
+        curriculum.record_completion(username, module, course)
+        if _cohort_analytics is not None:
+            _cohort_analytics.record(username, module)
+
+def import_progress(lines, batch_size=10000, origin="api"):
+    """
+    Import NDJSON progress rows (see progress_io.py) and journal one
+    "import" event for the whole run rather than one per row.
+    """
+    try:
+        stats = import_ndjson(lines, mark_modules_complete, batch_size)
+    except NDJSONError as e:
+        record_event("import", None, origin=origin, rows=e.imported, error=str(e))
+        raise
+    record_event("import", None, origin=origin, rows=stats["rows"], batches=stats["batches"])
+    return stats
+
+def record_quiz_score(username, module, score):
+    """Store the user's latest quiz score (0-100) for a module."""
+    progress_store.set_score(username, module, score)
+    record_event("quiz", username, module=module, score=score)
+
+def get_module_scores(username, course):
+    """{module: latest quiz score or None} for every module of the course."""
+    return learner_stats.scores(username, course)
+
+def get_course_summary(username, course):
+    """Completion, hours and mean score for a course (see LearnerStats)."""
+    return learner_stats.course_summary(username, course)
+
+def iter_progress():
+    """Yield every stored (username, module, course) completion."""
+    return progress_store.rows()
 
 def get_completed_modules(username, course=None):
     """Return a list of completed modules for a user."""
-    if username not in user_progress:
-        return []
-    if course:
-        return [m for m, done in user_progress[username].get(course, {}).items() if done]
-    else:
-        all_modules = []
-        for cdata in user_progress[username].values():
-            all_modules.extend([m for m, done in cdata.items() if done])
-        return all_modules
+    return progress_store.completed(username, course)
+
+def _completed_mask(username, course=None):
+    """The user's completions as a bitset over curriculum.order."""
+    completed_mask = getattr(progress_store, "completed_mask", None)
+    if completed_mask is not None and _bitset_ids_match:
+        return completed_mask(username, course)
+    return curriculum.mask(get_completed_modules(username, course))
+
+def is_module_unlocked(username, module, course=None):
+    """True if the user has completed every prerequisite of `module`."""
+    return curriculum.is_unlocked(module, _completed_mask(username, course))
+
+def is_prerequisite(module, goal):
+    """True if `goal` depends on `module`, directly or not."""
+    return curriculum.is_prerequisite(module, goal)
+
+@timed("get_study_plan")
+def get_study_plan(username, goal, weekly_hours=5):
+    """
+    What the user still has to finish to reach `goal` (every unfinished
+    module it depends on, and itself) in study order, packed into weeks of
+    `weekly_hours`. None for an unknown module.
+    """
+    current = curriculum
+    if goal not in current.index:
+        return None
+    snapshot = catalog.snapshot()
+    modules = current.remaining_prerequisites(goal, _completed_mask(username))
+    hours = lambda m: snapshot.modules.get(m, {}).get("hours", 0)
+    return {
+        "goal": goal,
+        "weekly_hours": weekly_hours,
+        "modules": modules,
+        "total_hours": sum(hours(m) for m in modules),
+        "weeks": plan_weeks(modules, hours, weekly_hours),
+    }
 
+@timed("get_recommendations")
 def get_recommendations(username, course=None):
     """Suggest the next module based on prerequisites and user progress."""
-    completed = set(get_completed_modules(username, course))
-    for module, next_modules in graph.items():
-        prerequisites = [m for m, deps in graph.items() if module in deps]
-        if all(p in completed for p in prerequisites) and module not in completed:
-            return module
-    return None
+    return curriculum.next_module(
+        username, course, lambda: get_completed_modules(username, course),
+        refresh=progress_store.shared
+    )
+
+def build_knowledge_tree():
+    """Nested {module: {next_module: {...}}} starting from the root modules."""
+    return curriculum.knowledge_tree()
+
+def get_knowledge_tree_json():
+    """Return (json_text, version) of the cached knowledge tree."""
+    return curriculum.knowledge_tree_json(), curriculum.version
+
+def cohort_analytics():
+    """The process-wide CohortAnalytics, built (and NumPy imported) on first use."""
+    global _cohort_analytics
+    if _cohort_analytics is None:
+        from analytics import CohortAnalytics
+        _cohort_analytics = CohortAnalytics(
+            lambda: progress_store, lambda: curriculum, catalog.courses,
+            max_age=float(os.environ.get("LMS_ANALYTICS_MAX_AGE", "5")),
+        )
+    return _cohort_analytics
+
+def grading_queue():
+    """The process-wide GradingQueue, opened and its workers started on first use."""
+    global _grading_queue
+    with _grading_lock:
+        if _grading_queue is None:
+            _grading_queue = make_grading_queue(
+                on_graded=lambda username, module, score: record_quiz_score(username, module, score)
+            )
+            _grading_queue.start()
+    return _grading_queue
+
+def get_course_analytics(course):
+    """Completion rates, stuck-at counts and edge conversion for a course, or None."""
+    return cohort_analytics().report(course)
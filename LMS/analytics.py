@@ -0,0 +1,241 @@
+# analytics.py
+# Cohort analytics over every learner at once, computed with NumPy on a
+# users x modules completion matrix. Imported on first use (see
+# ai_utils.cohort_analytics) so the web app starts without NumPy.
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+# -------------------------------
+# users x modules completion matrix
+# -------------------------------
+class CompletionMatrix:
+    """
+    Boolean matrix, one row per user and one column per module (in
+    `modules` order). Rows are over-allocated so new users are cheap.
+    """
+
+    def __init__(self, modules, capacity=1024):
+        self.modules = list(modules)
+        self.index = {m: i for i, m in enumerate(self.modules)}
+        self.users = {}
+        self.bits = np.zeros((capacity, len(self.modules)), dtype=bool)
+
+    def __len__(self):
+        return len(self.users)
+
+    def _row(self, username):
+        row = self.users.get(username)
+        if row is None:
+            row = self.users[username] = len(self.users)
+            if row >= self.bits.shape[0]:
+                grown = np.zeros((max(1024, 2 * self.bits.shape[0]), self.bits.shape[1]), dtype=bool)
+                grown[:self.bits.shape[0]] = self.bits
+                self.bits = grown
+        return row
+
+    def add(self, username, module):
+        col = self.index.get(module)
+        if col is not None:
+            self.bits[self._row(username), col] = True
+
+    def view(self):
+        return self.bits[:len(self.users)]
+
+    @classmethod
+    def from_rows(cls, modules, rows):
+        """Build from (username, module, course) rows (any progress store)."""
+        matrix = cls(modules)
+        index, users = matrix.index, matrix.users
+        user_rows, cols = [], []
+        for username, module, _ in rows:
+            col = index.get(module)
+            if col is None:
+                continue
+            row = users.get(username)
+            if row is None:
+                row = users[username] = len(users)
+            user_rows.append(row)
+            cols.append(col)
+        matrix.bits = np.zeros((max(1024, len(users)), len(modules)), dtype=bool)
+        matrix.bits[np.asarray(user_rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)] = True
+        return matrix
+
+    @classmethod
+    def from_bitsets(cls, modules, usernames, masks):
+        """
+        Build from one int bitset per user (bit i = modules[i]), as kept by
+        CompactProgressStore; the ints are unpacked in one NumPy call.
+        """
+        matrix = cls(modules)
+        width = max(1, (len(modules) + 7) // 8)
+        packed = np.frombuffer(b"".join(m.to_bytes(width, "little") for m in masks), dtype=np.uint8)
+        unpacked = np.unpackbits(packed.reshape(len(masks), width), axis=1, bitorder="little")
+        matrix.bits = np.zeros((max(1024, len(masks)), len(modules)), dtype=bool)
+        matrix.bits[:len(masks)] = unpacked[:, :len(modules)].astype(bool)
+        matrix.users = {u: i for i, u in enumerate(usernames)}
+        return matrix
+
+
+def matrix_from_store(store, modules):
+    """Completion matrix for every user in `store`, using its bitsets if it has them."""
+    names = getattr(store, "module_names", None)
+    if names is not None and names[:len(modules)] == list(modules):
+        usernames, masks = store.user_masks()
+        full = (1 << len(modules)) - 1
+        return CompletionMatrix.from_bitsets(modules, usernames, [m & full for m in masks])
+    return CompletionMatrix.from_rows(modules, store.rows())
+
+
+# -------------------------------
+# Per-course report
+# -------------------------------
+def course_report(matrix, curriculum, course, course_modules):
+    """
+    Vectorized statistics for the learners who completed at least one of
+    `course_modules`:
+
+    - completion rate per module
+    - where learners are stuck: the module get_recommendations would
+      suggest next (first unlocked, not completed, in graph order)
+    - conversion along each prerequisite edge inside the course
+    """
+    cols = np.array([matrix.index[m] for m in course_modules if m in matrix.index], dtype=np.int64)
+    names = [matrix.modules[c] for c in cols]
+    bits = matrix.view()
+    course_bits = bits[:, cols]
+    cohort = course_bits.any(axis=1)
+    done = course_bits[cohort]
+    users = int(done.shape[0])
+
+    # unlocked[u, j]: every prerequisite of module j is completed.
+    cohort_bits = bits[cohort]
+    unlocked = np.ones_like(done)
+    for j, module in enumerate(names):
+        prereqs = [matrix.index[p] for p in curriculum.prerequisites.get(module, ()) if p in matrix.index]
+        if prereqs:
+            unlocked[:, j] = cohort_bits[:, prereqs].all(axis=1)
+    frontier = unlocked & ~done
+    has_frontier = frontier.any(axis=1)
+    finished = done.all(axis=1)
+    # Columns are in course order; matrix columns (cols) are graph indices,
+    # so the argmax runs over the course's columns sorted into graph order.
+    by_graph = np.argsort(cols, kind="stable")
+    first = by_graph[frontier[has_frontier][:, by_graph].argmax(axis=1)]
+    stuck = np.bincount(first, minlength=len(names))
+
+    completed = done.sum(axis=0)
+    counts = done.astype(np.int32)
+    together = counts.T @ counts          # together[a, b]: completed both a and b
+    conversion = []
+    position = {m: j for j, m in enumerate(names)}
+    for a, module in enumerate(names):
+        for nxt in curriculum.successors.get(module, ()):
+            b = position.get(nxt)
+            if b is None:
+                continue
+            base = int(completed[a])
+            conversion.append({
+                "from": module,
+                "to": nxt,
+                "completed_from": base,
+                "converted": int(together[a, b]),
+                "rate": round(int(together[a, b]) / base, 4) if base else None,
+            })
+
+    modules = [{
+        "module": module,
+        "completed": int(completed[j]),
+        "completion_rate": round(int(completed[j]) / users, 4) if users else None,
+        "stuck": int(stuck[j]),
+    } for j, module in enumerate(names)]
+    bottleneck = max(modules, key=lambda m: m["stuck"])["module"] if users and stuck.any() else None
+    return {
+        "course": course,
+        "users": users,
+        "finished": int(finished.sum()),
+        "blocked": int((~finished & ~has_frontier).sum()),
+        "bottleneck": bottleneck,
+        "modules": modules,
+        "conversion": conversion,
+    }
+
+
+# -------------------------------
+# Cached, incrementally updated engine
+# -------------------------------
+class CohortAnalytics:
+    """
+    Keeps the completion matrix between requests. New completions are
+    queued by record() and applied on the next report; reports are cached
+    per course until something changes, and recomputed at most every
+    `max_age` seconds. A catalog change (new module order) or a store shared
+    with other processes triggers a full rebuild instead, and so do more
+    than `max_pending` queued completions (a bulk import, or nobody asking
+    for reports), which are dropped rather than kept.
+    """
+
+    def __init__(self, get_store, get_curriculum, courses, max_age=5.0, clock=time.monotonic,
+                 max_pending=100000):
+        self.get_store = get_store
+        self.get_curriculum = get_curriculum
+        self.courses = courses
+        self.max_age = max_age
+        self.clock = clock
+        self.max_pending = max_pending
+        self._matrix = None
+        self._curriculum = None
+        self._built_at = 0.0
+        self._pending = deque()
+        self._changes = 0
+        self._reports = {}      # course -> (changes, computed_at, report)
+        self._lock = threading.Lock()
+
+    def record(self, username, module):
+        """Queue one completion; cheap enough for the request path."""
+        if len(self._pending) >= self.max_pending:
+            with self._lock:
+                # The store has them all; the next report rebuilds from it.
+                self._pending.clear()
+                self._matrix = None
+            return
+        self._pending.append((username, module))
+
+    def _refresh(self, now):
+        curriculum = self.get_curriculum()
+        store = self.get_store()
+        stale_shared = getattr(store, "shared", False) and now - self._built_at >= self.max_age
+        if self._matrix is None or curriculum is not self._curriculum or stale_shared:
+            self._pending.clear()
+            self._matrix = matrix_from_store(store, curriculum.order)
+            self._curriculum = curriculum
+            self._built_at = now
+            self._changes += 1
+        elif self._pending:
+            pending = self._pending
+            while pending:
+                self._matrix.add(*pending.popleft())
+            self._changes += 1
+
+    def report(self, course):
+        """Report for `course` (see course_report), or None for an unknown course."""
+        if course not in self.courses:
+            return None
+        with self._lock:
+            now = self.clock()
+            cached = self._reports.get(course)
+            if cached is not None and now - cached[1] < self.max_age:
+                return cached[2]
+            self._refresh(now)
+            if cached is not None and cached[0] == self._changes:
+                self._reports[course] = (cached[0], now, cached[2])
+                return cached[2]
+            start = time.perf_counter()
+            report = course_report(self._matrix, self._curriculum, course, list(self.courses[course]))
+            report["version"] = f"{self._curriculum.version[:12]}-{self._changes}"
+            report["compute_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            self._reports[course] = (self._changes, now, report)
+            return report
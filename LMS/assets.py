@@ -0,0 +1,176 @@
+# assets.py
+# Static CSS/JS for the templates. Sources live in static/css, static/js
+# and static/vendor; the build copies each one to static/dist under a
+# content-hashed name, with .gz (and .br when the brotli package is
+# installed) copies compressed once, and writes static/dist/manifest.json.
+#
+#   python assets.py            # build (the app also builds on start if needed)
+#   python assets.py vendor     # download the pinned third-party files (VENDOR)
+#
+# Templates link files with {{ asset_url("css/courses.css") }}. They are
+# served from /assets/ with a one-year immutable Cache-Control, since a
+# changed file gets a new name.
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+SOURCE_DIRS = ("css", "js", "vendor")
+DIST = "dist"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Third-party files kept in static/vendor: name -> URL of the pinned
+# version. Until `python assets.py vendor` has fetched one (and it has
+# been committed), asset_url() links the URL itself and the app says so
+# when it starts.
+VENDOR = {
+    "vendor/chart.umd.js": "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js",
+}
+
+
+def _write(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def hashed_name(name, data):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def sources(static_dir=STATIC_DIR):
+    """Logical names ("css/courses.css") of every source file."""
+    names = []
+    for folder in SOURCE_DIRS:
+        directory = os.path.join(static_dir, folder)
+        if os.path.isdir(directory):
+            names += sorted(f"{folder}/{f}" for f in os.listdir(directory)
+                            if not f.startswith("."))
+    return names
+
+
+def build(static_dir=STATIC_DIR):
+    """
+    Publish every source file to static/dist; files already there (same
+    content, same name) are left alone. Returns the manifest
+    {logical name: hashed name}.
+    """
+    dist = os.path.join(static_dir, DIST)
+    manifest = {}
+    for name in sources(static_dir):
+        with open(os.path.join(static_dir, name), "rb") as f:
+            data = f.read()
+        hashed = hashed_name(name, data)
+        path = os.path.join(dist, hashed)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not os.path.exists(path):
+            _write(f"{path}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write(f"{path}.br", brotli.compress(data, quality=11))
+            _write(path, data)     # last, so its presence means the set is complete
+        manifest[name] = hashed
+    _write(os.path.join(dist, "manifest.json"), json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def load_manifest(static_dir=STATIC_DIR):
+    """The build's manifest, rebuilt first if a source changed since."""
+    try:
+        with open(os.path.join(static_dir, DIST, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if manifest is None or sorted(manifest) != sources(static_dir) or any(
+        not os.path.exists(os.path.join(static_dir, DIST, hashed)) for hashed in manifest.values()
+    ):
+        return build(static_dir)
+    for name, hashed in manifest.items():
+        source = os.path.join(static_dir, name)
+        if os.path.getmtime(source) > os.path.getmtime(os.path.join(static_dir, DIST, hashed)):
+            return build(static_dir)
+    return manifest
+
+
+def vendor(static_dir=STATIC_DIR):
+    """Download every VENDOR file that is not in static/vendor yet."""
+    import urllib.request
+
+    for name, url in VENDOR.items():
+        path = os.path.join(static_dir, name)
+        if os.path.exists(path):
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        _write(path, data)
+        print(f"{name}: {len(data)} bytes from {url} (sha256 {hashlib.sha256(data).hexdigest()})")
+
+
+# -------------------------------
+# Flask hook
+# -------------------------------
+def install_assets(app, static_dir=STATIC_DIR):
+    """Serve the built assets at /assets/ and add asset_url() to templates."""
+    from flask import abort, request, send_file, url_for
+
+    manifest = load_manifest(static_dir)
+    for name in VENDOR:
+        if name not in manifest:
+            print(f"⚠️ static/{name} is missing, linking {VENDOR[name]}; "
+                  f"run `python assets.py vendor` to serve it locally.", file=sys.stderr)
+    dist = os.path.join(static_dir, DIST)
+    published = set(manifest.values())
+    encodings = [("br", ".br"), ("gzip", ".gz")]
+
+    def asset_url(name):
+        hashed = manifest.get(name)
+        if hashed is None:
+            if name in VENDOR:
+                return VENDOR[name]
+            raise KeyError(f"Unknown asset {name!r}; is it in static/{'|'.join(SOURCE_DIRS)}?")
+        return url_for("asset", filename=hashed)
+
+    @app.route("/assets/<path:filename>")
+    def asset(filename):
+        if filename not in published:
+            abort(404)
+        path = os.path.join(dist, filename)
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encoding = None
+        for name, suffix in encodings:
+            if name in request.accept_encodings and os.path.exists(path + suffix):
+                path, encoding = path + suffix, name
+                break
+        response = send_file(path, mimetype=mimetype, conditional=True, etag=True)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    app.jinja_env.globals["asset_url"] = asset_url
+    return manifest
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "vendor":
+        vendor()
+    elif argv:
+        sys.exit(f"usage: python {os.path.basename(__file__)} [vendor]")
+    for name, hashed in build().items():
+        print(f"{name} -> {DIST}/{hashed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# benchmarks
+# Load and micro-benchmarks for the LMS. Run from the LMS directory, e.g.
+#
+#   python -m benchmarks.flow --users 50
+#   python -m benchmarks.micro --sizes 10 1000 100000
+#   python -m benchmarks.compare old.json new.json
+#
+# Every benchmark, bench_*.py included, is run this way (as a module of
+# this package); running the files directly breaks their imports.
@@ -0,0 +1,82 @@
+# bench_analytics.py
+# Cohort analytics on synthetic learners.
+#
+#   python -m benchmarks.bench_analytics --users 1000000 --backends compact memory
+#
+# Every synthetic learner follows the course's graph order and stops at a
+# random depth, so "stuck at" counts spread over the whole course.
+import argparse
+import random
+import time
+
+from benchmarks.common import write_results
+
+from analytics import CohortAnalytics, course_report, matrix_from_store
+from catalog import catalog
+from curriculum import CurriculumGraph
+from progress_store import CompactProgressStore, MemoryProgressStore
+
+COURSE = "Python Basics"
+
+
+def fill(store, users, modules, seed=0):
+    rng = random.Random(seed)
+    for i in range(users):
+        username = f"learner{i:07d}"
+        for module in modules[:rng.randint(1, len(modules))]:
+            store.mark_complete(username, module, COURSE)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--backends", nargs="+", default=["compact", "memory"])
+    parser.add_argument("--updates", type=int, default=10000,
+                        help="completions applied before the incremental report")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    snapshot = catalog.snapshot()
+    curriculum = CurriculumGraph(snapshot.graph)
+    modules = [m for m in curriculum.order if m in snapshot.courses[COURSE]]
+    results = {}
+    for name in args.backends:
+        store = CompactProgressStore(curriculum.order) if name == "compact" else MemoryProgressStore()
+        _, fill_s = timed(lambda: fill(store, args.users, modules))
+        matrix, build_s = timed(lambda: matrix_from_store(store, curriculum.order))
+        report, report_s = timed(lambda: course_report(matrix, curriculum, COURSE, modules))
+
+        engine = CohortAnalytics(lambda: store, lambda: curriculum, snapshot.courses, max_age=0)
+        _, first_s = timed(lambda: engine.report(COURSE))
+        rng = random.Random(1)
+        for _ in range(args.updates):
+            username = f"learner{rng.randrange(args.users):07d}"
+            module = rng.choice(modules)
+            store.mark_complete(username, module, COURSE)
+            engine.record(username, module)
+        _, incremental_s = timed(lambda: engine.report(COURSE))
+        _, cached_s = timed(lambda: engine.report(COURSE))
+
+        results[name] = {
+            "fill_s": fill_s,
+            "matrix_build_s": build_s,
+            "report_s": report_s,
+            "engine_first_report_s": first_s,
+            "engine_incremental_report_s": incremental_s,
+            "engine_cached_report_s": cached_s,
+            "bottleneck": report["bottleneck"],
+        }
+        print(f"{name}: build {build_s:.2f}s, report {report_s:.3f}s, "
+              f"incremental ({args.updates} updates) {incremental_s:.3f}s, "
+              f"cached {cached_s * 1000:.3f}ms; bottleneck {report['bottleneck']}")
+    print("results:", write_results("analytics", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# bench_assets.py
+# Bytes per page view with CSS/JS served as cached static assets.
+#
+#   python -m benchmarks.bench_assets --repeat 300
+#
+# For each page: the HTML sent on every request, the assets it links
+# (raw and as served precompressed, fetched once per browser cache), what
+# the same page weighed with those assets inlined, and its latency.
+import argparse
+import re
+
+from benchmarks.common import time_calls, write_results
+
+PAGES = [
+    "/",
+    "/courses",
+    "/course/Python Basics",
+    "/course/Python Basics/Loops",
+    "/quiz/Python Basics/Loops",
+    "/summary/Python Basics",
+    "/progress/Python Basics",
+]
+ASSET = re.compile(r'(?:href|src)="(/assets/[^"]+)"')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="main", choices=["main", "app"])
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    app = __import__(args.app).app
+    client = app.test_client()
+    client.post("/", data={"username": "bench"})
+    anonymous = app.test_client()
+
+    results = {}
+    for page in PAGES:
+        get = (lambda p=page: anonymous.get(p)) if page == "/" else (lambda p=page: client.get(p))
+        html = get().get_data()
+        assets = ASSET.findall(html.decode("utf-8"))
+        raw = sum(len(client.get(a).get_data()) for a in assets)
+        served = sum(len(client.get(a, headers={"Accept-Encoding": "br, gzip"}).get_data()) for a in assets)
+        results[page] = {
+            "html_bytes": len(html),
+            "asset_bytes": raw,
+            "asset_bytes_compressed": served,
+            "inlined_bytes": len(html) + raw,
+            "latency": time_calls(get, args.repeat),
+        }
+
+    total_html = sum(r["html_bytes"] for r in results.values())
+    total_inlined = sum(r["inlined_bytes"] for r in results.values())
+    print(f"  {'page':<30}{'html':>8}{'assets':>9}{'(served)':>10}{'inlined':>9}{'p50 ms':>9}")
+    for page, r in results.items():
+        print(f"  {page:<30}{r['html_bytes']:>8}{r['asset_bytes']:>9}{r['asset_bytes_compressed']:>10}"
+              f"{r['inlined_bytes']:>9}{r['latency']['p50_ms']:>9.3f}")
+    print(f"html per visit of all pages: {total_html} bytes vs {total_inlined} inlined "
+          f"({1 - total_html / total_inlined:.0%} less)")
+    results["total_html_bytes"] = total_html
+    results["total_inlined_bytes"] = total_inlined
+    print("results:", write_results("assets", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
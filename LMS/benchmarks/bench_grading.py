@@ -0,0 +1,125 @@
+# bench_grading.py
+# Quiz POST cost with grading inline vs. queued, and how fast the grading
+# workers drain a burst of submissions.
+#
+#   python -m benchmarks.bench_grading --jobs 200 --model-ms 400 --workers 4
+#
+#   inline     grading inside the request: one model call per submission
+#   submit     GradingQueue.submit() (what the quiz POST now pays)
+#   drain      `jobs` submissions at once; seconds from submit to graded
+#              per job, and total jobs graded per second
+#   restart    jobs queued by a process that exits before grading them are
+#              graded by the next one
+# The model is simulated (sleeps --model-ms, fails --fail-rate of calls) so
+# the numbers isolate the queue; the database is a temporary file.
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.common import summarize, time_calls, write_results
+
+from quiz_grading import DONE, GradingQueue
+
+QUESTIONS = ["Explain the key concept.", "Give an example.", "When would you use it?"]
+
+
+def simulated_grader(model_ms, fail_rate, seed=0):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def grade(module, questions, answers):
+        time.sleep(model_ms / 1000)
+        with lock:
+            failed = rng.random() < fail_rate
+        if failed:
+            raise RuntimeError("simulated model failure")
+        return 75, ["ok"] * len(answers)
+    grade.name = "simulated"
+    return grade
+
+
+def answers(i):
+    return [f"answer {i} to question {q}" for q in range(len(QUESTIONS))]
+
+
+def drain(queue, jobs, timeout):
+    ids = [queue.submit(f"user{i}", "Python", f"Module {i % 50}", QUESTIONS, answers(i))["id"]
+           for i in range(jobs)]
+    start = time.perf_counter()
+    queue.start()
+    deadline = time.monotonic() + timeout
+    finished = [queue.wait(id, max(0.0, deadline - time.monotonic())) for id in ids]
+    elapsed = time.perf_counter() - start
+    done = [j for j in finished if j and j["status"] == DONE]
+    return {
+        "jobs": jobs,
+        "graded": len(done),
+        "seconds": elapsed,
+        "jobs_per_s": len(done) / elapsed,
+        "time_to_grade": summarize([j["updated_at"] - j["created_at"] for j in done]),
+        "attempts": sum(j["attempts"] for j in done) / max(1, len(done)),
+        "counts": dict(queue.counts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model-ms", type=float, default=400)
+    parser.add_argument("--fail-rate", type=float, default=0.05)
+    parser.add_argument("--backoff", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench-grading-")
+    try:
+        grade = simulated_grader(args.model_ms, 0.0)
+        inline = time_calls(lambda: grade("Module", QUESTIONS, answers(0)), 10)
+
+        queue = GradingQueue(os.path.join(root, "submit.db"), grade)
+        counter = iter(range(args.repeat))
+        submit = time_calls(lambda: queue.submit("user", "Python", "Module", QUESTIONS,
+                                                 answers(next(counter))), args.repeat)
+        queue.close()
+        print(f"quiz POST grading: inline p50 {inline['p50_ms']:.1f}ms, "
+              f"queued p50 {submit['p50_ms']:.3f}ms p99 {submit['p99_ms']:.3f}ms")
+
+        queue = GradingQueue(os.path.join(root, "drain.db"),
+                             simulated_grader(args.model_ms, args.fail_rate),
+                             workers=args.workers, backoff=args.backoff)
+        drained = drain(queue, args.jobs, timeout=600)
+        queue.close()
+        ttg = drained["time_to_grade"]
+        print(f"drain {drained['graded']}/{args.jobs} with {args.workers} workers in "
+              f"{drained['seconds']:.2f}s ({drained['jobs_per_s']:.1f}/s), time to grade "
+              f"p50 {ttg['p50_ms'] / 1000:.2f}s p99 {ttg['p99_ms'] / 1000:.2f}s, "
+              f"{drained['counts']['retried']} retries, {drained['counts']['fallbacks']} fallbacks")
+
+        path = os.path.join(root, "restart.db")
+        before = GradingQueue(path, grade)
+        for i in range(args.workers * 5):
+            before.submit(f"user{i}", "Python", "Module", QUESTIONS, answers(i))
+        before.close()
+        after = GradingQueue(path, simulated_grader(0, 0.0), workers=args.workers)
+        after.start()
+        deadline = time.monotonic() + 30
+        while after.size().get(DONE, 0) < args.workers * 5 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        restart = after.size()
+        after.close()
+        print(f"restart: jobs by status after reopening {restart}")
+
+        results = {"inline": inline, "submit": submit, "drain": drained, "restart": restart}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    print("results:", write_results("grading", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# bench_import_time.py
+# Cold-start budget for the app, measured with `python -X importtime`.
+#
+#   python -m benchmarks.bench_import_time                # import main
+#   python -m benchmarks.bench_import_time --module app --budget-ms 500
+#
+# Exits with status 1 when the cumulative import time of the module goes
+# over budget, or when a module that must stay lazy (the AI SDKs) is
+# imported during start-up.
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+LMS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+DEFAULT_FORBIDDEN = ["google.generativeai", "openai", "numpy"]
+
+
+def measure(module):
+    """Return [(name, self_us, cumulative_us, depth)] for one cold import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=LMS_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"importing {module} failed")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    parser.add_argument("--runs", type=int, default=3, help="best of N cold imports")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--forbid", action="append", default=None,
+                        help="module that must not be imported at start-up")
+    args = parser.parse_args()
+    forbidden = DEFAULT_FORBIDDEN if args.forbid is None else args.forbid
+
+    best = None
+    for _ in range(args.runs):
+        rows = measure(args.module)
+        total = next(c for name, _, c, _ in rows if name == args.module)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total_us, rows = best
+
+    print(f"{args.module}: {total_us / 1000:.1f} ms cumulative (budget {args.budget_ms:.0f} ms)")
+    print("slowest imports (self time):")
+    for name, self_us, _, _ in sorted(rows, key=lambda r: -r[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    loaded = {name for name, _, _, _ in rows}
+    for name in forbidden:
+        if name in loaded:
+            print(f"FAIL: {name} is imported at start-up")
+            failed = True
+    if total_us / 1000 > args.budget_ms:
+        print("FAIL: cold start is over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# bench_journal.py
+# Learning event journal: request-thread cost, group-commit throughput and
+# replay from a snapshot.
+#
+#   python -m benchmarks.bench_journal --events 200000 --threads 8
+#
+#   append     EventJournal.append() latency while the writer is busy
+#   sync       one write + fsync per event on the calling thread (what a
+#              request would pay without the background writer)
+#   group      `threads` threads appending `events` events; time until all
+#              are fsynced, and how many write batches that took
+#   replay     Consumer folding every event vs. starting from a snapshot
+#              taken `--tail` events before the end
+# Everything runs in a temporary directory (--dir to pick the disk).
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.common import time_calls, write_results
+
+from event_journal import Activity, Consumer, EventJournal, segments
+
+TYPES = ("view", "view", "view", "complete", "quiz", "chat")
+
+
+def make_event(rng, users, modules):
+    kind = rng.choice(TYPES)
+    fields = {"user": f"user{rng.randrange(users)}", "module": f"Module {rng.randrange(modules)}"}
+    if kind == "quiz":
+        fields["score"] = rng.randrange(101)
+    elif kind == "chat":
+        fields["question"] = "how do I write a while loop that stops early?"
+    return kind, fields
+
+
+def sync_baseline(directory, events, fields):
+    path = os.path.join(directory, "sync.ndjson")
+    with open(path, "ab") as f:
+        def write():
+            f.write((json.dumps(fields, separators=(",", ":")) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        return time_calls(write, events)
+
+
+def group_commit(directory, events, threads, users, modules, segment_bytes):
+    journal = EventJournal(directory, segment_bytes=segment_bytes)
+    per_thread = events // threads
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(per_thread):
+            kind, fields = make_event(rng, users, modules)
+            journal.append(kind, **fields)
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    appended = time.perf_counter() - start
+    journal.flush(timeout=600)
+    elapsed = time.perf_counter() - start
+    stats = journal.stats()
+    journal.close()
+    return {
+        "events": stats["written"],
+        "dropped": stats["dropped"],
+        "batches": stats["batches"],
+        "events_per_batch": stats["written"] / max(1, stats["batches"]),
+        "segments": len(segments(directory)),
+        "append_s": appended,
+        "durable_s": elapsed,
+        "events_per_s": stats["written"] / elapsed,
+    }
+
+
+def replay(directory, tail):
+    start = time.perf_counter()
+    full = Consumer(directory, Activity())
+    total = full.catch_up()
+    full_s = time.perf_counter() - start
+
+    # Snapshot `tail` events before the end, then time a restart from it.
+    snapshot = os.path.join(directory, "activity.snapshot.json")
+    partial = Consumer(directory, Activity(), snapshot, snapshot_every=max(1, total - tail))
+    partial.catch_up()
+    with open(snapshot, encoding="utf-8") as f:
+        saved = json.load(f)["position"]
+    start = time.perf_counter()
+    restarted = Consumer(directory, Activity(), snapshot)
+    replayed = restarted.catch_up()
+    restart_s = time.perf_counter() - start
+    assert restarted.aggregate.state["events"] == full.aggregate.state["events"]
+    return {
+        "events": total,
+        "full_s": full_s,
+        "snapshot_position": saved,
+        "restart_replayed": replayed,
+        "restart_s": restart_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--sync-events", type=int, default=2000)
+    parser.add_argument("--append-repeat", type=int, default=20000)
+    parser.add_argument("--tail", type=int, default=10000, help="events after the snapshot")
+    parser.add_argument("--segment-mb", type=float, default=4)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--modules", type=int, default=500)
+    parser.add_argument("--dir", default=None)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench-journal-", dir=args.dir)
+    try:
+        rng = random.Random(0)
+        kind, fields = make_event(rng, args.users, args.modules)
+        sync = sync_baseline(root, args.sync_events, dict(fields, type=kind))
+        print(f"sync write+fsync per event: p50 {sync['p50_ms']:.3f}ms p99 {sync['p99_ms']:.3f}ms")
+
+        journal = EventJournal(os.path.join(root, "append"))
+        append = time_calls(lambda: journal.append(kind, **fields), args.append_repeat)
+        journal.close()
+        print(f"append on the request thread: p50 {append['p50_ms'] * 1000:.1f}us "
+              f"p99 {append['p99_ms'] * 1000:.1f}us")
+
+        directory = os.path.join(root, "group")
+        group = group_commit(directory, args.events, args.threads, args.users, args.modules,
+                             int(args.segment_mb * 1024 * 1024))
+        print(f"group commit: {group['events']} events from {args.threads} threads durable in "
+              f"{group['durable_s']:.2f}s ({group['events_per_s']:.0f}/s), {group['batches']} fsyncs "
+              f"({group['events_per_batch']:.0f} events each), {group['segments']} segments, "
+              f"{group['dropped']} dropped")
+
+        folded = replay(directory, args.tail)
+        print(f"replay: all {folded['events']} events {folded['full_s']:.2f}s, restart from snapshot "
+              f"{folded['restart_replayed']} events {folded['restart_s'] * 1000:.1f}ms")
+
+        results = {"sync": sync, "append": append, "group_commit": group, "replay": folded}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    print("results:", write_results("journal", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# bench_metrics.py
+# Cost of the metrics instrumentation.
+#
+#   python -m benchmarks.bench_metrics --repeat 200000 --requests 5000
+#
+# Reports the per-call cost of Histogram.observe and of the @timed wrapper,
+# get_recommendations with and without its wrapper, and the latency of a
+# trivial Flask route with and without instrument_app.
+import argparse
+import time
+
+from benchmarks.common import summarize, write_results
+
+from flask import Flask
+
+import ai_utils
+from metrics import Histogram, Registry, instrument_app, timed
+
+
+def per_call_ns(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e9
+
+
+def make_client(instrumented):
+    app = Flask(__name__)
+    app.secret_key = "bench"
+
+    @app.route("/ping")
+    def ping():
+        return "ok"
+
+    if instrumented:
+        instrument_app(app, Registry())
+    return app.test_client()
+
+
+def request_latency(requests):
+    """Alternate requests between both apps so drift hits them equally."""
+    clients = {"plain": make_client(False), "instrumented": make_client(True)}
+    samples = {name: [] for name in clients}
+    for i in range(requests + 200):
+        for name, client in clients.items():
+            start = time.perf_counter()
+            client.get("/ping")
+            if i >= 200:
+                samples[name].append(time.perf_counter() - start)
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    histogram = Histogram("bench_seconds", "bench", ("route",))
+    noop = lambda: None
+    wrapped_noop = timed("noop")(noop)
+    recommend = ai_utils.get_recommendations
+    ai_utils.mark_module_complete("bench", "Variables")
+    results = {
+        "histogram_observe_ns": per_call_ns(lambda: histogram.observe(0.003, "/x"), args.repeat),
+        "noop_ns": per_call_ns(noop, args.repeat),
+        "timed_noop_ns": per_call_ns(wrapped_noop, args.repeat),
+        "get_recommendations_ns": per_call_ns(lambda: recommend.__wrapped__("bench"), args.repeat),
+        "get_recommendations_timed_ns": per_call_ns(lambda: recommend("bench"), args.repeat),
+    }
+    results["timed_overhead_ns"] = results["timed_noop_ns"] - results["noop_ns"]
+    latency = request_latency(args.requests)
+    plain, instrumented = latency["plain"], latency["instrumented"]
+    results["request_plain"] = plain
+    results["request_instrumented"] = instrumented
+    results["request_overhead_us_p50"] = (instrumented["p50_ms"] - plain["p50_ms"]) * 1000
+
+    for name, value in results.items():
+        if isinstance(value, dict):
+            print(f"  {name:<32}{value['p50_ms'] * 1000:10.1f} us p50{value['p99_ms'] * 1000:10.1f} us p99")
+        else:
+            print(f"  {name:<32}{value:10.1f}")
+    print("results:", write_results("metrics", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# bench_planner.py
+# Prerequisite closure and study planner on a large synthetic curriculum.
+#
+#   python -m benchmarks.bench_planner --modules 20000 --edges 100000
+#
+# Edges only point forward in a random order of the modules, so the graph
+# is a DAG. Learners have completed a random share of each goal's
+# prerequisites. "walk" is the same question answered by a breadth-first
+# walk over the prerequisite sets, for comparison.
+import argparse
+import random
+import time
+
+from benchmarks.common import time_calls, write_results
+
+from curriculum import CurriculumGraph, plan_weeks
+
+
+def make_graph(rng, modules, edges):
+    names = [f"m{i:06d}" for i in range(modules)]
+    rng.shuffle(names)
+    graph = {name: [] for name in sorted(names)}
+    seen = set()
+    while len(seen) < edges:
+        a, b = sorted(rng.sample(range(modules), 2))
+        if (a, b) not in seen:
+            seen.add((a, b))
+            graph[names[a]].append(names[b])
+    return graph
+
+
+def walk_is_prerequisite(curriculum, module, goal):
+    seen = set()
+    stack = [goal]
+    while stack:
+        for prerequisite in curriculum.prerequisites[stack.pop()]:
+            if prerequisite == module:
+                return True
+            if prerequisite not in seen:
+                seen.add(prerequisite)
+                stack.append(prerequisite)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", type=int, default=20000)
+    parser.add_argument("--edges", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--weekly-hours", type=float, default=5)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    graph = make_graph(rng, args.modules, args.edges)
+    curriculum = CurriculumGraph(graph)
+    hours = {m: rng.choice((1, 1.5, 2, 3, 4)) for m in graph}
+
+    start = time.perf_counter()
+    reach, _ = curriculum.closure()
+    closure_s = time.perf_counter() - start
+    closure_mb = sum(mask.__sizeof__() for mask in reach) / 1e6
+    depth = sorted(m.bit_count() - 1 for m in reach)
+
+    pairs = [tuple(rng.sample(curriculum.order, 2)) for _ in range(args.repeat)]
+    it = iter(pairs)
+    closure_query = time_calls(lambda: curriculum.is_prerequisite(*next(it)), args.repeat)
+    it = iter(pairs)
+    walk_query = time_calls(lambda: walk_is_prerequisite(curriculum, *next(it)), args.repeat)
+
+    # Goals from the deep end of the curriculum, where plans are longest.
+    deep = sorted(range(len(reach)), key=lambda i: reach[i].bit_count())[-args.repeat:]
+    plans = []
+    for i in deep:
+        ancestors = [m for m in curriculum.order if reach[i] >> curriculum.index[m] & 1]
+        done = rng.sample(ancestors, rng.randrange(len(ancestors)))
+        plans.append((curriculum.order[i], curriculum.mask(done)))
+    it = iter(plans)
+    sizes = []
+
+    def plan():
+        goal, mask = next(it)
+        modules = curriculum.remaining_prerequisites(goal, mask)
+        sizes.append(len(modules))
+        plan_weeks(modules, hours.get, args.weekly_hours)
+
+    planner = time_calls(plan, len(plans))
+
+    results = {
+        "modules": args.modules,
+        "edges": args.edges,
+        "closure_build_s": closure_s,
+        "closure_mb": closure_mb,
+        "ancestors_p50": depth[len(depth) // 2],
+        "ancestors_max": depth[-1],
+        "is_prerequisite_closure": closure_query,
+        "is_prerequisite_walk": walk_query,
+        "plan": planner,
+        "plan_modules_mean": sum(sizes) / len(sizes),
+    }
+    print(f"{args.modules} modules, {args.edges} edges: closure {closure_s:.2f}s, {closure_mb:.0f} MB; "
+          f"ancestors p50 {results['ancestors_p50']}, max {results['ancestors_max']}")
+    print(f"  is_prerequisite closure p50 {closure_query['p50_ms'] * 1000:.2f}us  "
+          f"walk p50 {walk_query['p50_ms']:.3f}ms p99 {walk_query['p99_ms']:.3f}ms")
+    print(f"  plan ({results['plan_modules_mean']:.0f} modules) p50 {planner['p50_ms']:.3f}ms  "
+          f"p99 {planner['p99_ms']:.3f}ms")
+    print("results:", write_results("planner", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench_progress_io.py
+# NDJSON import/export throughput for each progress backend.
+#
+#   python -m benchmarks.bench_progress_io --rows 1000000 --backends compact sqlite
+#
+# The synthetic file is written to a temporary directory first, so the
+# import numbers include parsing but not generating the input.
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import write_results
+
+from progress_io import import_ndjson, iter_ndjson
+from progress_store import CompactProgressStore, MemoryProgressStore, SQLiteProgressStore
+
+COURSES = ["Python Basics", "OOP", None]
+
+
+def synthetic_rows(n, users, modules, seed=0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield (f"learner{rng.randrange(users):07d}", f"module{rng.randrange(modules)}",
+               rng.choice(COURSES))
+
+
+def make_store(name, tmp, batch_size):
+    if name == "memory":
+        return MemoryProgressStore()
+    if name == "compact":
+        return CompactProgressStore()
+    return SQLiteProgressStore(os.path.join(tmp, "progress.db"), batch_size=batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--modules", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--backends", nargs="+", default=["memory", "compact", "sqlite"])
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "progress.ndjson")
+        with open(path, "w", encoding="utf-8") as f:
+            for chunk in iter_ndjson(synthetic_rows(args.rows, args.users, args.modules)):
+                f.write(chunk)
+
+        for name in args.backends:
+            store = make_store(name, tmp, args.batch_size)
+            with open(path, "rb") as f:
+                stats = import_ndjson(f, store.mark_many, args.batch_size)
+            store.flush()
+
+            # Re-importing must not change anything and shows the parse cost.
+            with open(path, "rb") as f:
+                again = import_ndjson(f, store.mark_many, args.batch_size)
+            store.flush()
+
+            start = time.perf_counter()
+            exported = 0
+            for chunk in iter_ndjson(store.rows()):
+                exported += chunk.count("\n")
+            export_s = time.perf_counter() - start
+
+            # Traced separately: tracemalloc slows the loop down several times.
+            tracemalloc.start()
+            for chunk in iter_ndjson(store.rows()):
+                pass
+            _, export_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            store.close()
+
+            results[name] = {
+                "import_rows_per_sec": stats["rows_per_sec"],
+                "reimport_rows_per_sec": again["rows_per_sec"],
+                "distinct_rows": exported,
+                "export_rows_per_sec": round(exported / export_s) if export_s else 0,
+                "export_peak_bytes": export_peak,
+            }
+            print(f"{name:<8} import {stats['rows_per_sec']:>10,} rows/s"
+                  f"  re-import {again['rows_per_sec']:>10,} rows/s"
+                  f"  export {results[name]['export_rows_per_sec']:>10,} rows/s"
+                  f"  ({exported:,} distinct, export peak {export_peak / 2**20:.1f} MiB)")
+    print("results:", write_results("progress_io", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
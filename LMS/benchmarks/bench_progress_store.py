@@ -0,0 +1,67 @@
+# bench_progress_store.py
+# Compare the in-memory and SQLite progress backends.
+#
+#   python -m benchmarks.bench_progress_store --users 2000 --modules 20
+import argparse
+import os
+import tempfile
+import time
+
+from progress_store import MemoryProgressStore, SQLiteProgressStore
+
+
+def run(store, users, modules, courses):
+    rows = [
+        (f"user{u}", f"module{m}", f"course{m % courses}")
+        for u in range(users)
+        for m in range(modules)
+    ]
+
+    start = time.perf_counter()
+    for username, module, course in rows:
+        store.mark_complete(username, module, course)
+    store.flush()
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for u in range(users):
+        store.completed(f"user{u}", f"course{u % courses}")
+    read_course_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for u in range(users):
+        store.completed(f"user{u}")
+    read_all_s = time.perf_counter() - start
+
+    return {
+        "writes/s": len(rows) / write_s,
+        "course reads/s": users / read_course_s,
+        "all-course reads/s": users / read_all_s,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--modules", type=int, default=20)
+    parser.add_argument("--courses", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "memory": MemoryProgressStore(),
+            "sqlite": SQLiteProgressStore(
+                os.path.join(tmp, "progress.db"), batch_size=args.batch_size
+            ),
+        }
+        for name, store in stores.items():
+            results = run(store, args.users, args.modules, args.courses)
+            store.close()
+            print(name)
+            for metric, value in results.items():
+                print(f"  {metric:<20} {value:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# bench_rag.py
+# Prompt size and retrieval quality of the chat context assembler.
+#
+#   python -m benchmarks.bench_rag --modules 5000 --repeat 2000
+#
+# Strategies compared per question (tokens estimated as in rag_context):
+#   bare      the question alone (the behaviour before rag_context)
+#   module    the question plus the whole body of the page's module
+#   course    the question plus every module body of the page's course
+#   rag       the prompt context_assembler builds under its token budget
+# "hit" means the chunk holding the answer was in the rag prompt. The
+# synthetic catalog (see bench_search) times retrieval at scale.
+import argparse
+import random
+
+from benchmarks.bench_search import Source, SyntheticSnapshot, make_catalog, make_vocabulary
+from benchmarks.common import time_calls, write_results
+
+from catalog import catalog
+from rag_context import PROMPT, ContextAssembler, estimate_tokens
+
+# (question, page the student is on, module holding the answer)
+QUESTIONS = [
+    ("where is super() explained?", "Classes", "Inheritance"),
+    ("how do I write a while loop?", "Variables", "Loops"),
+    ("what is a dictionary?", "Data Types", "Data Types"),
+    ("how do I import a function from another file?", "Functions", "Modules"),
+    ("what are default arguments for?", "Functions", "Functions"),
+    ("what is method overriding?", "Inheritance", "Polymorphism"),
+    ("how do I create an object from a class?", "Classes", "Classes"),
+    ("is python dynamically typed?", "Variables", "Variables"),
+    ("how do I stop an infinite loop?", "Loops", "Loops"),
+    ("which built-in modules are popular?", "Modules", "Modules"),
+    ("what is duck typing?", "Polymorphism", "Polymorphism"),
+    ("give me a project idea for OOP", "OOP Projects", "OOP Projects"),
+    ("what comparison operators are there?", "Loops", "Data Types"),
+    ("can a class inherit from two parents?", "Classes", "Inheritance"),
+    ("explain this", "Functions", "Functions"),
+]
+
+
+def prompt_sizes(assembler, snapshot):
+    course_of = {m: c for c, modules in snapshot.courses.items() for m in modules}
+    rows = []
+    for question, page, answer in QUESTIONS:
+        module_body = snapshot.content(page)
+        course_body = "\n\n".join(snapshot.content(m) for m in snapshot.courses[course_of[page]])
+        chunks = assembler.context(question, page)
+        rows.append({
+            "question": question,
+            "bare": estimate_tokens(question),
+            "module": estimate_tokens(PROMPT.format(module=page, context=module_body, question=question)),
+            "course": estimate_tokens(PROMPT.format(module=page, context=course_body, question=question)),
+            "rag": estimate_tokens(assembler.prompt(question, page)),
+            "chunks": [name for name, _ in chunks],
+            "hit": any(name == answer for name, _ in chunks),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", type=int, default=5000, help="synthetic modules for timing")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--budget", type=int, default=None, help="override LMS_RAG_BUDGET")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    snapshot = catalog.snapshot()
+    assembler = ContextAssembler(catalog)
+    if args.budget is not None:
+        assembler.budget = args.budget
+    rows = prompt_sizes(assembler, snapshot)
+    totals = {k: sum(r[k] for r in rows) for k in ("bare", "module", "course", "rag")}
+    n = len(rows)
+    for r in rows:
+        print(f"  {r['question'][:44]:<46}bare {r['bare']:>4}  module {r['module']:>4}  "
+              f"course {r['course']:>5}  rag {r['rag']:>4}  {'hit ' if r['hit'] else 'MISS'} {r['chunks']}")
+    print(f"mean prompt tokens: bare {totals['bare'] / n:.0f}, module {totals['module'] / n:.0f}, "
+          f"course {totals['course'] / n:.0f}, rag {totals['rag'] / n:.0f}; "
+          f"answer chunk retrieved for {sum(r['hit'] for r in rows)}/{n}")
+    print(f"rag prompt vs whole module {totals['rag'] / totals['module'] - 1:+.0%}, "
+          f"vs whole course {totals['rag'] / totals['course'] - 1:+.0%}, "
+          f"vs bare {(totals['rag'] - totals['bare']) / n:+.0f} tokens per question")
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng, 20000)
+    bodies, courses = make_catalog(rng, vocabulary, args.modules, 400)
+    big = ContextAssembler(Source(SyntheticSnapshot(bodies, courses)), cache_size=args.repeat).build()
+    if args.budget is not None:
+        big.budget = args.budget
+    names = list(bodies)
+    queries = [(" ".join(rng.sample(vocabulary[:3000], 4)) + f" {i}", rng.choice(names))
+               for i in range(args.repeat)]
+    cold = iter(queries)
+    assemble = time_calls(lambda: big.prompt(*next(cold)), args.repeat)
+    warm = iter(queries)
+    cached = time_calls(lambda: big.prompt(*next(warm)), args.repeat)
+    synthetic = {
+        "module": sum(estimate_tokens(PROMPT.format(module=m, context=bodies[m], question=q))
+                      for q, m in queries) / len(queries),
+        "rag": sum(estimate_tokens(big.prompt(q, m)) for q, m in queries) / len(queries),
+    }
+    print(f"{args.modules} synthetic modules: mean prompt tokens module {synthetic['module']:.0f}, "
+          f"rag {synthetic['rag']:.0f}; assemble p50 {assemble['p50_ms']:.3f}ms "
+          f"p99 {assemble['p99_ms']:.3f}ms, cached p50 {cached['p50_ms'] * 1000:.1f}us")
+
+    results = {
+        "budget": assembler.budget,
+        "questions": rows,
+        "mean_tokens": {k: v / n for k, v in totals.items()},
+        "saved_vs_module": 1 - totals["rag"] / totals["module"],
+        "saved_vs_course": 1 - totals["rag"] / totals["course"],
+        "added_vs_bare": (totals["rag"] - totals["bare"]) / n,
+        "hit_rate": sum(r["hit"] for r in rows) / n,
+        "synthetic_modules": args.modules,
+        "synthetic_mean_tokens": synthetic,
+        "assemble": assemble,
+        "assemble_cached": cached,
+    }
+    print("results:", write_results("rag", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# bench_ranking.py
+# Ranked recommendations vs. the original first-unlocked scan.
+#
+#   python -m benchmarks.bench_ranking --modules 5000 --dim 256
+#
+# The synthetic curriculum is a set of short chains, so most chain heads
+# are unlocked at once and thousands of candidates have to be scored.
+import argparse
+import random
+import time
+
+import numpy as np
+
+from curriculum import CurriculumGraph
+from ranking import ModuleRanker
+
+
+def synthetic_graph(n, chain=4):
+    names = [f"m{i}" for i in range(n)]
+    return {m: ([names[i + 1]] if (i + 1) % chain and i + 1 < n else [])
+            for i, m in enumerate(names)}
+
+
+def original_scan(graph, completed):
+    """get_recommendations before the curriculum index (O(V²))."""
+    for module in graph:
+        prerequisites = [m for m, deps in graph.items() if module in deps]
+        if all(p in completed for p in prerequisites) and module not in completed:
+            return module
+    return None
+
+
+def python_rank(graph, vectors, completed, k):
+    """Same ranking as ModuleRanker, scored with a plain Python loop."""
+    names = list(graph)
+    done = [vectors[names.index(m)] for m in completed]
+    profile = [sum(col) / len(done) for col in zip(*done)]
+    scores = []
+    for i, module in enumerate(names):
+        prerequisites = [m for m, deps in graph.items() if module in deps]
+        if module not in completed and all(p in completed for p in prerequisites):
+            scores.append((-sum(a * b for a, b in zip(vectors[i], profile)), i, module))
+    return [m for _, _, m in sorted(scores)[:k]]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--completed", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    graph = synthetic_graph(args.modules)
+    curriculum = CurriculumGraph(graph)
+    rng = np.random.default_rng(0)
+    ranker = ModuleRanker(curriculum.order, rng.standard_normal((args.modules, args.dim)))
+    completed = set(random.Random(0).sample(curriculum.order[::4], args.completed))
+    curriculum.next_module("bench", load_completed=lambda: completed)
+
+    ready, done = curriculum.ready_modules("bench")
+    print(f"{args.modules} modules, {len(ready)} unlocked candidates, dim {args.dim}")
+
+    ranked_ms = timed(lambda: ranker.rank(*curriculum.ready_modules("bench"), args.k), args.repeat)
+    print(f"  ranked top-{args.k} (frontier + matmul)  {ranked_ms:9.3f} ms/call")
+
+    small = max(1, args.repeat // 100)
+    scan_ms = timed(lambda: original_scan(graph, completed), small)
+    print(f"  original first-unlocked scan         {scan_ms:9.3f} ms/call")
+
+    if args.modules <= 5000:
+        vectors = ranker.matrix.tolist()
+        loop_ms = timed(lambda: python_rank(graph, vectors, completed, args.k), small)
+        print(f"  ranked top-{args.k} (Python loop)         {loop_ms:9.3f} ms/call")
+
+
+if __name__ == "__main__":
+    main()
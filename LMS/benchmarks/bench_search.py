@@ -0,0 +1,112 @@
+# bench_search.py
+# Search index build, query and incremental update on a synthetic catalog.
+#
+#   python -m benchmarks.bench_search --modules 5000 --queries 2000
+#
+# Module bodies are drawn from a Zipf-like vocabulary so term frequencies
+# look like prose. Queries are one to three words; "prefix" queries cut
+# the last word to 1-4 letters, as when typing.
+import argparse
+import random
+import time
+
+from benchmarks.common import time_calls, write_results
+
+from search_index import SearchIndex
+
+
+class SyntheticSnapshot:
+    def __init__(self, bodies, courses):
+        self.modules = {m: {} for m in bodies}
+        self.courses = courses
+        self._bodies = bodies
+
+    def content(self, module):
+        return self._bodies[module]
+
+
+class Source:
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def snapshot(self):
+        return self._snapshot
+
+
+def make_vocabulary(rng, size):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def make_catalog(rng, vocabulary, modules, words_per_body):
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    bodies = {}
+    for i in range(modules):
+        title = " ".join(rng.choices(vocabulary, weights, k=3)) + f" {i}"
+        bodies[title] = " ".join(rng.choices(vocabulary, weights, k=words_per_body))
+    names = list(bodies)
+    courses = {f"Course {c}": names[c::50] for c in range(50)}
+    return bodies, courses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", type=int, default=5000)
+    parser.add_argument("--words", type=int, default=400, help="words per module body")
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--changes", type=int, default=10, help="modules edited per incremental update")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    bodies, courses = make_catalog(rng, vocabulary, args.modules, args.words)
+    snapshot = SyntheticSnapshot(bodies, courses)
+
+    start = time.perf_counter()
+    index = SearchIndex(Source(snapshot)).build()
+    build_s = time.perf_counter() - start
+
+    common = vocabulary[:2000]
+    word_queries = [" ".join(rng.sample(common, rng.randint(1, 3))) + " " for _ in range(args.queries)]
+    prefix_queries = []
+    for query in word_queries:
+        *head, last = query.split()
+        prefix_queries.append(" ".join(head + [last[:rng.randint(1, 4)]]))
+    words = iter(word_queries * 2)
+    prefixes = iter(prefix_queries * 2)
+    word = time_calls(lambda: index.search(next(words)), args.queries)
+    prefix = time_calls(lambda: index.search(next(prefixes)), args.queries)
+    short = iter([rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(args.queries)])
+    one_letter = time_calls(lambda: index.search(next(short)), args.queries)
+
+    edited = dict(bodies)
+    for module in rng.sample(list(bodies), args.changes):
+        edited[module] = bodies[module] + " " + " ".join(rng.choices(vocabulary, k=50))
+    start = time.perf_counter()
+    reindexed, dropped = index.update(SyntheticSnapshot(edited, courses))
+    update_s = time.perf_counter() - start
+
+    results = {
+        "modules": len(index),
+        "terms": len(index.terms),
+        "build_s": build_s,
+        "query_words": word,
+        "query_prefix": prefix,
+        "query_one_letter": one_letter,
+        "incremental_update_s": update_s,
+        "incremental_reindexed": reindexed,
+    }
+    print(f"{len(index)} modules, {len(index.terms)} terms: build {build_s:.2f}s, "
+          f"update of {reindexed} modules {update_s * 1000:.1f}ms")
+    for name in ("query_words", "query_prefix", "query_one_letter"):
+        print(f"  {name:<18}p50 {results[name]['p50_ms']:.3f}ms  p99 {results[name]['p99_ms']:.3f}ms")
+    print("results:", write_results("search", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
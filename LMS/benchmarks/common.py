@@ -0,0 +1,93 @@
+# common.py
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+LMS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(LMS_DIR, "benchmarks", "results")
+
+if LMS_DIR not in sys.path:
+    sys.path.insert(0, LMS_DIR)
+
+
+# -------------------------------
+# Statistics
+# -------------------------------
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples_s):
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    values = sorted(s * 1000 for s in samples_s)
+    return {
+        "count": len(values),
+        "mean_ms": sum(values) / len(values) if values else 0.0,
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else 0.0,
+    }
+
+
+def time_calls(fn, repeat):
+    """Call fn `repeat` times and summarize each call's latency."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+# -------------------------------
+# Synthetic curricula
+# -------------------------------
+def synthetic_graph(n, fan_in=50, extra_edges=0.1, seed=0):
+    """
+    A DAG of n modules in dict order m0..m{n-1}. Every module after the
+    first few roots has one parent among the previous `fan_in` modules;
+    a fraction of modules get a second parent (diamonds).
+    """
+    rng = random.Random(seed)
+    names = [f"m{i}" for i in range(n)]
+    graph = {m: [] for m in names}
+    for i in range(1, n):
+        if i < 3:
+            continue
+        parents = {rng.randrange(max(0, i - fan_in), i)}
+        if rng.random() < extra_edges:
+            parents.add(rng.randrange(max(0, i - fan_in), i))
+        for p in parents:
+            graph[names[p]].append(names[i])
+    return graph
+
+
+# -------------------------------
+# Results
+# -------------------------------
+def write_results(kind, results, args, out=None):
+    """Write results plus run metadata as JSON; return the path."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{kind}-{stamp}.json")
+    payload = {
+        "kind": kind,
+        "timestamp": stamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": vars(args),
+        "results": results,
+    }
+    with open(out, "w") as f:
+        json.dump(payload, f, indent=2)
+    return out
@@ -0,0 +1,43 @@
+# compare.py
+# Compare two benchmark result files written by benchmarks.flow/micro.
+#
+#   python -m benchmarks.compare benchmarks/results/micro-A.json benchmarks/results/micro-B.json
+import argparse
+import json
+
+
+def flatten(node, prefix=""):
+    """{'a': {'b': 1}} -> {'a.b': 1}, numbers only."""
+    out = {}
+    for key, value in node.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            out.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = value
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--metric", default="p50_ms",
+                        help="only show keys ending with this (empty for all)")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = flatten(json.load(f)["results"])
+    with open(args.after) as f:
+        after = flatten(json.load(f)["results"])
+
+    for key in sorted(before.keys() & after.keys()):
+        if args.metric and not key.endswith(args.metric):
+            continue
+        old, new = before[key], after[key]
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"{key:<60}{old:12.4f}{new:12.4f}{change:+9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
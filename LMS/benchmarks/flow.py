@@ -0,0 +1,107 @@
+# flow.py
+# End-to-end request flow through the real Flask app (test client, stubbed AI).
+#
+#   python -m benchmarks.flow --users 100 --concurrency 8 --ai-delay 0.05
+#
+# Every simulated user runs: login -> /courses -> /course/<c> ->
+# /course/<c>/<m> -> /ask_ai -> /quiz/<c>/<m> (GET, POST) -> /summary/<c>.
+import argparse
+import importlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import summarize, write_results
+
+import ai_providers
+from ai_stream import ScheduledFakeModel
+
+
+def user_flow(app, username, course, module, question):
+    """Yield (route, call) pairs for one user's visit."""
+    client = app.test_client()
+    yield "POST /", lambda: client.post("/", data={"username": username})
+    yield "GET /courses", lambda: client.get("/courses")
+    yield "GET /course/<c>", lambda: client.get(f"/course/{course}")
+    yield "GET /course/<c>/<m>", lambda: client.get(f"/course/{course}/{module}")
+    yield "POST /ask_ai", lambda: client.post("/ask_ai", json={"message": question, "module": module})
+    yield "GET /quiz/<c>/<m>", lambda: client.get(f"/quiz/{course}/{module}")
+    answers = {f"answer_{i}": "An answer." for i in range(1, 5)}
+    yield "POST /quiz/<c>/<m>", lambda: client.post(f"/quiz/{course}/{module}", data=answers)
+    yield "GET /summary/<c>", lambda: client.get(f"/summary/{course}")
+
+
+def run(app, courses, users, concurrency, questions):
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    plan = [(c, m) for c in courses for m in courses[c]]
+
+    def simulate(i):
+        course, module = plan[i % len(plan)]
+        question = f"Explain {module} question {i % questions}."
+        for route, call in user_flow(app, f"user{i}", course, module, question):
+            start = time.perf_counter()
+            status = call().status_code
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples[route].append(elapsed)
+                if status >= 400:
+                    errors[route] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(simulate, range(users)))
+    wall = time.perf_counter() - start
+
+    total = sum(len(v) for v in samples.values())
+    routes = {}
+    for route, values in samples.items():
+        routes[route] = summarize(values)
+        routes[route]["errors"] = errors[route]
+    return {
+        "users": users,
+        "requests": total,
+        "wall_s": wall,
+        "throughput_rps": total / wall if wall else 0.0,
+        "routes": routes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="main", help="module holding the Flask app")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--ai-delay", type=float, default=0.0,
+                        help="seconds the stub model waits per chunk")
+    parser.add_argument("--questions", type=int, default=10,
+                        help="distinct chat questions shared by all users")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    stub = ScheduledFakeModel(["A stubbed ", "answer from ", "the AI."], delay=args.ai_delay)
+    ai_providers.set_provider(ai_providers.CHAT_PROVIDER, stub)
+    # Quiz jobs go to a throwaway queue unless LMS_GRADING_DB names one.
+    root = tempfile.mkdtemp(prefix="bench-flow-")
+    os.environ.setdefault("LMS_GRADING_DB", os.path.join(root, "grading.db"))
+    try:
+        module = importlib.import_module(args.app)
+        results = run(module.app, module.courses, args.users, args.concurrency, args.questions)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    print(f"{results['requests']} requests in {results['wall_s']:.2f}s "
+          f"({results['throughput_rps']:.0f} req/s)")
+    print(f"  {'route':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for route, stats in results["routes"].items():
+        print(f"  {route:<22}{stats['p50_ms']:9.2f}{stats['p95_ms']:9.2f}"
+              f"{stats['p99_ms']:9.2f}{stats['errors']:8d}")
+    print("results:", write_results("flow", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# micro.py
+# Micro-benchmarks of the ai_utils hot paths on synthetic curricula.
+#
+#   python -m benchmarks.micro --sizes 10 1000 100000
+import argparse
+import os
+
+from benchmarks.common import synthetic_graph, time_calls, write_results
+
+# Time the hot paths alone: an in-memory store and no journal, whatever
+# the environment says, so the run writes no progress.db or journal files.
+os.environ["LMS_PROGRESS_BACKEND"] = "memory"
+os.environ.pop("LMS_JOURNAL_DIR", None)
+
+import ai_utils
+from curriculum import CurriculumGraph
+from progress_store import MemoryProgressStore
+
+
+def original_recommendation(graph, completed):
+    """get_recommendations before the curriculum index (O(V²) per call)."""
+    for module, next_modules in graph.items():
+        prerequisites = [m for m, deps in graph.items() if module in deps]
+        if all(p in completed for p in prerequisites) and module not in completed:
+            return module
+    return None
+
+
+def bench_size(n, done_fraction, repeat):
+    graph = synthetic_graph(n)
+    ai_utils.curriculum = CurriculumGraph(graph)
+    ai_utils.progress_store = MemoryProgressStore()
+    order = ai_utils.curriculum.topological_order()
+    username, course = "bench", "Synthetic"
+    for module in order[:int(n * done_fraction)]:
+        ai_utils.mark_module_complete(username, module, course)
+
+    results = {"modules": n, "completed": int(n * done_fraction)}
+    results["get_completed_modules"] = time_calls(
+        lambda: ai_utils.get_completed_modules(username, course), repeat)
+
+    ai_utils.get_recommendations(username, course)
+    results["get_recommendations_warm"] = time_calls(
+        lambda: ai_utils.get_recommendations(username, course), repeat)
+
+    def cold_recommendation():
+        ai_utils.curriculum.forget(username)
+        ai_utils.get_recommendations(username, course)
+    results["get_recommendations_cold"] = time_calls(cold_recommendation, max(3, repeat // 20))
+
+    if n <= 1000:
+        completed = set(ai_utils.get_completed_modules(username, course))
+        results["get_recommendations_original"] = time_calls(
+            lambda: original_recommendation(graph, completed), max(3, repeat // 20))
+
+    # The nested tree repeats every shared descendant under each parent, so
+    # its size explodes on diamond-heavy graphs; time it on a forest.
+    graph = synthetic_graph(n, extra_edges=0.0)
+
+    def cold_tree():
+        ai_utils.curriculum = CurriculumGraph(graph)
+        ai_utils.build_knowledge_tree()
+    results["build_knowledge_tree_cold"] = time_calls(cold_tree, max(3, repeat // 50))
+    results["knowledge_tree_json_cold"] = time_calls(
+        lambda: CurriculumGraph(graph).knowledge_tree_json(), max(3, repeat // 50))
+    ai_utils.get_knowledge_tree_json()
+    results["knowledge_tree_json_cached"] = time_calls(ai_utils.get_knowledge_tree_json, repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--done-fraction", type=float, default=0.3,
+                        help="share of modules the synthetic user has completed")
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    results = {}
+    for n in args.sizes:
+        repeat = max(5, min(args.repeat, args.repeat * 1000 // n))
+        results[str(n)] = bench_size(n, args.done_fraction, repeat)
+        print(f"{n} modules")
+        for name, stats in results[str(n)].items():
+            if isinstance(stats, dict):
+                print(f"  {name:<32}{stats['p50_ms']:10.4f} ms p50{stats['p99_ms']:10.4f} ms p99")
+    print("results:", write_results("micro", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# progress_memory.py
+# Memory used by the nested-dict and the compact bitset progress stores.
+#
+#   python -m benchmarks.progress_memory --users 10000 100000 1000000
+#
+# Usernames and module names are created before tracing starts, so the
+# numbers are the cost of the store's own structure.
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from benchmarks.common import write_results
+
+from ai_utils import graph
+from progress_store import CompactProgressStore, MemoryProgressStore
+
+COURSES = {
+    "Python Basics": ["Variables", "Data Types", "Loops", "Functions", "Modules"],
+    "OOP": ["Classes", "Inheritance", "Polymorphism", "OOP Projects"],
+}
+
+
+def events(users, per_user, seed=0):
+    rng = random.Random(seed)
+    plan = [(c, m) for c, modules in COURSES.items() for m in modules]
+    for username in users:
+        for course, module in rng.sample(plan, per_user):
+            yield username, module, course
+
+
+def measure(make_store, users, per_user):
+    gc.collect()
+    tracemalloc.start()
+    store = make_store()
+    for username, module, course in events(users, per_user):
+        store.mark_complete(username, module, course)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for username in users[:10000]:
+        store.completed(username)
+    read_us = (time.perf_counter() - start) / min(len(users), 10000) * 1e6
+    del store
+    return {
+        "bytes": current,
+        "peak_bytes": peak,
+        "bytes_per_user": current / len(users),
+        "bytes_per_completion": current / (len(users) * per_user),
+        "get_completed_us": read_us,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--per-user", type=int, default=5,
+                        help="completions per synthetic user")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    stores = {
+        "nested_dict": MemoryProgressStore,
+        "compact_bitset": lambda: CompactProgressStore(graph),
+    }
+    results = {}
+    for n in args.users:
+        users = [f"learner{i:07d}" for i in range(n)]
+        results[str(n)] = {name: measure(make, users, args.per_user)
+                           for name, make in stores.items()}
+        print(f"{n} users")
+        for name, stats in results[str(n)].items():
+            print(f"  {name:<16}{stats['bytes'] / 2**20:10.1f} MiB"
+                  f"{stats['bytes_per_completion']:8.1f} B/completion"
+                  f"{stats['get_completed_us']:8.2f} us/read")
+    print("results:", write_results("progress_memory", results, args, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# catalog.py
+# Course catalog loaded from files on disk (LMS_CATALOG_DIR, default ./catalog):
+#
+#   courses.json   {"Course": ["Module", ...], ...}
+#   modules.json   {"Module": {"hours": 2, "next": ["Module", ...]}, ...}
+#                  (key order is the graph order used for recommendations)
+#   bodies.txt     "@@ Module" header line, then that module's text, repeated
+#
+# Only metadata and body offsets stay in memory; bodies are read from a
+# memory-mapped bodies.txt when asked for. When any file changes, the
+# catalog is reloaded and validated, then swapped in atomically. Replace
+# files by renaming a new copy over them rather than editing in place.
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+import time
+from abc import abstractmethod
+from collections.abc import Mapping
+
+from curriculum import CurriculumGraph
+
+CATALOG_DIR = os.environ.get(
+    "LMS_CATALOG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog")
+)
+FILES = ("courses.json", "modules.json", "bodies.txt")
+HEADER = re.compile(rb"^@@ (.+?)\r?\n", re.M)
+
+
+class CatalogError(ValueError):
+    """The catalog files are missing, malformed or inconsistent."""
+
+
+# -------------------------------
+# One validated load of the files
+# -------------------------------
+class CatalogSnapshot:
+    """Immutable catalog metadata plus offsets into the mapped bodies."""
+
+    def __init__(self, courses, modules, offsets, bodies, version, stamp):
+        self.courses = courses      # course -> [module, ...]
+        self.modules = modules      # module -> {"hours": ..., "next": [...]}
+        self.graph = {m: list(meta.get("next", [])) for m, meta in modules.items()}
+        self.version = version
+        self.stamp = stamp
+        self._offsets = offsets     # module -> (start, end) in bodies
+        self._bodies = bodies
+
+    def content(self, module):
+        span = self._offsets.get(module)
+        if span is None or self._bodies is None:
+            return ""
+        return self._bodies[span[0]:span[1]].decode("utf-8")
+
+
+def _stamp(directory):
+    stamp = []
+    for name in FILES:
+        st = os.stat(os.path.join(directory, name))
+        stamp.append((st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+def load_snapshot(directory):
+    """Read and validate the catalog files; raise CatalogError if invalid."""
+    try:
+        stamp = _stamp(directory)
+        with open(os.path.join(directory, "courses.json"), "rb") as f:
+            courses_raw = f.read()
+        with open(os.path.join(directory, "modules.json"), "rb") as f:
+            modules_raw = f.read()
+        courses = json.loads(courses_raw)
+        modules = json.loads(modules_raw)
+        with open(os.path.join(directory, "bodies.txt"), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            bodies = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+    except (OSError, ValueError) as e:
+        raise CatalogError(f"Cannot read catalog in {directory}: {e}") from e
+
+    offsets = {}
+    if bodies is not None:
+        headers = list(HEADER.finditer(bodies))
+        for i, match in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(bodies)
+            offsets[match.group(1).decode("utf-8")] = (match.end(), end)
+
+    missing = [f"{c}: {m}" for c, names in courses.items() for m in names if m not in modules]
+    missing += [f"{m} -> {n}" for m, meta in modules.items()
+                for n in meta.get("next", []) if n not in modules]
+    if missing:
+        raise CatalogError("Catalog refers to unknown modules: " + "; ".join(missing))
+    unknown_bodies = [m for m in offsets if m not in modules]
+    if unknown_bodies:
+        raise CatalogError("bodies.txt has sections for unknown modules: " + ", ".join(unknown_bodies))
+    graph = {m: list(meta.get("next", [])) for m, meta in modules.items()}
+    try:
+        CurriculumGraph(graph).topological_order()
+    except ValueError as e:
+        raise CatalogError(str(e)) from e
+
+    digest = hashlib.sha1(courses_raw + b"\0" + modules_raw + b"\0" + repr(stamp[2]).encode())
+    return CatalogSnapshot(courses, modules, offsets, bodies, digest.hexdigest()[:16], stamp)
+
+
+# -------------------------------
+# Read-only views (always the current snapshot)
+# -------------------------------
+class ModuleDetails(Mapping):
+    """{"content": ..., "hours": ...} for one module; content read lazily."""
+
+    __slots__ = ("_snapshot", "_name")
+    KEYS = ("content", "hours")
+
+    def __init__(self, snapshot, name):
+        self._snapshot = snapshot
+        self._name = name
+
+    def __getitem__(self, key):
+        if key == "content":
+            return self._snapshot.content(self._name)
+        if key == "hours":
+            return self._snapshot.modules[self._name].get("hours", 0)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+
+class _View(Mapping):
+    """A Mapping over one part of the catalog's current snapshot."""
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    @abstractmethod
+    def _data(self):
+        """The snapshot dict whose keys this view iterates."""
+
+    def __iter__(self):
+        return iter(self._data())
+
+    def __len__(self):
+        return len(self._data())
+
+    def __contains__(self, key):
+        return key in self._data()
+
+
+class _ModuleContentView(_View):
+    """module -> ModuleDetails (the old ai_utils.module_content shape)."""
+
+    def _data(self):
+        return self._catalog.snapshot().modules
+
+    def __getitem__(self, name):
+        snapshot = self._catalog.snapshot()
+        if name not in snapshot.modules:
+            raise KeyError(name)
+        return ModuleDetails(snapshot, name)
+
+
+class _GraphView(_View):
+    """module -> [next modules] (the old ai_utils.graph shape)."""
+
+    def _data(self):
+        return self._catalog.snapshot().graph
+
+    def __getitem__(self, name):
+        return self._data()[name]
+
+
+class _CoursesView(_View):
+    """course -> [modules] (main.py's courses shape)."""
+
+    def _data(self):
+        return self._catalog.snapshot().courses
+
+    def __getitem__(self, course):
+        return self._data()[course]
+
+
+class _CourseDetailsView(_View):
+    """course -> {module: ModuleDetails} (app.py's courses shape)."""
+
+    def _data(self):
+        return self._catalog.snapshot().courses
+
+    def __getitem__(self, course):
+        snapshot = self._catalog.snapshot()
+        return {m: ModuleDetails(snapshot, m) for m in snapshot.courses[course]}
+
+
+# -------------------------------
+# Hot-reloading catalog
+# -------------------------------
+class Catalog:
+    """
+    The current CatalogSnapshot, re-checked at most every `poll_interval`
+    seconds (0 disables). An invalid edit is reported and the previous
+    snapshot keeps serving. Listeners get the new snapshot after a swap.
+    """
+
+    def __init__(self, directory=CATALOG_DIR, poll_interval=2.0):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._snapshot = load_snapshot(directory)
+        self._checked_at = time.monotonic()
+        self._failed_stamp = None
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.module_content = _ModuleContentView(self)
+        self.graph = _GraphView(self)
+        self.courses = _CoursesView(self)
+        self.course_details = _CourseDetailsView(self)
+
+    @property
+    def version(self):
+        return self.snapshot().version
+
+    def snapshot(self):
+        if self.poll_interval and time.monotonic() - self._checked_at >= self.poll_interval:
+            self._check()
+        return self._snapshot
+
+    def _check(self):
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            try:
+                stamp = _stamp(self.directory)
+                changed = stamp != self._snapshot.stamp and stamp != self._failed_stamp
+            except OSError:
+                changed = False
+        finally:
+            self._lock.release()
+        if changed:
+            self.reload()
+
+    def reload(self):
+        """Load the files again; return True if a new snapshot was swapped in."""
+        with self._lock:
+            try:
+                snapshot = load_snapshot(self.directory)
+            except CatalogError as e:
+                print("⚠️ Catalog reload failed, keeping the previous version:", e)
+                try:
+                    self._failed_stamp = _stamp(self.directory)
+                except OSError:
+                    self._failed_stamp = None
+                return False
+            self._snapshot = snapshot
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(snapshot)
+        return True
+
+    def on_reload(self, listener):
+        """Call `listener(snapshot)` after every successful reload."""
+        self._listeners.append(listener)
+
+
+catalog = Catalog(poll_interval=float(os.environ.get("LMS_CATALOG_POLL", "2")))
@@ -0,0 +1,338 @@
+# curriculum.py
+import hashlib
+import heapq
+import json
+import threading
+
+
+# -------------------------------
+# Per-user "ready frontier"
+# -------------------------------
+class _Frontier:
+    """Completed modules plus a heap of unlocked-but-not-completed ones."""
+
+    __slots__ = ("completed", "satisfied", "ready", "ready_set")
+
+    def __init__(self, roots):
+        self.completed = set()
+        self.satisfied = {}          # module -> number of completed prerequisites
+        self.ready = list(roots)     # heap of module indices (graph order)
+        self.ready_set = set(roots)  # same indices, without completed ones
+
+
+# -------------------------------
+# Indexed curriculum graph
+# -------------------------------
+class CurriculumGraph:
+    """
+    Prerequisite graph indexed once (reverse adjacency + in-degrees).
+
+    Recommendations follow the graph's dict order: the first module whose
+    prerequisites are all completed and which is not completed itself.
+    Each (user, course) keeps a frontier that is updated as modules are
+    completed, so a lookup is a heap peek instead of an O(V²) scan.
+
+    The graph is treated as immutable: build a new CurriculumGraph when it
+    changes. `version` is a content hash that callers can use as an ETag.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.order = list(graph)
+        self.index = {m: i for i, m in enumerate(self.order)}
+        self.prerequisites = {m: set() for m in self.order}
+        for module, next_modules in graph.items():
+            for nxt in next_modules:
+                if nxt in self.prerequisites:
+                    self.prerequisites[nxt].add(module)
+        self.successors = {
+            m: [n for n in dict.fromkeys(graph[m]) if n in self.index]
+            for m in self.order
+        }
+        self.in_degree = {m: len(p) for m, p in self.prerequisites.items()}
+        # Already sorted, so it is a valid heap to copy into new frontiers.
+        self.roots = [i for i, m in enumerate(self.order) if self.in_degree[m] == 0]
+        self.version = hashlib.sha1(json.dumps(graph).encode("utf-8")).hexdigest()
+        self._frontiers = {}
+        self._subtrees = None
+        self._tree_json = None
+        self._prerequisite_masks = None
+        self._closure = None
+        self._lock = threading.Lock()
+
+    def _complete(self, frontier, module):
+        if module in frontier.completed:
+            return
+        frontier.completed.add(module)
+        if module in self.index:
+            frontier.ready_set.discard(self.index[module])
+        for nxt in self.successors.get(module, ()):
+            count = frontier.satisfied.get(nxt, 0) + 1
+            frontier.satisfied[nxt] = count
+            if count == self.in_degree[nxt] and nxt not in frontier.completed:
+                heapq.heappush(frontier.ready, self.index[nxt])
+                frontier.ready_set.add(self.index[nxt])
+
+    def _seed(self, completed):
+        frontier = _Frontier(self.roots)
+        for module in completed:
+            self._complete(frontier, module)
+        return frontier
+
+    def _frontier(self, username, course, load_completed, refresh):
+        key = (username, course or None)
+        frontier = self._frontiers.get(key)
+        if frontier is None:
+            frontier = self._seed(load_completed() if load_completed else ())
+            self._frontiers[key] = frontier
+        elif refresh and load_completed:
+            for module in load_completed():
+                self._complete(frontier, module)
+        return frontier
+
+    def _peek(self, frontier):
+        ready = frontier.ready
+        while ready and self.order[ready[0]] in frontier.completed:
+            heapq.heappop(ready)
+        return self.order[ready[0]] if ready else None
+
+    def next_module(self, username, course=None, load_completed=None, refresh=False):
+        """
+        Return the next module for a user, or None when nothing is unlocked.
+
+        `load_completed` is called the first time a (user, course) frontier
+        is needed, to seed it from the progress store. With `refresh=True`
+        it is called every time and completions recorded elsewhere (e.g. by
+        another worker sharing the store) are folded into the frontier.
+        """
+        with self._lock:
+            frontier = self._frontier(username, course, load_completed, refresh)
+            return self._peek(frontier)
+
+    def ready_modules(self, username, course=None, load_completed=None, refresh=False):
+        """
+        Return (ready, completed): graph indices of every unlocked module
+        not yet completed, and of the completed ones that are in the graph.
+        """
+        with self._lock:
+            frontier = self._frontier(username, course, load_completed, refresh)
+            completed = [self.index[m] for m in frontier.completed if m in self.index]
+            return list(frontier.ready_set), completed
+
+    def record_completion(self, username, module, course=None):
+        """Update the user's frontiers after `module` was completed."""
+        keys = {(username, course or None), (username, None)}
+        with self._lock:
+            for key in keys:
+                frontier = self._frontiers.get(key)
+                if frontier is not None:
+                    self._complete(frontier, module)
+
+    def forget(self, username=None):
+        """Drop cached frontiers for one user, or for everybody."""
+        with self._lock:
+            if username is None:
+                self._frontiers.clear()
+            else:
+                for key in [k for k in self._frontiers if k[0] == username]:
+                    del self._frontiers[key]
+
+    # -------------------------------
+    # Bitset views (bit i = module self.order[i])
+    # -------------------------------
+    def mask(self, modules):
+        """Bitset of the given modules; names outside the graph are ignored."""
+        mask = 0
+        for module in modules:
+            i = self.index.get(module)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def is_unlocked(self, module, completed_mask):
+        """True if every prerequisite of `module` is set in `completed_mask`."""
+        if self._prerequisite_masks is None:
+            self._prerequisite_masks = [self.mask(self.prerequisites[m]) for m in self.order]
+        i = self.index.get(module)
+        if i is None:
+            return True
+        need = self._prerequisite_masks[i]
+        return completed_mask & need == need
+
+    # -------------------------------
+    # Reachability (transitive closure as bitsets)
+    # -------------------------------
+    def _build_closure(self):
+        # Modules are visited in topological order, preferring graph order
+        # among the unlocked ones (as next_module does), so every module's
+        # prerequisites already have their closure: the union of theirs.
+        remaining = dict(self.in_degree)
+        ready = list(self.roots)
+        reach = [0] * len(self.order)
+        rank = [0] * len(self.order)
+        position = 0
+        while ready:
+            i = heapq.heappop(ready)
+            module = self.order[i]
+            mask = 1 << i
+            for prerequisite in self.prerequisites[module]:
+                mask |= reach[self.index[prerequisite]]
+            reach[i] = mask
+            rank[i] = position
+            position += 1
+            for nxt in self.successors[module]:
+                remaining[nxt] -= 1
+                if remaining[nxt] == 0:
+                    heapq.heappush(ready, self.index[nxt])
+        if position != len(self.order):
+            self.topological_order()    # raises with the modules on the cycle
+        return reach, rank
+
+    def closure(self):
+        """
+        (reach, rank): reach[i] is the bitset of module i and everything it
+        depends on, directly or not; rank[i] is its place in study order.
+        Built on first use.
+        """
+        if self._closure is None:
+            self._closure = self._build_closure()
+        return self._closure
+
+    def is_prerequisite(self, module, goal):
+        """True if `goal` depends on `module`, directly or not (one bit test)."""
+        i, j = self.index.get(module), self.index.get(goal)
+        if i is None or j is None or i == j:
+            return False
+        return self.closure()[0][j] >> i & 1 == 1
+
+    def remaining_prerequisites(self, goal, completed_mask=0):
+        """
+        `goal` and every module it depends on that is not set in
+        `completed_mask`, in study order: prerequisites first, then graph
+        order, as next_module would suggest them.
+        """
+        j = self.index.get(goal)
+        if j is None:
+            return []
+        reach, rank = self.closure()
+        bits = bin(reach[j] & ~completed_mask)[:1:-1]     # bits[i] == "1": module i
+        needed = []
+        i = bits.find("1")
+        while i >= 0:
+            needed.append(i)
+            i = bits.find("1", i + 1)
+        needed.sort(key=rank.__getitem__)
+        return [self.order[i] for i in needed]
+
+    # -------------------------------
+    # Traversals
+    # -------------------------------
+    def topological_order(self):
+        """Modules with every prerequisite before its successors (Kahn)."""
+        remaining = dict(self.in_degree)
+        queue = [self.order[i] for i in self.roots]
+        for module in queue:
+            for nxt in self.successors[module]:
+                remaining[nxt] -= 1
+                if remaining[nxt] == 0:
+                    queue.append(nxt)
+        if len(queue) != len(self.order):
+            stuck = [m for m in self.order if remaining[m] > 0]
+            raise ValueError(f"Curriculum graph has a cycle through: {', '.join(stuck)}")
+        return queue
+
+    def learning_path(self, start):
+        """Depth-first (pre-order) path from `start`, without recursion."""
+        path = []
+        visited = set()
+        stack = [start]
+        while stack:
+            module = stack.pop()
+            if module in visited:
+                continue
+            visited.add(module)
+            path.append(module)
+            stack.extend(reversed(self.graph.get(module, [])))
+        return path
+
+    def _build_subtrees(self):
+        # Children are built before parents, so every node is expanded once
+        # and shared descendants reuse the same dict.
+        subtrees = {}
+        for module in reversed(self.topological_order()):
+            subtrees[module] = {child: subtrees.get(child, {}) for child in self.graph[module]}
+        return subtrees
+
+    def subtree(self, node):
+        """Nested {child: {...}} below `node`; shared, so treat as read-only."""
+        with self._lock:
+            if self._subtrees is None:
+                self._subtrees = self._build_subtrees()
+            return self._subtrees.get(node, {})
+
+    def knowledge_tree(self):
+        """{root: subtree} for every module without prerequisites."""
+        return {self.order[i]: self.subtree(self.order[i]) for i in self.roots}
+
+    def knowledge_tree_json(self):
+        """
+        The knowledge tree serialized once (same text as json.dumps).
+        Written with an explicit stack, so deep chains don't hit the
+        recursion limit and the cost is linear in the output size.
+        """
+        with self._lock:
+            if self._tree_json is not None:
+                return self._tree_json
+        tree = self.knowledge_tree()
+        encoded = {}
+        parts = ["{"]
+        stack = [iter(tree.items())]
+        first = [True]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                first.pop()
+                parts.append("}")
+                continue
+            if not first[-1]:
+                parts.append(", ")
+            first[-1] = False
+            name, children = item
+            if name not in encoded:
+                encoded[name] = json.dumps(name) + ": {"
+            parts.append(encoded[name])
+            stack.append(iter(children.items()))
+            first.append(True)
+        with self._lock:
+            self._tree_json = "".join(parts)
+            return self._tree_json
+
+
+# -------------------------------
+# Study planning
+# -------------------------------
+def plan_weeks(modules, hours, weekly_hours):
+    """
+    Pack `modules`, in order, into weeks of at most `weekly_hours` using
+    `hours(module)`. A module longer than what is left of a week continues
+    into the next one, so it can appear in several weeks.
+    """
+    if weekly_hours <= 0:
+        raise ValueError("weekly_hours must be positive")
+    weeks = []
+    items, used = [], 0.0
+    for module in modules:
+        todo = float(hours(module) or 0)
+        while used + todo > weekly_hours + 1e-9:
+            part = weekly_hours - used
+            if part > 1e-9:
+                items.append({"module": module, "hours": round(part, 2)})
+            weeks.append({"week": len(weeks) + 1, "hours": round(float(weekly_hours), 2), "modules": items})
+            items, used = [], 0.0
+            todo -= part
+        items.append({"module": module, "hours": round(todo, 2)})
+        used += todo
+    if items:
+        weeks.append({"week": len(weeks) + 1, "hours": round(used, 2), "modules": items})
+    return weeks
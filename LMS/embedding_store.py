@@ -0,0 +1,176 @@
+# embedding_store.py
+import hashlib
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from ai_providers import get_provider
+
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+# -------------------------------
+# Embedders: callables mapping a list of texts to a list of vectors
+# -------------------------------
+def openai_embedder(model=OPENAI_EMBEDDING_MODEL):
+    """Embed a whole batch of texts with one embeddings.create request."""
+    def embed(texts):
+        resp = get_provider("openai").embeddings.create(model=model, input=list(texts))
+        return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+    embed.model = model
+    return embed
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder (signed feature hashing of word tokens).
+    Needs no network, so offline runs and tests get stable vectors.
+    """
+
+    TOKEN = re.compile(r"[a-z0-9_]+")
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.model = f"hashing-{dim}"
+
+    def __call__(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in self.TOKEN.findall(text.lower()):
+                h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+                out[i, h % self.dim] += 1.0 if (h >> 63) else -1.0
+            norm = np.linalg.norm(out[i])
+            if norm:
+                out[i] /= norm
+        return out
+
+
+# -------------------------------
+# Persistent store
+# -------------------------------
+class EmbeddingStore:
+    """
+    Embeddings keyed by sha256(model, text), persisted in a subdirectory of
+    `directory` named after the model, so embedders of different models or
+    sizes never share a file:
+
+        meta.json    {"model": ..., "dim": ...}
+        vectors.f32  float32 rows, memory-mapped for reads
+        index.txt    "<key> <row>" per line, appended after the vectors
+
+    A subdirectory whose meta.json names another model, or whose vectors
+    are missing, is started afresh. Cache misses in a call are de-duplicated and sent to `embed_batch` in
+    as few requests as possible (at most `max_batch` texts each). Only one
+    process should write to a directory at a time.
+    """
+
+    def __init__(self, directory, embed_batch, model=None, max_batch=2048):
+        self.directory = directory
+        self.embed_batch = embed_batch
+        self.model = model or getattr(embed_batch, "model", "unknown")
+        self.max_batch = max_batch
+        self.hits = 0
+        self.misses = 0
+        self.remote_calls = 0
+        self.dim = None
+        self._rows = {}
+        self._count = 0
+        self._matrix = None
+        self._lock = threading.Lock()
+        directory = os.path.join(directory, re.sub(r"[^A-Za-z0-9._-]+", "_", self.model))
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._index_path = os.path.join(directory, "index.txt")
+        self._load()
+
+    @staticmethod
+    def key(model, text):
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _reset(self):
+        for path in (self._meta_path, self._vectors_path, self._index_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model or not os.path.exists(self._vectors_path):
+            self._reset()
+            return
+        self.dim = meta["dim"]
+        self._count = os.path.getsize(self._vectors_path) // (4 * self.dim)
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as f:
+                for line in f:
+                    parts = line.split()
+                    # Skip a torn last line or rows whose vector never landed.
+                    if len(parts) == 2 and int(parts[1]) < self._count:
+                        self._rows[parts[0]] = int(parts[1])
+        self._remap()
+
+    def _remap(self):
+        if self._count:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                     shape=(self._count, self.dim))
+
+    def _append(self, batch):
+        vectors = np.asarray(self.embed_batch([text for _, text in batch]), dtype=np.float32)
+        self.remote_calls += 1
+        if vectors.ndim != 2 or len(vectors) != len(batch):
+            raise ValueError(f"{self.model} returned {vectors.shape} for {len(batch)} texts")
+        if self.dim is not None and vectors.shape[1] != self.dim:
+            raise ValueError(f"{self.model} returned {vectors.shape[1]}-dim vectors, "
+                             f"the store holds {self.dim}")
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with open(self._meta_path, "w") as f:
+                json.dump({"model": self.model, "dim": self.dim}, f)
+        first = self._count
+        with open(self._vectors_path, "ab") as f:
+            f.write(vectors.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self._index_path, "a") as f:
+            f.writelines(f"{key} {first + i}\n" for i, (key, _) in enumerate(batch))
+        for i, (key, _) in enumerate(batch):
+            self._rows[key] = first + i
+        self._count += len(batch)
+
+    def get_many(self, texts):
+        """Return a (len(texts), dim) float32 array, embedding only misses."""
+        keys = [self.key(self.model, t) for t in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self._rows:
+                    missing.setdefault(key, text)
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+            if missing:
+                items = list(missing.items())
+                for start in range(0, len(items), self.max_batch):
+                    self._append(items[start:start + self.max_batch])
+                self._remap()
+            if not keys:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            return np.array(self._matrix[[self._rows[k] for k in keys]])
+
+    def get(self, text):
+        return self.get_many([text])[0]
+
+    def __len__(self):
+        return len(self._rows)
+
+
+def module_texts(module_content):
+    """Text embedded for each module: its title followed by its body."""
+    return {name: f"{name}\n\n{details.get('content', '')}".strip()
+            for name, details in module_content.items()}
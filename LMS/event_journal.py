@@ -0,0 +1,385 @@
+# event_journal.py
+# Append-only journal of learning events (module views, completions, quiz
+# submissions, chat questions), one JSON object per line:
+#
+#   {"ts": 1760000000.123, "type": "view", "user": "ann", "module": "Loops", ...}
+#
+# Request threads only append to an in-memory queue. A background thread
+# writes whatever has queued up in one write + fsync (group commit) to
+# segment files events-00000001.ndjson, ... in LMS_JOURNAL_DIR (unset or
+# empty: no journal), starting a new segment every LMS_JOURNAL_SEGMENT_MB.
+# Worker processes may share a directory: every write and segment switch
+# happens under an exclusive lock on journal.lock (POSIX only; elsewhere
+# give each process its own directory).
+#
+# Consumers tail the segments and fold them into aggregates, saving
+# snapshots (aggregate + position) so a restart replays only the tail:
+#
+#   python event_journal.py fold            # catch up, print the aggregate
+#   python event_journal.py fold --follow   # keep folding as events arrive
+#   python event_journal.py tail            # print events as they arrive
+import argparse
+import atexit
+import contextlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SEGMENT = re.compile(r"^events-(\d{8})\.ndjson$")
+SEGMENT_BYTES = int(float(os.environ.get("LMS_JOURNAL_SEGMENT_MB", "64")) * 1024 * 1024)
+MAX_PENDING = 100000
+LOCK_NAME = "journal.lock"
+
+
+def segment_name(number):
+    return f"events-{number:08d}.ndjson"
+
+
+def segments(directory):
+    """[(number, path)] of the journal's segments, oldest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    found = [(int(m.group(1)), os.path.join(directory, name))
+             for name, m in ((n, SEGMENT.match(n)) for n in names) if m]
+    return sorted(found)
+
+
+# -------------------------------
+# Writing
+# -------------------------------
+class EventJournal:
+    """
+    append() never blocks on I/O: events wait in a queue for the writer
+    thread, and are dropped (and counted) if more than `max_pending` are
+    waiting. flush() waits until everything appended so far is on disk.
+    A batch that cannot be written is lost and counted in `failed`, not
+    `written`.
+
+    Each batch is written while holding the directory's lock, after
+    switching to the newest segment if another process started one, so a
+    segment is never written to once the next one exists, and a half line
+    is only ever left by a writer that died.
+    """
+
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES, fsync=True, max_pending=MAX_PENDING):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.max_pending = max_pending
+        self.appended = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, LOCK_NAME), "ab")
+        with self._locked():
+            existing = segments(directory)
+            self._open(existing[-1][0] if existing else 1)
+        self._thread = threading.Thread(target=self._run, name="event-journal", daemon=True)
+        self._thread.start()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the directory's lock (a no-op without fcntl)."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _path(self, number):
+        return os.path.join(self.directory, segment_name(number))
+
+    @staticmethod
+    def _repair(path):
+        """
+        Cut half a line left at the end by a writer that crashed, so the
+        next event starts on a line of its own. Call with the lock held.
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(max(0, size - 65536))
+                tail = f.read()
+                if not tail.endswith(b"\n"):
+                    f.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+
+    def _open(self, number):
+        path = self._path(number)
+        self._repair(path)
+        self._number = number
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+
+    def _follow(self):
+        """Catch up with other processes' writes; call with the lock held."""
+        while os.path.exists(self._path(self._number + 1)):
+            self._file.close()
+            self._open(self._number + 1)
+        if os.fstat(self._file.fileno()).st_size != self._size:
+            self._repair(self._path(self._number))
+            self._size = os.fstat(self._file.fileno()).st_size
+
+    def append(self, type, **fields):
+        """Queue one event; returns False if it was dropped."""
+        event = {"ts": round(time.time(), 3), "type": type}
+        event.update(fields)
+        with self._cond:
+            if self._closed or len(self._queue) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._queue.append(event)
+            self.appended += 1
+            self._cond.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue and self._closed:
+                    return
+                batch, self._queue = self._queue, deque()
+            try:
+                self._write(batch)
+                ok = True
+            except Exception as e:
+                print("⚠️ Could not write journal events:", e, file=sys.stderr)
+                ok = False
+            with self._cond:
+                if ok:
+                    self.written += len(batch)
+                    self.batches += 1
+                else:
+                    self.failed += len(batch)
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        data = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in batch).encode("utf-8")
+        with self._locked():
+            self._follow()
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._size += len(data)
+            if self._size >= self.segment_bytes:
+                self._file.close()
+                self._open(self._number + 1)
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every event appended so far is written; False on timeout
+        or if a batch could not be written meanwhile.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            target, failed = self.appended, self.failed
+            while self.written + self.failed < target:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cond.wait(left)
+            return self.failed == failed
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5.0)
+        self._file.close()
+        self._lock_file.close()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "appended": self.appended,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "pending": len(self._queue),
+                "batches": self.batches,
+                "segment": self._number,
+            }
+
+
+# -------------------------------
+# Reading
+# -------------------------------
+def read_events(directory, position=(0, 0)):
+    """
+    Yield (event, position after it) for every complete line from
+    `position` = (segment number, byte offset) on. A line still being
+    written ends the scan; the next call resumes from the last position.
+    """
+    start_segment, start_offset = position
+    for number, path in segments(directory):
+        if number < start_segment:
+            continue
+        offset = start_offset if number == start_segment else 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                offset += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                yield event, (number, offset)
+
+
+class Activity:
+    """Event counts in total, per module, per day, and per user with last-seen time."""
+
+    def __init__(self, state=None):
+        self.state = state or {"events": {}, "modules": {}, "days": {}, "users": {}}
+
+    def apply(self, event):
+        kind = event.get("type", "?")
+        state = self.state
+        state["events"][kind] = state["events"].get(kind, 0) + 1
+        module = event.get("module")
+        if module:
+            counts = state["modules"].setdefault(module, {})
+            counts[kind] = counts.get(kind, 0) + 1
+        day = time.strftime("%Y-%m-%d", time.gmtime(event.get("ts", 0)))
+        counts = state["days"].setdefault(day, {})
+        counts[kind] = counts.get(kind, 0) + 1
+        user = event.get("user")
+        if user:
+            seen = state["users"].setdefault(user, {"events": 0, "last_seen": 0})
+            seen["events"] += 1
+            seen["last_seen"] = max(seen["last_seen"], event.get("ts", 0))
+
+
+class Consumer:
+    """
+    Folds the journal into `aggregate` (anything with .state and
+    .apply(event)). A snapshot is saved to `snapshot_path` every
+    `snapshot_every` events and by save(); a new Consumer starts from it.
+    """
+
+    def __init__(self, directory, aggregate=None, snapshot_path=None, snapshot_every=100000):
+        self.directory = directory
+        self.aggregate = aggregate or Activity()
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.position = (0, 0)
+        self.replayed = 0
+        if snapshot_path and os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as f:
+                saved = json.load(f)
+            self.position = tuple(saved["position"])
+            self.aggregate.state = saved["state"]
+
+    def catch_up(self):
+        """Apply every event written since the last call; returns how many."""
+        count = 0
+        since_snapshot = 0
+        apply = self.aggregate.apply
+        for event, position in read_events(self.directory, self.position):
+            apply(event)
+            self.position = position
+            count += 1
+            since_snapshot += 1
+            if since_snapshot >= self.snapshot_every:
+                self.save()
+                since_snapshot = 0
+        self.replayed += count
+        return count
+
+    def save(self):
+        if not self.snapshot_path:
+            return
+        tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"position": list(self.position), "state": self.aggregate.state}, f)
+        os.replace(tmp, self.snapshot_path)
+
+    def follow(self, interval=1.0, stop=None, on_update=None):
+        """
+        catch_up() every `interval` seconds until `stop` (an Event) is set,
+        calling `on_update(count)` after each one that found events.
+        """
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                count = self.catch_up()
+                if count and on_update:
+                    on_update(count)
+                stop.wait(interval)
+        finally:
+            self.save()
+
+
+# -------------------------------
+# Process-wide journal
+# -------------------------------
+def make_journal():
+    """The journal configured by LMS_JOURNAL_DIR, or None when it is unset or empty."""
+    directory = os.environ.get("LMS_JOURNAL_DIR", "")
+    if not directory:
+        return None
+    journal = EventJournal(directory, fsync=os.environ.get("LMS_JOURNAL_FSYNC", "1") != "0")
+    atexit.register(journal.close)
+    return journal
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["fold", "tail"])
+    parser.add_argument("--dir", default=os.environ.get("LMS_JOURNAL_DIR") or "journal")
+    parser.add_argument("--snapshot", default=None,
+                        help="snapshot file (default: <dir>/activity.snapshot.json)")
+    parser.add_argument("--follow", action="store_true")
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "tail":
+        existing = segments(args.dir)
+        position = (existing[-1][0], os.path.getsize(existing[-1][1])) if existing else (0, 0)
+        while True:
+            for event, position in read_events(args.dir, position):
+                print(json.dumps(event), flush=True)
+            time.sleep(args.interval)
+
+    consumer = Consumer(args.dir, Activity(),
+                        args.snapshot or os.path.join(args.dir, "activity.snapshot.json"))
+    start = time.perf_counter()
+    count = consumer.catch_up()
+    consumer.save()
+    print(f"folded {count} new events in {time.perf_counter() - start:.2f}s "
+          f"(position {consumer.position})", file=sys.stderr)
+    print(json.dumps(consumer.aggregate.state["events"]), flush=True)
+    if args.follow:
+        consumer.follow(args.interval, on_update=lambda n: print(
+            json.dumps(consumer.aggregate.state["events"]), flush=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# learner_stats.py
+import hashlib
+import json
+import threading
+
+
+class CourseLayout:
+    """
+    Course modules and hour totals for one catalog version, and the
+    (course, hours) pairs each module counts towards. `key` changes only
+    when courses, their modules or hours do, so stores can tell whether
+    their running totals still apply.
+    """
+
+    __slots__ = ("version", "snapshot", "courses", "module_courses", "key")
+
+    def __init__(self, snapshot):
+        self.version = snapshot.version
+        self.snapshot = snapshot
+        self.courses = {}           # course -> (modules, total hours)
+        self.module_courses = {}    # module -> [(course, hours)]
+        for course, modules in snapshot.courses.items():
+            hours = sum(snapshot.modules[m].get("hours", 0) for m in modules)
+            self.courses[course] = (modules, hours)
+            for m in modules:
+                self.module_courses.setdefault(m, []).append((course, snapshot.modules[m].get("hours", 0)))
+        self.key = hashlib.sha256(json.dumps(
+            sorted(self.module_courses.items()), separators=(",", ":")
+        ).encode("utf-8")).hexdigest()
+
+    def hours(self, module):
+        return self.snapshot.modules[module].get("hours", 0)
+
+
+# -------------------------------
+# Per-course summaries read from the progress store
+# -------------------------------
+class LearnerStats:
+    """
+    Completed modules and hours, percent complete and mean quiz score per
+    (user, course). The running totals are kept by the progress store
+    returned by `get_store()` (see track_courses in progress_store.py),
+    which updates them in the same write as each completion or quiz score,
+    so workers sharing a store agree and a restart loses only what the
+    store loses. Course membership and hours are indexed once per catalog
+    version; attach() hands them to the store.
+    """
+
+    def __init__(self, source, get_store):
+        self.source = source
+        self.get_store = get_store
+        self._layout = None
+        self._lock = threading.Lock()
+
+    def _catalog_layout(self):
+        snapshot = self.source.snapshot()
+        with self._lock:
+            if self._layout is None or self._layout.version != snapshot.version:
+                self._layout = CourseLayout(snapshot)
+            return self._layout
+
+    def attach(self):
+        """Have the current store keep totals for the current catalog; returns both."""
+        layout = self._catalog_layout()
+        store = self.get_store()
+        if store.layout is not layout:
+            store.track_courses(layout)
+        return store, layout
+
+    @staticmethod
+    def _completions(store, username):
+        """{module: completion time or None} for the user, across courses."""
+        completion_times = getattr(store, "completion_times", None)
+        if completion_times is not None:
+            return completion_times(username)
+        return dict.fromkeys(store.completed(username))
+
+    # -------------------------------
+    # Reads
+    # -------------------------------
+    def scores(self, username, course):
+        """{module: latest score or None} for the course's modules, in order."""
+        layout = self._catalog_layout()
+        scores = self.get_store().scores(username)
+        modules = layout.courses.get(course, ((), 0))[0]
+        return {m: scores.get(m) for m in modules}
+
+    def course_summary(self, username, course):
+        """Aggregates for one course plus a row per module, or None."""
+        store, layout = self.attach()
+        if course not in layout.courses:
+            return None
+        modules, total_hours = layout.courses[course]
+        totals = store.course_totals(username, course)
+        completions = self._completions(store, username)
+        scores = store.scores(username)
+        rows = [{
+            "module": module,
+            "hours": layout.hours(module),
+            "completed_at": completions.get(module),
+            "score": scores.get(module),
+        } for module in modules]
+        completed, scored = totals["completed"], totals["scored"]
+        return {
+            "course": course,
+            "completed": completed,
+            "total": len(modules),
+            "percent_complete": round(100 * completed / len(modules), 1) if modules else 0.0,
+            "completed_hours": totals["hours"],
+            "total_hours": total_hours,
+            "mean_score": round(totals["score_sum"] / scored, 1) if scored else None,
+            "modules": rows,
+        }
@@ -1,6 +1,25 @@
-from flask import Flask, render_template, request, redirect, session, url_for, jsonify
-from ai_utils import get_recommendations, mark_module_complete, get_completed_modules
-import google.generativeai as genai
+import time
+import uuid
+
+from flask import Flask, Response, abort, render_template, request, redirect, session, url_for, jsonify
+from ai_utils import get_recommendations, mark_module_complete, get_completed_modules, get_knowledge_tree_json
+from ai_utils import import_progress, iter_progress, record_event
+from ai_utils import get_course_summary, get_module_scores, grading_queue
+from ai_utils import get_course_analytics, get_study_plan
+from ai_utils import module_content
+from ai_providers import GEMINI_MODEL, chat_model
+from response_cache import ResponseCache
+from ai_stream import stream_answer
+from ai_executor import CircuitOpenError, ai_executor
+from metrics import instrument_app, record_ai_response
+from profiling import install_profiler
+from assets import install_assets
+from page_cache import PageCache
+from catalog import catalog
+from question_bank import question_bank
+from search_index import search_index
+from rag_context import context_assembler
+from progress_io import NDJSON_MIMETYPE, NDJSONError, is_authorized, iter_ndjson
 
 # ---------------------------------------------------
 # Initialize Flask
@@ -8,32 +27,72 @@ import google.generativeai as genai
 app = Flask(__name__)
 app.secret_key = "secret123"
 
+# Request latency histograms and GET /metrics (Prometheus text format).
+instrument_app(app)
+
+# Opt-in cProfile sampling and slow-request log (LMS_PROFILE_*, see profiling.py).
+install_profiler(app)
+
+# Hashed, precompressed CSS/JS served from /assets/ (see assets.py).
+install_assets(app)
+
 # ---------------------------------------------------
 # Configure Gemini AI
+# The client is created on first use (see ai_providers.py); set
+# GEMINI_API_KEY, or LMS_AI_PROVIDER=fake to run without the AI.
 # ---------------------------------------------------
-genai.configure(api_key="YOUR_GEMINI_API_KEY_HERE")  # Replace with your Gemini API key
-model = genai.GenerativeModel("gemini-1.5-flash")
+MODEL_NAME = GEMINI_MODEL
+
+# Repeated questions are answered from memory (LRU, 10 minute TTL).
+response_cache = ResponseCache(maxsize=512, ttl=600)
 
 # ---------------------------------------------------
-# Course Data with Expanded Modules
+# Course Data with Expanded Modules (catalog/courses.json, hot-reloaded)
 # ---------------------------------------------------
-courses = {
-    "Python Basics": ["Variables", "Data Types", "Loops", "Functions", "Modules"],
-    "OOP": ["Classes", "Inheritance", "Polymorphism", "OOP Projects"]
-}
+courses = catalog.courses
+
+# Rendered course/module pages are cached until the catalog changes.
+page_cache = PageCache(lambda: catalog.version)
 
 # ---------------------------------------------------
 # AI Response (Hybrid Mode)
 # ---------------------------------------------------
-def get_ai_response(prompt):
-    """Returns an AI-generated or fallback response."""
+def generate_answer(prompt):
+    """Ask the model directly; raises if the upstream call fails."""
+    response = chat_model().generate_content(prompt)
+    return response.text.strip()
+
+def generate_answer_stream(prompt):
+    """Yield answer text chunks as the model produces them."""
+    for chunk in chat_model().generate_content(prompt, stream=True):
+        yield chunk.text
+
+def fallback_response(prompt):
+    """Basic answer used when the AI cannot be reached."""
+    return "🤖 I couldn’t connect to AI, but here’s something basic:\n" \
+           f"{prompt.split('.')[0]} — this is an important concept. Let’s study it together!"
+
+def get_ai_response(question, module=None):
+    """
+    Returns an AI-generated or fallback response. The question is sent with
+    the most relevant course notes (see rag_context.py). The model call runs
+    on the bounded AI executor, so a slow or failing upstream costs at most
+    its deadline, or nothing at all once the circuit breaker is open.
+    """
+    start = time.perf_counter()
+    prompt = context_assembler.prompt(question, module)
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        answer = response_cache.get_or_compute(
+            prompt, MODEL_NAME, lambda: ai_executor.call(lambda: generate_answer(prompt))
+        )
+        outcome = "success"
+    except CircuitOpenError:
+        answer, outcome = fallback_response(question), "fallback"
     except Exception as e:
         print("⚠️ Gemini AI Error:", e)
-        return "🤖 I couldn’t connect to AI, but here’s something basic:\n" \
-               f"{prompt.split('.')[0]} — this is an important concept. Let’s study it together!"
+        answer, outcome = fallback_response(question), "fallback"
+    record_ai_response(outcome, time.perf_counter() - start)
+    return answer
 
 # ---------------------------------------------------
 # Login Page
@@ -54,7 +113,9 @@ def courses_page():
     username = session.get("username")
     if not username:
         return redirect("/")
-    return render_template("courses.html", courses=courses.keys())
+    return page_cache.page(
+        ("courses.html",), lambda: render_template("courses.html", courses=courses.keys())
+    )
 
 # ---------------------------------------------------
 # Modules Page
@@ -65,9 +126,10 @@ def modules_page(cname):
     if not username:
         return redirect("/")
     module_names = courses.get(cname, [])
-    from ai_utils import module_content
     modules = {m: module_content[m] for m in module_names if m in module_content}
-    return render_template("modules.html", course=cname, modules=modules)
+    return page_cache.page(
+        ("modules.html", cname), lambda: render_template("modules.html", course=cname, modules=modules)
+    )
 
 # ---------------------------------------------------
 # Module Content Page
@@ -77,18 +139,11 @@ def module_content_page(cname, mname):
     username = session.get("username")
     if not username:
         return redirect("/")
-    from ai_utils import module_content
     details = module_content.get(mname)
+    record_event("view", username, module=mname, course=cname)
     mark_module_complete(username, mname)
     recommendation = get_recommendations(username)
-    return render_template(
-        "module_content.html",
-        course=cname,
-        module=mname,
-        details=details,
-        recommendation=recommendation,
-        username=username
-    )
+    return page_cache.module_page(cname, mname, details, username, recommendation)
 
 # ---------------------------------------------------
 # AI Chat (AJAX)
@@ -97,9 +152,100 @@ def module_content_page(cname, mname):
 def ask_ai():
     data = request.get_json()
     user_message = data.get("message", "")
-    response = get_ai_response(user_message)
+    record_event("chat", session.get("username"), module=data.get("module"), question=user_message[:500])
+    response = get_ai_response(user_message, data.get("module"))
     return jsonify({"response": response})
 
+@app.route("/ask_ai/stream", methods=["GET", "POST"])
+def ask_ai_stream():
+    """Stream the answer as Server-Sent Events while the model writes it."""
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+    else:
+        data = request.args
+    user_message = data.get("message", "")
+    record_event("chat", session.get("username"), module=data.get("module"), question=user_message[:500])
+    prompt = context_assembler.prompt(user_message, data.get("module"))
+
+    cached = response_cache.get(prompt, MODEL_NAME)
+    if cached is not None:
+        events = stream_answer(lambda prompt: [cached], prompt, cached)
+    else:
+        events = stream_answer(
+            generate_answer_stream, prompt, fallback_response(user_message),
+            on_complete=lambda text: response_cache.put(prompt, MODEL_NAME, text),
+            submit=ai_executor.submit, deadline=ai_executor.timeout,
+        )
+    return Response(events, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/ai/status")
+def ai_status():
+    """Queue depth, concurrency and circuit breaker state of the AI executor."""
+    return jsonify(ai_executor.stats())
+
+# ---------------------------------------------------
+# Knowledge Tree (JSON, cached until the graph changes)
+# ---------------------------------------------------
+@app.route("/knowledge_tree")
+def knowledge_tree():
+    tree_json, version = get_knowledge_tree_json()
+    response = Response(tree_json, mimetype="application/json")
+    response.set_etag(version)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+# ---------------------------------------------------
+# Cohort Analytics (JSON, recomputed only when progress changes)
+# ---------------------------------------------------
+@app.route("/analytics/<course>")
+def course_analytics(course):
+    if not session.get("username"):
+        return jsonify({"error": "not logged in"}), 401
+    report = get_course_analytics(course)
+    if report is None:
+        return jsonify({"error": "unknown course"}), 404
+    response = jsonify(report)
+    response.set_etag(report["version"])
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
+
+# ---------------------------------------------------
+# Study Plan (JSON): what is left before a goal module, week by week
+# ---------------------------------------------------
+@app.route("/plan/<goal>")
+def study_plan(goal):
+    username = session.get("username")
+    if not username:
+        return jsonify({"error": "not logged in"}), 401
+    weekly_hours = request.args.get("hours", 5, type=float)
+    if not weekly_hours or weekly_hours <= 0:
+        return jsonify({"error": "hours must be a positive number"}), 400
+    plan = get_study_plan(username, goal, weekly_hours)
+    if plan is None:
+        return jsonify({"error": "unknown module"}), 404
+    return jsonify(plan)
+
+# ---------------------------------------------------
+# Search (JSON, BM25 over module titles and text)
+# ---------------------------------------------------
+@app.route("/search")
+def search():
+    if not session.get("username"):
+        return jsonify({"error": "not logged in"}), 401
+    query = request.args.get("q", "")
+    limit = min(request.args.get("limit", 10, type=int), 50)
+    start = time.perf_counter()
+    results = search_index.search(query, limit=limit)
+    for result in results:
+        if result["courses"]:
+            result["url"] = url_for("module_content_page", cname=result["courses"][0], mname=result["module"])
+    return jsonify({
+        "query": query,
+        "results": results,
+        "took_ms": round((time.perf_counter() - start) * 1000, 3),
+    })
+
 # ---------------------------------------------------
 # Quiz Page
 # ---------------------------------------------------
@@ -109,59 +255,40 @@ def quiz(course, module):
     if not username:
         return redirect("/")
 
-    module_questions = {
-        "Variables": [
-            "What are variables and why are they used in Python?",
-            "Give an example of declaring and using a variable."
-        ],
-        "Data Types": [
-            "Explain the different data types in Python.",
-            "How would you convert between different data types?"
-        ],
-        "Loops": [
-            "Describe the types of loops in Python and their uses.",
-            "Write an example of a 'for' loop iterating over a list."
-        ],
-        "Functions": [
-            "What is a function and why are functions important?",
-            "Demonstrate a simple function with parameters and return value."
-        ],
-        "Modules": [
-            "What is a Python module and how do you use it?",
-            "Give an example of importing and using a module."
-        ],
-        "Classes": [
-            "Explain the concept of a class in OOP.",
-            "Create a simple class with attributes and methods."
-        ],
-        "Inheritance": [
-            "What is inheritance in OOP?",
-            "Provide an example of a parent and child class in Python."
-        ],
-        "Polymorphism": [
-            "Define polymorphism and its types in OOP.",
-            "Give an example demonstrating method overriding."
-        ],
-        "OOP Projects": [
-            "Explain how OOP concepts are applied in a real project.",
-            "Describe one small project you can implement using classes."
-        ]
-    }
-
-    questions = module_questions.get(module, [
-        "Explain the key concept of this module.",
-        "Give an example related to this module."
-    ])
+    questions = question_bank.get(module)
 
     if request.method == "POST":
+        answers = [request.form.get(f"answer_{i+1}", "") for i in range(len(questions))]
+        job = grading_queue().submit(username, course, module, questions, answers,
+                                     key=request.form.get("submission_id"))
         mark_module_complete(username, module)
         next_module = get_recommendations(username)
         if next_module:
-            return redirect(url_for("module_content_page", cname=course, mname=next_module))
+            next_url = url_for("module_content_page", cname=course, mname=next_module)
         else:
-            return redirect(url_for("summary", course_name=course))
+            next_url = url_for("summary", course_name=course)
+        # quiz.js posts for JSON and polls the job for the score.
+        if request.accept_mimetypes.best == "application/json":
+            job.update(status_url=url_for("quiz_job", job_id=job["id"]), next_url=next_url)
+            return jsonify(job), 202
+        return redirect(next_url)
 
-    return render_template("quiz.html", course=course, module=module, questions=questions)
+    return render_template("quiz.html", course=course, module=module, questions=questions,
+                           submission_id=uuid.uuid4().hex)
+
+# ---------------------------------------------------
+# Quiz grading status (JSON; ?wait=<seconds> long-polls)
+# ---------------------------------------------------
+@app.route("/quiz/jobs/<job_id>")
+def quiz_job(job_id):
+    username = session.get("username")
+    if not username:
+        return jsonify({"error": "not logged in"}), 401
+    wait = min(max(request.args.get("wait", 0, type=float), 0), 25)
+    job = grading_queue().wait(job_id, wait, username=username)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job)
 
 # ---------------------------------------------------
 # Summary Page
@@ -171,16 +298,17 @@ def summary(course_name):
     username = session.get("username")
     if not username:
         return redirect("/")
-    from ai_utils import module_content
-    scores = {m: 80 for m in courses[course_name]}
-    hours = sum(module_content[m]["hours"] for m in courses[course_name])
+    stats = get_course_summary(username, course_name)
+    if stats is None:
+        abort(404)
     recommendation = get_recommendations(username)
     return render_template(
         "summary.html",
         username=username,
         course_name=course_name,
-        scores=scores,
-        hours=hours,
+        scores=get_module_scores(username, course_name),
+        hours=stats["total_hours"],
+        stats=stats,
         recommendation=recommendation
     )
 
@@ -189,9 +317,40 @@ def summary(course_name):
 # ---------------------------------------------------
 @app.route('/progress/<course_name>')
 def progress_chart(course_name):
-    username = session.get("username", "Student")
-    scores = {m: 80 for m in courses[course_name]}
-    return render_template('progress.html', course_name=course_name, scores=scores)
+    if not session.get("username"):
+        return redirect("/")
+    return render_template('progress.html', course_name=course_name)
+
+@app.route('/progress/<course_name>/data')
+def progress_data(course_name):
+    """Scores and course totals for the logged-in user (fetched by progress.html)."""
+    username = session.get("username")
+    if not username:
+        return jsonify({"error": "not logged in"}), 401
+    stats = get_course_summary(username, course_name)
+    if stats is None:
+        return jsonify({"error": "unknown course"}), 404
+    return jsonify(stats)
+
+# ---------------------------------------------------
+# Progress Export / Import (NDJSON, needs LMS_ADMIN_TOKEN)
+# ---------------------------------------------------
+@app.route("/progress/export")
+def progress_export():
+    if not is_authorized(request.headers.get("Authorization")):
+        return jsonify({"error": "unauthorized"}), 403
+    return Response(iter_ndjson(iter_progress()), mimetype=NDJSON_MIMETYPE)
+
+@app.route("/progress/import", methods=["POST"])
+def progress_import():
+    if not is_authorized(request.headers.get("Authorization")):
+        return jsonify({"error": "unauthorized"}), 403
+    batch_size = request.args.get("batch_size", 10000, type=int)
+    try:
+        stats = import_progress(request.stream, max(1, batch_size))
+    except NDJSONError as e:
+        return jsonify({"error": str(e), "rows": e.imported}), 400
+    return jsonify(stats)
 
 # ---------------------------------------------------
 # Logout
@@ -0,0 +1,242 @@
+# metrics.py
+# Small in-process metrics registry rendered in the Prometheus text format
+# (GET /metrics). Recording is a bisect plus a few additions under a lock,
+# cheap enough to leave on; benchmarks/bench_metrics.py measures it.
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+ACTIVE_USER_WINDOW = 300
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# -------------------------------
+# Metric types
+# -------------------------------
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Per-bucket counts are kept non-cumulative and summed when rendered."""
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}       # labels -> [bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(counts), total))
+                           for labels, (counts, total) in self._series.items())
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _labels(self.labelnames, labels, [("le", _number(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            base = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_number(total)}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """
+    Value computed at scrape time by `fn()`, which returns a number or a
+    {label values tuple: number} dict. `ttl` caches an expensive value.
+    """
+
+    def __init__(self, name, help, fn, labelnames=(), ttl=0.0):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.fn = fn
+        self.ttl = ttl
+        self._cached = None
+        self._cached_at = 0.0
+
+    def _value(self):
+        if self.ttl and self._cached is not None and time.monotonic() - self._cached_at < self.ttl:
+            return self._cached
+        value = self.fn()
+        self._cached, self._cached_at = value, time.monotonic()
+        return value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            value = self._value()
+        except Exception as e:
+            print(f"⚠️ Metric {self.name} failed:", e)
+            return lines
+        items = sorted(value.items()) if isinstance(value, dict) else [((), value)]
+        for labels, v in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(v)}")
+        return lines
+
+
+# -------------------------------
+# Registry
+# -------------------------------
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, fn, labelnames=(), ttl=0.0):
+        return self.register(Gauge(name, help, fn, labelnames, ttl))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "lms_http_request_duration_seconds", "Time to build the response, per route.",
+    ("method", "route", "status"))
+AI_RESPONSES = REGISTRY.counter(
+    "lms_ai_responses_total", "get_ai_response calls by outcome.", ("outcome",))
+AI_RESPONSE_SECONDS = REGISTRY.histogram(
+    "lms_ai_response_duration_seconds", "get_ai_response latency by outcome.", ("outcome",))
+FUNCTION_SECONDS = REGISTRY.histogram(
+    "lms_function_duration_seconds", "Latency of instrumented hot-path functions.",
+    ("function",), buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                            0.001, 0.0025, 0.005, 0.01, 0.05, 0.25, 1.0))
+
+
+# -------------------------------
+# Helpers
+# -------------------------------
+def timed(name):
+    """Decorator recording the call's duration in FUNCTION_SECONDS."""
+    def decorate(fn):
+        observe = FUNCTION_SECONDS.observe
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(clock() - start, name)
+        return wrapper
+    return decorate
+
+
+def record_ai_response(outcome, seconds):
+    AI_RESPONSES.inc(outcome)
+    AI_RESPONSE_SECONDS.observe(seconds, outcome)
+
+
+class ActiveUsers:
+    """Usernames seen within the last `window` seconds."""
+
+    def __init__(self, window=ACTIVE_USER_WINDOW, clock=time.monotonic):
+        self.window = window
+        self.clock = clock
+        self._last_seen = {}
+
+    def seen(self, username):
+        self._last_seen[username] = self.clock()
+
+    def count(self):
+        cutoff = self.clock() - self.window
+        for username, at in list(self._last_seen.items()):
+            if at < cutoff:
+                self._last_seen.pop(username, None)
+        return len(self._last_seen)
+
+
+active_users = ActiveUsers()
+REGISTRY.gauge("lms_active_users", f"Users with a request in the last {ACTIVE_USER_WINDOW}s.",
+               active_users.count)
+
+
+def instrument_app(app, registry=REGISTRY):
+    """Time every request of a Flask app and serve the registry at /metrics."""
+    from flask import Response, g, request, session
+
+    clock = time.perf_counter
+    cookie_name = app.config["SESSION_COOKIE_NAME"]
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = clock()
+
+    @app.after_request
+    def _observe(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            REQUEST_SECONDS.observe(clock() - start, request.method, rule, response.status_code)
+        # Loading a session costs more than the rest of this hook, so
+        # anonymous requests without a session cookie skip it.
+        username = session.get("username") if cookie_name in request.cookies else None
+        if username:
+            active_users.seen(username)
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+    return app
@@ -0,0 +1,111 @@
+# page_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import make_response, render_template, request
+from markupsafe import Markup, escape
+from werkzeug.http import is_resource_modified
+
+# Placeholders rendered into cached pages and filled per request.
+SLOT_USERNAME = "<!--slot:username-->"
+SLOT_RECOMMENDATION = "<!--slot:recommendation-->"
+
+
+# -------------------------------
+# Rendered fragments + conditional GET
+# -------------------------------
+class PageCache:
+    """
+    Rendered HTML keyed by (template, course, module, catalog version),
+    holding at most `maxsize` fragments (least recently used dropped
+    first), since course and module names come from the URL.
+
+    ETags are derived from the same key (plus any personalized values), so
+    a request carrying a matching If-None-Match or If-Modified-Since gets a
+    304 before anything is rendered. Every page is served behind a login,
+    so responses are marked private: only the browser may keep them.
+    """
+
+    def __init__(self, get_version, maxsize=1024):
+        self.get_version = get_version
+        self.maxsize = maxsize
+        self.version = None
+        self.last_modified = None
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync()
+
+    def _sync(self):
+        """Drop every fragment when the catalog version has changed."""
+        version = self.get_version()
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self.version = version
+                    self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+                    self._fragments.clear()
+        return version
+
+    def etag(self, *parts):
+        blob = "\0".join(str(p) for p in (self._sync(),) + parts)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def fragment(self, key, render):
+        """Return the cached HTML for `key`, rendering it on first use."""
+        key = (self.version,) + tuple(key)
+        with self._lock:
+            html = self._fragments.get(key)
+            if html is not None:
+                self._fragments.move_to_end(key)
+                return html
+        html = render()
+        with self._lock:
+            if key[0] == self.version:
+                self._fragments[key] = html
+                while len(self._fragments) > self.maxsize:
+                    self._fragments.popitem(last=False)
+        return html
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def _respond(self, html, etag, last_modified):
+        response = make_response("", 304) if html is None else make_response(html)
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    def page(self, key, render):
+        """Serve a page that is the same for every logged-in user."""
+        etag = self.etag(*key)
+        if not is_resource_modified(request.environ, etag=etag, last_modified=self.last_modified):
+            return self._respond(None, etag, self.last_modified)
+        return self._respond(self.fragment(key, render), etag, self.last_modified)
+
+    def module_page(self, course, module, details, username, recommendation):
+        """
+        module_content.html: the module body is cached per (course, module);
+        the greeting and recommendation box are filled in per request.
+        """
+        etag = self.etag("module_content.html", course, module, username, recommendation)
+        if not is_resource_modified(request.environ, etag=etag):
+            return self._respond(None, etag, None)
+        html = self.fragment(
+            ("module_content.html", course, module),
+            lambda: render_template(
+                "module_content.html", course=course, module=module, details=details,
+                username=Markup(SLOT_USERNAME), recommendation_box=Markup(SLOT_RECOMMENDATION),
+            ),
+        )
+        box = self.fragment(
+            ("recommendation_box.html", course, recommendation),
+            lambda: render_template("recommendation_box.html", course=course,
+                                    recommendation=recommendation),
+        )
+        html = html.replace(SLOT_USERNAME, str(escape(username)), 1)
+        html = html.replace(SLOT_RECOMMENDATION, box, 1)
+        return self._respond(html, etag, None)
@@ -0,0 +1,154 @@
+# profiling.py
+# Opt-in request profiler. Nothing is installed unless one of these is set:
+#
+#   LMS_PROFILE_RATE=0.01      cProfile this fraction of requests
+#   LMS_PROFILE_SLOW_MS=500    log every request slower than this; with
+#   LMS_PROFILE_SLOW=1         also profile every request and keep the
+#                              profiles of the slow ones (costly, use briefly)
+#   LMS_PROFILE_DIR=profiles   where .pstats files go (newest LMS_PROFILE_KEEP kept)
+#   LMS_PROFILE_KEEP=200
+#
+# Open a dump with: python -m pstats profiles/<file>.pstats
+import cProfile
+import itertools
+import os
+import pstats
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+
+def _env_float(name, default=0.0):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Flask/Werkzeug dispatch frames wrap everything, so they would top every
+# summary; the view, template (jinja2) and SDK frames below them are shown.
+_FRAMEWORK = re.compile(r"[\\/](flask|werkzeug)[\\/]")
+
+
+def top_functions(stats, n=5):
+    """[(name, cumulative seconds)] of the n most expensive non-framework calls."""
+    rows = []
+    for (filename, line, func), (_, _, _, cumulative, _) in stats.stats.items():
+        if func.startswith("<") or filename == __file__ or _FRAMEWORK.search(filename):
+            continue
+        rows.append((cumulative, f"{os.path.basename(filename)}:{func}"))
+    rows.sort(reverse=True)
+    return [(name, seconds) for seconds, name in rows[:n]]
+
+
+# -------------------------------
+# Writing dumps (background thread)
+# -------------------------------
+class ProfileWriter:
+    """Writes profiles to `directory`, keeping the newest `keep` files."""
+
+    def __init__(self, directory, keep=200):
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+        existing = sorted(
+            (os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".pstats")),
+            key=os.path.getmtime,
+        )
+        self._files = deque(existing)
+        self._seq = itertools.count()
+        self._queue = queue.Queue(maxsize=64)
+        threading.Thread(target=self._run, name="profile-writer", daemon=True).start()
+
+    def submit(self, profiler, method, route, elapsed, reason):
+        try:
+            self._queue.put_nowait((profiler, method, route, elapsed, reason))
+        except queue.Full:
+            pass    # never slow requests down for the sake of a dump
+
+    def _run(self):
+        while True:
+            try:
+                self.write(*self._queue.get())
+            except Exception as e:
+                print("⚠️ Could not write profile:", e, file=sys.stderr)
+
+    def write(self, profiler, method, route, elapsed, reason):
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", f"{method} {route}").strip("_") or "root"
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        name = (f"{slug}-{stamp}-{os.getpid()}.{next(self._seq)}"
+                f"-{int(elapsed * 1000)}ms-{reason}.pstats")
+        path = os.path.join(self.directory, name)
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(path)
+        self._files.append(path)
+        while len(self._files) > self.keep:
+            old = self._files.popleft()
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        top = ", ".join(f"{fn} {s * 1000:.1f}ms" for fn, s in top_functions(stats))
+        print(f"📈 profile {method} {route} {elapsed * 1000:.1f}ms ({reason}) -> {name}; top: {top}",
+              file=sys.stderr)
+        return path
+
+
+# -------------------------------
+# Flask hook
+# -------------------------------
+def install_profiler(app, rate=None, slow_ms=None, profile_slow=None, directory=None, keep=None):
+    """
+    Add the profiling hooks to `app` if enabled (arguments default to the
+    environment). Returns the ProfileWriter, or None when nothing was
+    installed, in which case requests pay nothing at all.
+    """
+    rate = _env_float("LMS_PROFILE_RATE") if rate is None else rate
+    slow_ms = _env_float("LMS_PROFILE_SLOW_MS") if slow_ms is None else slow_ms
+    if profile_slow is None:
+        profile_slow = os.environ.get("LMS_PROFILE_SLOW", "") not in ("", "0")
+    profile_slow = profile_slow and slow_ms > 0
+    if rate <= 0 and slow_ms <= 0:
+        return None
+
+    from flask import g, request
+
+    writer = None
+    if rate > 0 or profile_slow:
+        writer = ProfileWriter(
+            directory or os.environ.get("LMS_PROFILE_DIR", "profiles"),
+            keep or int(os.environ.get("LMS_PROFILE_KEEP", "200")),
+        )
+    slow_s = slow_ms / 1000
+    clock = time.perf_counter
+
+    @app.before_request
+    def _start_profile():
+        sampled = rate > 0 and random.random() < rate
+        if sampled or profile_slow:
+            profiler = cProfile.Profile()
+            g._profile = (profiler, sampled)
+            profiler.enable()
+        g._profile_start = clock()
+
+    @app.teardown_request
+    def _stop_profile(error=None):
+        start = g.pop("_profile_start", None)
+        profile = g.pop("_profile", None)
+        if profile is not None:
+            profile[0].disable()
+        if start is None:
+            return
+        elapsed = clock() - start
+        slow = slow_s > 0 and elapsed >= slow_s
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        if slow:
+            print(f"🐢 slow request {request.method} {route} {elapsed * 1000:.1f}ms", file=sys.stderr)
+        if profile is not None and (profile[1] or slow):
+            writer.submit(profile[0], request.method, route, elapsed, "slow" if slow else "sampled")
+
+    return writer
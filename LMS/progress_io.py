@@ -0,0 +1,159 @@
+# progress_io.py
+# Bulk export/import of learner progress as NDJSON, one completion per line:
+#
+#   {"username": "alice", "module": "Loops", "course": "Python Basics"}
+#
+# ("course" is null for completions recorded without a course.) Both
+# directions are generators, so memory stays flat however large the file.
+# Importing the same file twice is harmless: every backend stores a set.
+#
+#   python progress_io.py export > progress.ndjson
+#   python progress_io.py import progress.ndjson --batch-size 10000
+#
+# The CLI works on the store chosen by LMS_PROGRESS_BACKEND, so it is only
+# useful with a durable backend (LMS_PROGRESS_BACKEND=sqlite).
+import argparse
+import json
+import os
+import sys
+import time
+
+ADMIN_TOKEN = os.environ.get("LMS_ADMIN_TOKEN")
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class NDJSONError(ValueError):
+    """A line could not be imported; `imported` rows were applied before it."""
+
+    def __init__(self, message, line, imported):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+        self.imported = imported
+
+
+def is_authorized(authorization):
+    """
+    True if an Authorization header carries LMS_ADMIN_TOKEN as a bearer
+    token. Without the variable the HTTP endpoints stay disabled.
+    """
+    return bool(ADMIN_TOKEN) and authorization == f"Bearer {ADMIN_TOKEN}"
+
+
+# -------------------------------
+# Writing
+# -------------------------------
+def iter_ndjson(rows, lines_per_chunk=1000):
+    """Yield NDJSON text for (username, module, course) rows, a chunk at a time."""
+    dumps = json.dumps
+    chunk = []
+    for username, module, course in rows:
+        chunk.append(dumps({"username": username, "module": module, "course": course}))
+        if len(chunk) >= lines_per_chunk:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+# -------------------------------
+# Reading
+# -------------------------------
+def parse_ndjson(lines):
+    """
+    Yield (line number, (username, module, course)) for each non-blank line
+    (str or bytes). Raises NDJSONError on a malformed record.
+    """
+    loads = json.loads
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+            username, module = record["username"], record["module"]
+            course = record.get("course") or None
+        except KeyError as e:
+            raise NDJSONError(f"missing field {e}", number, 0) from e
+        except (ValueError, TypeError, AttributeError) as e:
+            raise NDJSONError(f"invalid record ({e})", number, 0) from e
+        if not isinstance(username, str) or not isinstance(module, str) or not username or not module:
+            raise NDJSONError("username and module must be non-empty strings", number, 0)
+        if course is not None and not isinstance(course, str):
+            raise NDJSONError("course must be a string or null", number, 0)
+        yield number, (username, module, course)
+
+
+def import_ndjson(lines, mark_many, batch_size=10000):
+    """
+    Feed parsed rows to `mark_many` in lists of `batch_size`. Returns
+    {"rows", "batches", "seconds", "rows_per_sec"}. A bad line stops the
+    import with NDJSONError after the batches before it were applied.
+    """
+    start = time.perf_counter()
+    imported = batches = 0
+    batch = []
+    try:
+        for number, row in parse_ndjson(lines):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                mark_many(batch)
+                imported += len(batch)
+                batches += 1
+                batch = []
+    except NDJSONError as e:
+        e.imported = imported
+        raise
+    if batch:
+        mark_many(batch)
+        imported += len(batch)
+        batches += 1
+    seconds = time.perf_counter() - start
+    return {
+        "rows": imported,
+        "batches": batches,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(imported / seconds) if seconds else 0,
+    }
+
+
+# -------------------------------
+# Command line
+# -------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import learner progress as NDJSON.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write every completion as NDJSON")
+    export.add_argument("-o", "--output", default="-", help="file to write (default: stdout)")
+    imp = commands.add_parser("import", help="mark every completion in an NDJSON file")
+    imp.add_argument("input", nargs="?", default="-", help="file to read (default: stdin)")
+    imp.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    import ai_utils
+
+    if args.command == "export":
+        out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        try:
+            for chunk in iter_ndjson(ai_utils.iter_progress()):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return 0
+
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    try:
+        stats = ai_utils.import_progress(source, args.batch_size, origin="cli")
+    except NDJSONError as e:
+        print(f"Import stopped at {e} ({e.imported} rows imported)", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        ai_utils.progress_store.flush()
+    print(f"Imported {stats['rows']} rows in {stats['seconds']}s "
+          f"({stats['rows_per_sec']} rows/sec)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,583 @@
+# progress_store.py
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+
+# -------------------------------
+# Quiz scores and course totals for the process-local backends
+# -------------------------------
+class _MemoryScores:
+    """
+    Latest quiz score per (user, module), kept next to the completions.
+
+    Once `track_courses` is given a layout (see learner_stats.CourseLayout),
+    running totals per (user, course) are kept too: the call that records a
+    module's first completion by a user, or a quiz score, adds it to the
+    totals of every course the module is in. Subclasses call
+    `_count_completion` and implement `_completed_modules`.
+    """
+
+    layout = None
+
+    def track_courses(self, layout):
+        """Keep totals for `layout`, rebuilt from the stored progress if it changed."""
+        if self.layout is not None and self.layout.key == layout.key:
+            self.layout = layout
+            return
+        self.layout = layout
+        self.totals = {}
+        for username, modules in self._completed_modules():
+            for module in modules:
+                self._count_completion(username, module)
+        for username, scores in self.score_data.items():
+            for module, score in scores.items():
+                self._count_score(username, module, score, None)
+
+    def _count_completion(self, username, module):
+        for course, hours in self.layout.module_courses.get(module, ()):
+            row = self.totals.setdefault((username, course), [0, 0, 0, 0])
+            row[0] += 1
+            row[1] += hours
+
+    def _count_score(self, username, module, score, old):
+        for course, _ in self.layout.module_courses.get(module, ()):
+            row = self.totals.setdefault((username, course), [0, 0, 0, 0])
+            row[2] += score - (old or 0)
+            row[3] += old is None
+
+    def set_score(self, username, module, score):
+        """Keep `score` (0-100) as the user's latest score for `module`."""
+        scores = self.score_data.setdefault(username, {})
+        old = scores.get(module)
+        scores[module] = score
+        if self.layout is not None:
+            self._count_score(username, module, score, old)
+
+    def scores(self, username):
+        """{module: latest score} for every module the user took a quiz on."""
+        return dict(self.score_data.get(username, {}))
+
+    def course_totals(self, username, course):
+        """
+        {"completed", "hours", "score_sum", "scored"} for the user in
+        `course`, counting modules completed under any course.
+        """
+        row = self.totals.get((username, course), (0, 0, 0, 0))
+        return dict(zip(("completed", "hours", "score_sum", "scored"), row))
+
+
+# -------------------------------
+# In-memory backend (default)
+# -------------------------------
+class MemoryProgressStore(_MemoryScores):
+    """
+    Process-local store: {username: {course: {module: completed_at}}}.
+    Imported rows carry no time and are stored as True.
+    """
+
+    shared = False
+
+    def __init__(self, data=None):
+        self.data = {} if data is None else data
+        self.score_data = {}
+        self.totals = {}            # (username, course) -> [completed, hours, score sum, scored]
+
+    def _modules(self, username, course):
+        if username not in self.data:
+            self.data[username] = {}
+        if course not in self.data[username]:
+            self.data[username][course] = {}
+        return self.data[username][course]
+
+    def _complete(self, username, module, course, at):
+        first = not any(cdata.get(module) for cdata in self.data.get(username, {}).values())
+        modules = self._modules(username, course)
+        if modules.get(module):
+            return False
+        modules[module] = at
+        if first and self.layout is not None:
+            self._count_completion(username, module)
+        return True
+
+    def mark_complete(self, username, module, course=None):
+        """Mark one module complete; returns False if it already was."""
+        return self._complete(username, module, course, time.time())
+
+    def mark_many(self, rows):
+        """Mark (username, module, course) rows complete."""
+        for username, module, course in rows:
+            self._complete(username, module, course, True)
+
+    def completed(self, username, course=None):
+        if username not in self.data:
+            return []
+        if course:
+            return [m for m, done in self.data[username].get(course, {}).items() if done]
+        all_modules = []
+        for cdata in self.data[username].values():
+            all_modules.extend([m for m, done in cdata.items() if done])
+        return all_modules
+
+    def completion_times(self, username):
+        """{module: first completion time, or None if unknown} across courses."""
+        times = {}
+        for cdata in self.data.get(username, {}).values():
+            for module, done in cdata.items():
+                if done:
+                    at = None if done is True else done
+                    if times.get(module) is None or (at is not None and at < times[module]):
+                        times[module] = at
+        return times
+
+    def _completed_modules(self):
+        for username in list(self.data):
+            yield username, set(self.completed(username))
+
+    def rows(self):
+        """Yield every (username, module, course) completion."""
+        for username in list(self.data):
+            for course, cdata in list(self.data.get(username, {}).items()):
+                for module, done in list(cdata.items()):
+                    if done:
+                        yield username, module, course
+
+    def size(self):
+        """(users, completions); walks every user."""
+        completions = sum(
+            sum(1 for done in cdata.values() if done)
+            for courses in list(self.data.values()) for cdata in list(courses.values())
+        )
+        return len(self.data), completions
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# -------------------------------
+# Compact in-memory backend (interned IDs + bitsets)
+# -------------------------------
+class CompactProgressStore(_MemoryScores):
+    """
+    Process-local store that interns module names and usernames to dense
+    integer IDs and keeps each (user, course) completion set as one int
+    used as a bitset. Seed `modules` with CurriculumGraph.order so module
+    IDs equal graph indices and prerequisite checks become mask tests.
+
+    Completed modules come back in ID order, not completion order, and
+    completion times are not kept.
+    """
+
+    shared = False
+
+    def __init__(self, modules=()):
+        self.module_ids = {}
+        self.module_names = []
+        self.user_ids = {}
+        self.bits = {}              # course -> [bitset per user ID]
+        self.score_data = {}
+        self.totals = {}            # (username, course) -> [completed, hours, score sum, scored]
+        self._lock = threading.Lock()
+        for module in modules:
+            self._intern(module)
+
+    def _intern(self, module):
+        mid = self.module_ids.get(module)
+        if mid is None:
+            mid = self.module_ids[module] = len(self.module_names)
+            self.module_names.append(module)
+        return mid
+
+    def names(self, mask):
+        """Module names for the set bits of `mask`, in ID order."""
+        out = []
+        while mask:
+            low = mask & -mask
+            out.append(self.module_names[low.bit_length() - 1])
+            mask ^= low
+        return out
+
+    def mark_complete(self, username, module, course=None):
+        """Mark one module complete; returns False if it already was."""
+        with self._lock:
+            bit = 1 << self._intern(module)
+            uid = self.user_ids.setdefault(username, len(self.user_ids))
+            row = self.bits.setdefault(course, [])
+            if len(row) <= uid:
+                row.extend([0] * (uid + 1 - len(row)))
+            if row[uid] & bit:
+                return False
+            first = not self.completed_mask(username) & bit
+            row[uid] |= bit
+            if first and self.layout is not None:
+                self._count_completion(username, module)
+            return True
+
+    def mark_many(self, rows):
+        for username, module, course in rows:
+            self.mark_complete(username, module, course)
+
+    def completed_mask(self, username, course=None):
+        uid = self.user_ids.get(username)
+        if uid is None:
+            return 0
+        if course:
+            row = self.bits.get(course, ())
+            return row[uid] if uid < len(row) else 0
+        mask = 0
+        for row in self.bits.values():
+            if uid < len(row):
+                mask |= row[uid]
+        return mask
+
+    def completed(self, username, course=None):
+        return self.names(self.completed_mask(username, course))
+
+    def _completed_modules(self):
+        usernames, masks = self.user_masks()
+        for username, mask in zip(usernames, masks):
+            yield username, self.names(mask)
+
+    def user_masks(self):
+        """(usernames, masks): every user and their bitset across all courses."""
+        with self._lock:
+            usernames = list(self.user_ids)
+            masks = [0] * len(usernames)
+            for row in self.bits.values():
+                for uid, mask in enumerate(row):
+                    if mask:
+                        masks[uid] |= mask
+        return usernames, masks
+
+    def rows(self):
+        """Yield every (username, module, course) completion, in ID order."""
+        for username, uid in list(self.user_ids.items()):
+            for course, row in list(self.bits.items()):
+                if uid < len(row) and row[uid]:
+                    for module in self.names(row[uid]):
+                        yield username, module, course
+
+    def size(self):
+        """(users, completions); popcounts every bitset."""
+        completions = sum(mask.bit_count() for row in list(self.bits.values()) for mask in row)
+        return len(self.user_ids), completions
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+# -------------------------------
+# SQLite backend (WAL, shared by workers)
+# -------------------------------
+class SQLiteProgressStore:
+    """
+    Durable store that every worker process can open at the same path.
+
+    Each reading thread gets its own connection. Completions are buffered
+    and coalesced, then flushed in one transaction on a single writer
+    connection when `batch_size` rows are pending or `flush_interval`
+    seconds after the first pending row. Reads flush first, so a worker
+    sees its own writes. Quiz scores are rare and written at once.
+
+    With a layout from `track_courses`, per-(user, course) totals live in
+    course_totals and are updated in the transaction that stores the
+    completion or score. The layout's key is stored next to them, so the
+    totals are rebuilt once when the catalog's courses change, or after a
+    store opened without a layout has written.
+    """
+
+    shared = True
+
+    # The primary keys double as the per-user lookup indexes.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS progress (
+            username     TEXT NOT NULL,
+            course       TEXT NOT NULL DEFAULT '',
+            module       TEXT NOT NULL,
+            completed_at REAL NOT NULL,
+            PRIMARY KEY (username, course, module)
+        ) WITHOUT ROWID
+    """
+    SCORES_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scores (
+            username     TEXT NOT NULL,
+            module       TEXT NOT NULL,
+            score        INTEGER NOT NULL,
+            updated_at   REAL NOT NULL,
+            PRIMARY KEY (username, module)
+        ) WITHOUT ROWID
+    """
+    TOTALS_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS course_totals (
+            username     TEXT NOT NULL,
+            course       TEXT NOT NULL,
+            completed    INTEGER NOT NULL,
+            hours        NUMERIC NOT NULL,
+            score_sum    NUMERIC NOT NULL,
+            scored       INTEGER NOT NULL,
+            PRIMARY KEY (username, course)
+        ) WITHOUT ROWID
+    """
+    TOTALS_LAYOUT_SCHEMA = "CREATE TABLE IF NOT EXISTS totals_layout (key TEXT NOT NULL)"
+    BUMP_TOTALS = """
+        INSERT INTO course_totals (username, course, completed, hours, score_sum, scored)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (username, course) DO UPDATE SET
+            completed = completed + excluded.completed,
+            hours = hours + excluded.hours,
+            score_sum = score_sum + excluded.score_sum,
+            scored = scored + excluded.scored
+    """
+
+    def __init__(self, path, batch_size=64, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._connections = []
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.layout = None
+        self._writer = self._open()
+        for schema in (self.SCHEMA, self.SCORES_SCHEMA, self.TOTALS_SCHEMA, self.TOTALS_LAYOUT_SCHEMA):
+            self._writer.execute(schema)
+        self._writer.commit()
+        atexit.register(self.close)
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def mark_complete(self, username, module, course=None):
+        """Queue one completion; returns False if it is already stored or pending."""
+        key = (username, course or "", module)
+        with self._lock:
+            pending = key in self._pending
+        if pending:
+            return False
+        stored = self._connection().execute(
+            "SELECT 1 FROM progress WHERE username = ? AND course = ? AND module = ?", key
+        ).fetchone()
+        self.mark_many([(username, module, course)])
+        return stored is None
+
+    def mark_many(self, rows):
+        """Queue (username, module, course) rows; duplicates are coalesced."""
+        now = time.time()
+        with self._lock:
+            for username, module, course in rows:
+                self._pending.setdefault((username, course or "", module), now)
+            full = len(self._pending) >= self.batch_size
+            if not full and self._timer is None and self._pending:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write all pending rows in a single transaction."""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not pending:
+                return
+            insert = ("INSERT OR IGNORE INTO progress (username, course, module, completed_at) "
+                      "VALUES (?, ?, ?, ?)")
+            with self._writer:
+                if self.layout is None:
+                    self._writer.executemany(insert, [(u, c, m, ts) for (u, c, m), ts in pending.items()])
+                    self._writer.execute("DELETE FROM totals_layout")
+                    return
+                self._writer.execute("BEGIN IMMEDIATE")
+                self._check_layout()
+                for (u, c, m), ts in pending.items():
+                    first = self._writer.execute(
+                        "SELECT 1 FROM progress WHERE username = ? AND module = ? LIMIT 1", (u, m)
+                    ).fetchone() is None
+                    if self._writer.execute(insert, (u, c, m, ts)).rowcount and first:
+                        for course, hours in self.layout.module_courses.get(m, ()):
+                            self._writer.execute(self.BUMP_TOTALS, (u, course, 1, hours, 0, 0))
+
+    # -------------------------------
+    # Course totals (call the helpers below inside a write transaction)
+    # -------------------------------
+    def track_courses(self, layout):
+        """Keep totals for `layout`, rebuilt from the stored progress if it changed."""
+        self.flush()
+        with self._write_lock:
+            self.layout = layout
+            with self._writer:
+                self._writer.execute("BEGIN IMMEDIATE")
+                self._check_layout()
+
+    def _check_layout(self):
+        """Rebuild course_totals if they were counted for another layout."""
+        row = self._writer.execute("SELECT key FROM totals_layout").fetchone()
+        if row is not None and row[0] == self.layout.key:
+            return
+        conn = self._writer
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS layout_modules (course TEXT, module TEXT, hours NUMERIC)")
+        conn.execute("DELETE FROM temp.layout_modules")
+        conn.executemany(
+            "INSERT INTO temp.layout_modules VALUES (?, ?, ?)",
+            [(course, module, hours) for module, courses in self.layout.module_courses.items()
+             for course, hours in courses],
+        )
+        conn.execute("DELETE FROM course_totals")
+        conn.execute(
+            "INSERT INTO course_totals (username, course, completed, hours, score_sum, scored) "
+            "SELECT p.username, l.course, COUNT(*), SUM(l.hours), 0, 0 "
+            "FROM (SELECT DISTINCT username, module FROM progress) p "
+            "JOIN temp.layout_modules l ON l.module = p.module GROUP BY p.username, l.course"
+        )
+        conn.execute(
+            "INSERT INTO course_totals (username, course, completed, hours, score_sum, scored) "
+            "SELECT s.username, l.course, 0, 0, SUM(s.score), COUNT(*) "
+            "FROM scores s JOIN temp.layout_modules l ON l.module = s.module "
+            "WHERE true GROUP BY s.username, l.course "
+            "ON CONFLICT (username, course) DO UPDATE SET "
+            "score_sum = excluded.score_sum, scored = excluded.scored"
+        )
+        conn.execute("DELETE FROM totals_layout")
+        conn.execute("INSERT INTO totals_layout (key) VALUES (?)", (self.layout.key,))
+
+    def course_totals(self, username, course):
+        """
+        {"completed", "hours", "score_sum", "scored"} for the user in
+        `course`, counting modules completed under any course.
+        """
+        self.flush()
+        conn = self._connection()
+        row = conn.execute("SELECT key FROM totals_layout").fetchone()
+        if row is None or row[0] != self.layout.key:
+            # Another worker counted them for a different catalog version.
+            self.track_courses(self.layout)
+        row = conn.execute(
+            "SELECT completed, hours, score_sum, scored FROM course_totals "
+            "WHERE username = ? AND course = ?", (username, course)
+        ).fetchone() or (0, 0, 0, 0)
+        return dict(zip(("completed", "hours", "score_sum", "scored"), row))
+
+    def completed(self, username, course=None):
+        self.flush()
+        conn = self._connection()
+        if course:
+            rows = conn.execute(
+                "SELECT module FROM progress WHERE username = ? AND course = ? "
+                "ORDER BY completed_at",
+                (username, course),
+            )
+        else:
+            rows = conn.execute(
+                "SELECT module FROM progress WHERE username = ? ORDER BY completed_at",
+                (username,),
+            )
+        return [m for (m,) in rows]
+
+    def completion_times(self, username):
+        """{module: first completion time} across courses."""
+        self.flush()
+        return dict(self._connection().execute(
+            "SELECT module, MIN(completed_at) FROM progress WHERE username = ? GROUP BY module",
+            (username,),
+        ))
+
+    def set_score(self, username, module, score):
+        """Keep `score` (0-100) as the user's latest score for `module`."""
+        with self._write_lock:
+            with self._writer:
+                if self.layout is not None:
+                    self._writer.execute("BEGIN IMMEDIATE")
+                    self._check_layout()
+                    old = self._writer.execute(
+                        "SELECT score FROM scores WHERE username = ? AND module = ?", (username, module)
+                    ).fetchone()
+                self._writer.execute(
+                    "INSERT OR REPLACE INTO scores (username, module, score, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (username, module, score, time.time()),
+                )
+                if self.layout is None:
+                    self._writer.execute("DELETE FROM totals_layout")
+                else:
+                    for course, _ in self.layout.module_courses.get(module, ()):
+                        self._writer.execute(self.BUMP_TOTALS, (
+                            username, course, 0, 0,
+                            score - (old[0] if old else 0), 0 if old else 1,
+                        ))
+
+    def scores(self, username):
+        """{module: latest score} for every module the user took a quiz on."""
+        return dict(self._connection().execute(
+            "SELECT module, score FROM scores WHERE username = ?", (username,)
+        ))
+
+    def rows(self):
+        """Yield every (username, module, course) completion in key order."""
+        self.flush()
+        cursor = self._connection().execute(
+            "SELECT username, module, course FROM progress ORDER BY username, course, module"
+        )
+        for username, module, course in cursor:
+            yield username, module, course or None
+
+    def size(self):
+        """(users, completions); scans the table."""
+        self.flush()
+        row = self._connection().execute(
+            "SELECT COUNT(DISTINCT username), COUNT(*) FROM progress"
+        ).fetchone()
+        return row[0], row[1]
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+        with self._write_lock:
+            self._writer.close()
+
+
+# -------------------------------
+# Backend selection
+# -------------------------------
+def make_progress_store(data=None, modules=()):
+    """
+    Build the store named by LMS_PROGRESS_BACKEND ("memory", "compact" or
+    "sqlite"). `modules` seeds the compact store's module IDs.
+    """
+    backend = os.environ.get("LMS_PROGRESS_BACKEND", "memory")
+    if backend == "sqlite":
+        return SQLiteProgressStore(os.environ.get("LMS_PROGRESS_DB", "progress.db"))
+    if backend == "compact":
+        return CompactProgressStore(modules)
+    if backend == "memory":
+        return MemoryProgressStore(data)
+    raise ValueError(f"Unknown progress backend: {backend}")
@@ -0,0 +1,232 @@
+# question_bank.py
+# Quiz questions generated offline and served from memory.
+#
+#   python question_bank.py --workers 8        # (re)generate changed modules
+#   python question_bank.py --force            # regenerate everything
+#
+# Each module's questions are stored in LMS_QUIZ_DIR (default ./quiz_bank)
+# as one JSON file together with the sha256 of the module text they were
+# written from. The job skips modules whose text has not changed since, so
+# hand-edited files are kept until the module itself is edited.
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from ai_providers import CHAT_PROVIDER, chat_model
+from catalog import catalog
+
+QUIZ_DIR = os.environ.get(
+    "LMS_QUIZ_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_bank")
+)
+QUESTIONS_PER_MODULE = 4
+
+QUESTION_PROMPT = (
+    "Write {n} short-answer quiz questions for a student who just studied the "
+    "module \"{module}\". Base them only on this text:\n\n{content}\n\n"
+    "Reply with one question per line and nothing else."
+)
+_NUMBERING = re.compile(r"^\s*(?:[-*•]|\d+[.)]|Q\d+[.:)])\s*", re.I)
+_WORD = re.compile(r"[a-z_]{3,}")
+_STOPWORDS = frozenset(
+    "the and for are you can use using with that this from into its not but all any "
+    "has have was were will your our they them then than when what which how why".split()
+)
+KEYWORDS_FOR_FULL_CREDIT = 3
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def default_questions(module):
+    """Questions used for modules the job has not covered yet."""
+    return (
+        f"Explain the key concept of '{module}'.",
+        f"Give an example related to '{module}'.",
+    )
+
+
+def keywords(text):
+    return frozenset(_WORD.findall(text.lower())) - _STOPWORDS
+
+
+def score_answers(module_keywords, answers):
+    """
+    0-100 score for free-text answers: each answer earns full credit once it
+    uses KEYWORDS_FOR_FULL_CREDIT distinct terms from the module text, and
+    partial credit below that. Blank answers earn nothing.
+    """
+    if not answers:
+        return 0
+    credit = 0.0
+    for answer in answers:
+        hits = len(keywords(answer or "") & module_keywords)
+        credit += min(1.0, hits / KEYWORDS_FOR_FULL_CREDIT)
+    return round(100 * credit / len(answers))
+
+
+def bank_path(directory, module):
+    slug = re.sub(r"[^a-z0-9]+", "-", module.lower()).strip("-") or "module"
+    return os.path.join(directory, f"{slug}.json")
+
+
+# -------------------------------
+# Generators: (module, content) -> [question, ...]
+# -------------------------------
+def ai_generator(n=QUESTIONS_PER_MODULE):
+    """Ask the chat model for `n` questions about the module text."""
+    def generate(module, content):
+        prompt = QUESTION_PROMPT.format(n=n, module=module, content=content)
+        text = chat_model().generate_content(prompt).text
+        questions = [_NUMBERING.sub("", line).strip() for line in text.splitlines()]
+        questions = [q for q in questions if q][:n]
+        if not questions:
+            raise ValueError(f"model returned no questions for {module}")
+        return questions
+    generate.name = f"ai:{CHAT_PROVIDER}"
+    return generate
+
+
+# -------------------------------
+# Offline batch job
+# -------------------------------
+def _write(path, record):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def generate_bank(module_content, generate, directory=QUIZ_DIR, workers=8, force=False):
+    """
+    Write question files for every module in `module_content` whose text
+    changed since its file was written (or all of them with `force`).
+    Model calls are network-bound, so they run on a thread pool.
+    Returns {"generated", "unchanged", "failed": {module: error}, "seconds"}.
+    """
+    start = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    todo = []
+    unchanged = 0
+    for module in module_content:
+        content = module_content[module]["content"]
+        digest = content_hash(content)
+        path = bank_path(directory, module)
+        existing = _read(path)
+        if not force and existing and existing.get("content_hash") == digest:
+            unchanged += 1
+        else:
+            todo.append((module, content, digest, path))
+
+    def job(module, content, digest, path):
+        questions = generate(module, content)
+        _write(path, {
+            "module": module,
+            "content_hash": digest,
+            "generator": getattr(generate, "name", "custom"),
+            "questions": list(questions),
+        })
+
+    failed = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(job, *item): item[0] for item in todo}
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None:
+                failed[futures[future]] = str(error)
+    return {
+        "generated": len(todo) - len(failed),
+        "unchanged": unchanged,
+        "failed": failed,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+# -------------------------------
+# In-memory index used by the quiz route
+# -------------------------------
+class QuestionBank:
+    """
+    module -> tuple of questions, read from the bank files as modules are
+    first asked for, plus the module-text keywords used to score answers,
+    computed on first use. Module bodies are therefore only read for
+    modules somebody takes a quiz on. Modules without a file get
+    default_questions(); a file written for older module text keeps
+    serving until the job replaces it. Call load() to re-read.
+    """
+
+    def __init__(self, directory=QUIZ_DIR, source=catalog):
+        self.directory = directory
+        self.source = source
+        self.load()
+
+    def load(self):
+        """Forget what was read; files and module text are read again on demand."""
+        snapshot = self.source.snapshot()
+        self._snapshot, self._index, self._keywords = snapshot, {}, {}
+        return len(snapshot.modules)
+
+    def get(self, module):
+        questions = self._index.get(module)
+        if questions is not None:
+            return questions
+        if module not in self._snapshot.modules:
+            return default_questions(module)
+        record = _read(bank_path(self.directory, module))
+        if record and record.get("module") == module and record.get("questions"):
+            questions = tuple(record["questions"])
+        else:
+            questions = default_questions(module)
+        self._index[module] = questions
+        return questions
+
+    def score(self, module, answers):
+        """score_answers() against the module's keywords."""
+        module_keywords = self._keywords.get(module)
+        if module_keywords is None:
+            snapshot = self._snapshot
+            if module not in snapshot.modules:
+                return score_answers(keywords(module), answers)
+            module_keywords = keywords(f"{module}\n{snapshot.content(module)}")
+            self._keywords[module] = module_keywords
+        return score_answers(module_keywords, answers)
+
+
+question_bank = QuestionBank()
+catalog.on_reload(lambda snapshot: question_bank.load())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate quiz questions for every module.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--force", action="store_true", help="regenerate unchanged modules too")
+    parser.add_argument("--questions", type=int, default=QUESTIONS_PER_MODULE)
+    parser.add_argument("--dir", default=QUIZ_DIR)
+    args = parser.parse_args(argv)
+
+    stats = generate_bank(catalog.module_content, ai_generator(args.questions),
+                          args.dir, args.workers, args.force)
+    print(f"{stats['generated']} generated, {stats['unchanged']} unchanged, "
+          f"{len(stats['failed'])} failed in {stats['seconds']}s")
+    for module, error in sorted(stats["failed"].items()):
+        print(f"  {module}: {error}", file=sys.stderr)
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+# quiz_grading.py
+# Quiz submissions graded in the background. The quiz POST stores the
+# answers as a job in a SQLite queue and returns the job at once; grading
+# threads pick jobs up, grade each submission with a single model prompt
+# covering every question, and hand the score to `on_graded`. Settings
+# (environment):
+#
+#   LMS_GRADING_DB        queue database, shared by worker processes  (grading.db)
+#   LMS_GRADING_WORKERS   grading threads per process                 (2)
+#   LMS_GRADING_ATTEMPTS  model attempts before the keyword score     (3)
+#   LMS_GRADING_BACKOFF   seconds before the first retry, doubling    (2)
+#   LMS_GRADER            "ai" or "keywords" (question_bank.score)    (ai)
+#
+# A job keeps its row until it is done, so one left running by a crash or
+# restart is claimed again once its lease runs out. Job IDs are derived
+# from the user and the form's submission ID, so a resubmitted form finds
+# its first job instead of queueing another.
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from ai_executor import ai_executor
+from ai_providers import CHAT_PROVIDER, chat_model
+from metrics import REGISTRY, timed
+from question_bank import question_bank
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+LEASE_SECONDS = 120         # a running job older than this is claimed again
+POLL_SECONDS = 1.0          # idle workers re-check the table (other processes' jobs)
+GRADING_TIMEOUT = 30.0
+
+GRADING_PROMPT = (
+    "Grade a student's answers to a quiz on the module \"{module}\". Give each "
+    "answer a score from 0 to 100 for how correct and complete it is.\n\n"
+    "{items}\n\n"
+    "Reply with one line per answer in the form \"<number>: <score> - <one "
+    "sentence of feedback>\" and nothing else."
+)
+_GRADE_LINE = re.compile(r"^\s*(?:Q|A)?(\d+)\s*[:.)]\s*(\d{1,3})\b(?:\s*(?:/\s*100)?\s*[-–:]?\s*(.*))?$", re.I)
+_KEY = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def job_id(username, key):
+    return hashlib.blake2b(f"{username}\0{key}".encode("utf-8"), digest_size=12).hexdigest()
+
+
+# -------------------------------
+# Graders: (module, questions, answers) -> (score 0-100, [feedback per answer])
+# -------------------------------
+def keyword_grader(module, questions, answers):
+    """question_bank's keyword score; no model call, never fails."""
+    return question_bank.score(module, answers), []
+
+
+keyword_grader.name = "keywords"
+
+
+def parse_grades(text, n):
+    """Scores and feedback for answers 1..n from the model's reply."""
+    grades = {}
+    for line in text.splitlines():
+        m = _GRADE_LINE.match(line)
+        if m and 1 <= int(m.group(1)) <= n:
+            grades[int(m.group(1))] = (min(100, int(m.group(2))), (m.group(3) or "").strip())
+    if len(grades) != n:
+        raise ValueError(f"model graded {len(grades)} of {n} answers")
+    return [grades[i + 1] for i in range(n)]
+
+
+def ai_grader(timeout=GRADING_TIMEOUT):
+    """One prompt per submission, run on the shared AI executor."""
+    def grade(module, questions, answers):
+        items = "\n\n".join(f"Q{i}. {q}\nA{i}. {a.strip() or '(no answer)'}"
+                            for i, (q, a) in enumerate(zip(questions, answers), 1))
+        prompt = GRADING_PROMPT.format(module=module, items=items)
+        text = ai_executor.call(lambda: chat_model().generate_content(prompt).text, timeout=timeout)
+        grades = parse_grades(text, len(answers))
+        return round(sum(s for s, _ in grades) / len(grades)), [f for _, f in grades]
+    grade.name = f"ai:{CHAT_PROVIDER}"
+    return grade
+
+
+# -------------------------------
+# Queue
+# -------------------------------
+class GradingQueue:
+    """
+    Durable job table plus `workers` grading threads (started by start()).
+    A job is tried `max_attempts` times with `grade`, waiting `backoff`,
+    2 * `backoff`, ... seconds between tries; after the last failure it is
+    graded with `fallback` instead, if one is given. A job whose lease ran
+    out on its last attempt goes straight to `fallback`. `on_graded(username,
+    module, score)` runs before a job is marked done, so a crash in between
+    hands the score over again rather than losing it; if it raises, the
+    score is kept on the job and only on_graded is retried, up to the same
+    `max_attempts`.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS grading_jobs (
+            id          TEXT PRIMARY KEY,
+            username    TEXT NOT NULL,
+            course      TEXT NOT NULL,
+            module      TEXT NOT NULL,
+            questions   TEXT NOT NULL,
+            answers     TEXT NOT NULL,
+            status      TEXT NOT NULL,
+            attempts    INTEGER NOT NULL DEFAULT 0,
+            run_after   REAL NOT NULL,
+            score       INTEGER,
+            feedback    TEXT,
+            grader      TEXT,
+            error       TEXT,
+            created_at  REAL NOT NULL,
+            updated_at  REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS grading_jobs_due ON grading_jobs (status, run_after);
+    """
+    PUBLIC = ("id", "course", "module", "status", "attempts", "score", "feedback",
+              "grader", "created_at", "updated_at")
+
+    def __init__(self, path, grade, fallback=keyword_grader, on_graded=None, workers=2,
+                 max_attempts=3, backoff=2.0, lease=LEASE_SECONDS):
+        self.path = path
+        self.grade = grade
+        self.fallback = fallback
+        self.on_graded = on_graded
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.counts = {"submitted": 0, "duplicates": 0, "graded": 0, "retried": 0,
+                       "fallbacks": 0, "failed": 0}
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._threads = []
+        self._stopping = False
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+        atexit.register(self.close)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _public(self, row):
+        job = {k: row[k] for k in self.PUBLIC}
+        job["feedback"] = json.loads(job["feedback"]) if job["feedback"] else []
+        return job
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def submit(self, username, course, module, questions, answers, key=None):
+        """
+        Queue a submission and return its job (see get()). `key` is the
+        form's submission ID; without a valid one the answers themselves
+        identify the submission.
+        """
+        if not key or not _KEY.match(key):
+            key = hashlib.blake2b(json.dumps([course, module, answers]).encode("utf-8"),
+                                  digest_size=16).hexdigest()
+        id = job_id(username, key)
+        now = time.time()
+        conn = self._connection()
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO grading_jobs (id, username, course, module, questions, "
+            "answers, status, run_after, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (id, username, course or "", module, json.dumps(list(questions)),
+             json.dumps(list(answers)), QUEUED, now, now, now),
+        )
+        if cursor.rowcount:
+            self._count("submitted")
+            with self._cond:
+                self._cond.notify()
+        else:
+            self._count("duplicates")
+        return self.get(id)
+
+    def get(self, id, username=None):
+        """The job's public fields, or None if unknown (or not `username`'s)."""
+        row = self._connection().execute("SELECT * FROM grading_jobs WHERE id = ?", (id,)).fetchone()
+        if row is None or (username is not None and row["username"] != username):
+            return None
+        return self._public(row)
+
+    def wait(self, id, timeout, username=None):
+        """get(), after waiting up to `timeout` seconds for the job to finish."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(id, username)
+            left = deadline - time.monotonic()
+            if job is None or job["status"] in (DONE, FAILED) or left <= 0:
+                return job
+            with self._cond:
+                self._cond.wait(min(left, POLL_SECONDS))
+
+    # -- workers --
+
+    def start(self):
+        """Start the grading threads (once)."""
+        with self._lock:
+            if self._threads or self._stopping:
+                return
+            self._threads = [threading.Thread(target=self._run, name=f"grading-{i}", daemon=True)
+                             for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _claim(self):
+        """Mark the next due job running and return its row, or None."""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM grading_jobs WHERE (status = ? AND run_after <= ?) "
+                "OR (status = ? AND updated_at <= ?) ORDER BY run_after LIMIT 1",
+                (QUEUED, now, RUNNING, now - self.lease),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE grading_jobs SET status = ?, attempts = attempts + 1, updated_at = ? "
+                    "WHERE id = ?", (RUNNING, now, row["id"]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def _next_due(self):
+        row = self._connection().execute(
+            "SELECT MIN(run_after) FROM grading_jobs WHERE status = ?", (QUEUED,)
+        ).fetchone()
+        return row[0]
+
+    def _run(self):
+        while not self._stopping:
+            try:
+                row = self._claim()
+            except sqlite3.Error as e:
+                print("⚠️ Could not claim a grading job:", e)
+                row = None
+            if row is not None:
+                try:
+                    self._process(row)
+                except Exception as e:
+                    # Left running; claimed again once the lease runs out.
+                    print(f"⚠️ Grading job {row['id']} failed:", e)
+                continue
+            due = self._next_due()
+            idle = POLL_SECONDS if due is None else min(POLL_SECONDS, max(0.0, due - time.time()))
+            with self._cond:
+                if not self._stopping:
+                    self._cond.wait(idle)
+
+    def _finish(self, id, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        self._connection().execute(f"UPDATE grading_jobs SET {assignments} WHERE id = ?",
+                                   (*fields.values(), id))
+        with self._cond:
+            self._cond.notify_all()
+
+    @timed("grade_submission")
+    def _process(self, row):
+        questions, answers = json.loads(row["questions"]), json.loads(row["answers"])
+        attempts = row["attempts"] + 1
+        retry_at = time.time() + self.backoff * 2 ** (attempts - 1)
+        if row["score"] is not None:
+            # Graded before; only on_graded failed.
+            score, feedback, grader = row["score"], json.loads(row["feedback"] or "[]"), row["grader"]
+        else:
+            grader = getattr(self.grade, "name", "custom")
+            try:
+                if attempts > self.max_attempts:
+                    raise TimeoutError("the last attempt's lease ran out")
+                score, feedback = self.grade(row["module"], questions, answers)
+            except Exception as e:
+                if attempts < self.max_attempts:
+                    self._count("retried")
+                    self._finish(row["id"], status=QUEUED, error=str(e), run_after=retry_at)
+                    return
+                if self.fallback is None:
+                    self._count("failed")
+                    self._finish(row["id"], status=FAILED, error=str(e))
+                    return
+                print(f"⚠️ Grading {row['module']} failed {attempts} times, using keywords:", e)
+                self._count("fallbacks")
+                score, feedback = self.fallback(row["module"], questions, answers)
+                grader = getattr(self.fallback, "name", "fallback")
+        if self.on_graded is not None:
+            try:
+                self.on_graded(row["username"], row["module"], score)
+            except Exception as e:
+                print(f"⚠️ Could not record the grade of job {row['id']}:", e)
+                retry = attempts < self.max_attempts
+                self._count("retried" if retry else "failed")
+                self._finish(row["id"], status=QUEUED if retry else FAILED, score=score,
+                             feedback=json.dumps(feedback), grader=grader, error=str(e),
+                             run_after=retry_at)
+                return
+        self._count("graded")
+        self._finish(row["id"], status=DONE, score=score, feedback=json.dumps(feedback),
+                     grader=grader)
+
+    def size(self):
+        """{status: jobs}."""
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM grading_jobs GROUP BY status"
+        ).fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        if any(thread.is_alive() for thread in self._threads):
+            return      # a grade is still running; its job is re-run after the lease
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+def make_grading_queue(on_graded=None):
+    """The queue configured by the LMS_GRADING_* settings; workers not started."""
+    grader = os.environ.get("LMS_GRADER", "ai")
+    if grader not in ("ai", "keywords"):
+        raise ValueError(f"Unknown grader: {grader}")
+    queue = GradingQueue(
+        os.environ.get("LMS_GRADING_DB", "grading.db"),
+        ai_grader() if grader == "ai" else keyword_grader,
+        on_graded=on_graded,
+        workers=int(os.environ.get("LMS_GRADING_WORKERS", "2")),
+        max_attempts=int(os.environ.get("LMS_GRADING_ATTEMPTS", "3")),
+        backoff=float(os.environ.get("LMS_GRADING_BACKOFF", "2")),
+    )
+    REGISTRY.gauge("lms_grading_jobs", "Quiz grading jobs by status.",
+                   lambda: {(status,): n for status, n in queue.size().items()},
+                   ("status",), ttl=5)
+    return queue
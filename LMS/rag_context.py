@@ -0,0 +1,231 @@
+# rag_context.py
+# Course notes for the chat assistant. Module bodies are split into chunks
+# of about LMS_RAG_CHUNK_TOKENS tokens and indexed with BM25 (see
+# search_index.BM25Index). For a question asked on a module page the best
+# chunks, the current module's first, are packed into the prompt under
+# LMS_RAG_BUDGET tokens (0 sends the bare question, as before). The chunk
+# index is built by the first question that needs it. Prompts are cached
+# per (module, question hash) until the catalog changes.
+import heapq
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+
+from catalog import catalog
+from response_cache import normalize_prompt
+from search_index import TITLE_WEIGHT, BM25Index, digest, tokenize
+
+RAG_BUDGET = int(os.environ.get("LMS_RAG_BUDGET", "400"))
+CHUNK_TOKENS = int(os.environ.get("LMS_RAG_CHUNK_TOKENS", "120"))
+TOP_K = int(os.environ.get("LMS_RAG_TOP_K", "3"))
+CHARS_PER_TOKEN = 4         # rough average for English text and code
+CURRENT_MODULE_BOOST = 1.5
+RELATIVE_CUTOFF = 0.5       # other modules' chunks must score this share of the best
+# Question words that say nothing about the topic. Python keywords such as
+# "for", "in" or "not" are kept on purpose.
+STOPWORDS = frozenset(
+    "a an the is are was were be been do does did how what where when why which who "
+    "whom can could should would will i me my we you your it its this that these those "
+    "of to on at by about explain explained tell show please mean means".split()
+)
+
+PROMPT = (
+    "You are the tutor for the module \"{module}\". Answer the student's question "
+    "in a few short sentences, using the course notes below where they help.\n\n"
+    "Course notes:\n{context}\n\n"
+    "Question: {question}"
+)
+
+
+def estimate_tokens(text):
+    """Approximate model tokens in `text` (about CHARS_PER_TOKEN characters each)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def stem(term):
+    """Plural and -y endings folded: "dictionaries" and "dictionary" -> "dictionari"."""
+    if term.endswith("sses"):
+        return term[:-2]
+    if term.endswith("ies"):
+        return term[:-2]
+    if term.endswith("s") and not term.endswith("ss") and len(term) > 3:
+        term = term[:-1]
+    if term.endswith("y") and len(term) > 3:
+        return term[:-1] + "i"
+    return term
+
+
+def terms(text):
+    return [stem(t) for t in tokenize(text) if t not in STOPWORDS]
+
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS):
+    """
+    Split `text` into chunks of at most `max_tokens`: paragraphs are kept
+    together where they fit, longer ones are split by line.
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    pieces = []             # (separator before, text)
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        if len(paragraph) <= limit:
+            pieces.append(("\n\n", paragraph))
+            continue
+        sep = "\n\n"
+        for line in paragraph.splitlines():
+            while len(line) > limit:
+                pieces.append((sep, line[:limit]))
+                line, sep = line[limit:], "\n"
+            if line.strip():
+                pieces.append((sep, line))
+                sep = "\n"
+    chunks, current = [], ""
+    for sep, piece in pieces:
+        if current and len(current) + len(sep) + len(piece) > limit:
+            chunks.append(current)
+            current = piece
+        else:
+            current = current + sep + piece if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ContextAssembler:
+    """
+    BM25Index over (module, chunk number) documents, built on first use
+    and updated in place on catalog reloads like search_index.SearchIndex,
+    plus an LRU of assembled prompts.
+    """
+
+    def __init__(self, source=catalog, budget=RAG_BUDGET, chunk_tokens=CHUNK_TOKENS,
+                 top_k=TOP_K, cache_size=1024):
+        self.budget = budget
+        self.chunk_tokens = chunk_tokens
+        self.top_k = top_k
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._index = BM25Index()
+        self._chunks = {}       # (module, i) -> text
+        self._counts = {}       # module -> number of chunks
+        self._digests = {}
+        self._cache = OrderedDict()
+        self._generation = 0
+        self._built = False
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.source = source
+
+    def build(self):
+        """Chunk and index the current catalog unless that was done already; returns self."""
+        if not self._built:
+            with self._build_lock:
+                if not self._built:
+                    self.update(self.source.snapshot())
+                    self._built = True
+        return self
+
+    def on_reload(self, snapshot):
+        """Catalog listener: apply the change if the index has been built."""
+        with self._build_lock:
+            if self._built:
+                self.update(snapshot)
+
+    def update(self, snapshot):
+        """Re-chunk new or changed modules; returns (modules re-indexed, modules dropped)."""
+        changed = []
+        for module in snapshot.modules:
+            content = snapshot.content(module)
+            key = digest(module, content)
+            if self._digests.get(module) != key:
+                changed.append((module, key, chunk_text(content, self.chunk_tokens)))
+
+        with self._lock:
+            gone = [m for m in self._digests if m not in snapshot.modules]
+            for module in gone:
+                self._drop(module)
+                del self._digests[module]
+            for module, key, chunks in changed:
+                self._drop(module)
+                title = terms(module)
+                for i, text in enumerate(chunks):
+                    counts = Counter(terms(text))
+                    for term in title:
+                        counts[term] += TITLE_WEIGHT
+                    self._index.add((module, i), counts)
+                    self._chunks[(module, i)] = text
+                self._counts[module] = len(chunks)
+                self._digests[module] = key
+            self._index.commit()
+            if changed or gone:
+                self._cache.clear()
+                self._generation += 1
+        return len(changed), len(gone)
+
+    def _drop(self, module):
+        for i in range(self._counts.pop(module, 0)):
+            self._index.remove((module, i))
+            del self._chunks[(module, i)]
+
+    def context(self, question, module=None, budget=None):
+        """
+        [(module, text)] chunks for `question` within `budget` tokens: the
+        best matches first (the current module's boosted). A question that
+        matches nothing gets the current module's chunks in order.
+        """
+        budget = self.budget if budget is None else budget
+        self.build()
+        with self._lock:
+            scores = self._index.scores(terms(question))
+            own = [(module, i) for i in range(self._counts.get(module, 0))]
+            for doc in own:
+                if doc in scores:
+                    scores[doc] *= CURRENT_MODULE_BOOST
+            ranked = heapq.nlargest(4 * self.top_k, scores.items(), key=lambda item: item[1])
+            cutoff = ranked[0][1] * RELATIVE_CUTOFF if ranked else 0.0
+            candidates = [doc for doc, score in ranked if doc[0] == module or score >= cutoff]
+            if not candidates:
+                candidates = own
+            chunks = self._chunks
+
+            picked, used = [], 0
+            for doc in candidates:
+                cost = estimate_tokens(chunks[doc]) + estimate_tokens(doc[0]) + 1
+                if used + cost > budget:
+                    continue
+                picked.append(doc)
+                used += cost
+                if len(picked) == self.top_k:
+                    break
+            return [(doc[0], chunks[doc]) for doc in picked]
+
+    def prompt(self, question, module=None):
+        """The prompt sent to the model for `question` asked on `module`'s page."""
+        if not self.budget or not question.strip():
+            return question
+        key = (module, digest(normalize_prompt(question)))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+            generation = self._generation
+        chunks = self.context(question, module)
+        if chunks:
+            notes = "\n\n".join(f"[{name}]\n{text}" for name, text in chunks)
+            prompt = PROMPT.format(module=module or "this course", context=notes, question=question)
+        else:
+            prompt = question
+        with self._lock:
+            if generation == self._generation:
+                self._cache[key] = prompt
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return prompt
+
+
+context_assembler = ContextAssembler()
+catalog.on_reload(context_assembler.on_reload)
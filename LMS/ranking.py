@@ -0,0 +1,55 @@
+# ranking.py
+import numpy as np
+
+
+# -------------------------------
+# Embedding-based ranking of candidate modules
+# -------------------------------
+class ModuleRanker:
+    """
+    Ranks unlocked modules by cosine similarity to a user profile vector,
+    the mean embedding of the modules the user has completed.
+
+    The module x dim matrix is built once; rows follow `modules`, which
+    should be CurriculumGraph.order so frontier indices address rows
+    directly.
+    """
+
+    def __init__(self, modules, embeddings):
+        self.modules = list(modules)
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = np.ascontiguousarray(matrix / norms)
+
+    def profile(self, completed):
+        """Unit-length mean of the completed rows, or None if there are none."""
+        if len(completed) == 0:
+            return None
+        vector = self.matrix[np.asarray(completed, dtype=np.intp)].mean(axis=0)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def rank(self, candidates, completed, k=3):
+        """
+        Return the top-k [(module, score)] among candidate row indices.
+        Ties, and users without history (all scores 0), keep graph order.
+        """
+        if len(candidates) == 0 or k <= 0:
+            return []
+        candidates = np.asarray(candidates, dtype=np.intp)
+        profile = self.profile(completed)
+        if profile is None:
+            scores = np.zeros(len(candidates), dtype=np.float32)
+        else:
+            scores = self.matrix[candidates] @ profile
+        if k < len(candidates):
+            top = np.argpartition(-scores, k - 1)[:k]
+            # argpartition may cut inside a run of equal scores; widen to
+            # every candidate tied with the k-th best so graph order decides.
+            cutoff = scores[top].min()
+            top = np.flatnonzero(scores >= cutoff)
+        else:
+            top = np.arange(len(candidates))
+        order = top[np.lexsort((candidates[top], -scores[top]))][:k]
+        return [(self.modules[candidates[i]], float(scores[i])) for i in order]
@@ -0,0 +1,109 @@
+# response_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_prompt(prompt):
+    """Case- and whitespace-insensitive form of a prompt used as cache key."""
+    return " ".join(prompt.lower().split())
+
+
+class _Call:
+    """An upstream call in flight that other requests can wait on."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+# -------------------------------
+# LRU + TTL cache with single-flight
+# -------------------------------
+class ResponseCache:
+    """
+    Bounded cache of AI answers keyed on (model name, normalized prompt).
+
+    Only values returned by `compute` are stored; if it raises, nothing is
+    cached and every waiting caller sees the same exception, so callers keep
+    producing their fallback text themselves.
+    """
+
+    def __init__(self, maxsize=512, ttl=600, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._calls = {}                # key -> _Call
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def _store(self, key, value):
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, prompt, model_name):
+        """Return a cached answer or None."""
+        with self._lock:
+            return self._lookup((model_name, normalize_prompt(prompt)))
+
+    def put(self, prompt, model_name, value):
+        """Store an answer that was produced outside get_or_compute."""
+        with self._lock:
+            self._store((model_name, normalize_prompt(prompt)), value)
+
+    def get_or_compute(self, prompt, model_name, compute):
+        key = (model_name, normalize_prompt(prompt))
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                return value
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = compute()
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            with self._lock:
+                self._store(key, call.value)
+            return call.value
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,282 @@
+# search_index.py
+# Full-text search over module titles and bodies: an in-memory inverted
+# index ranked with BM25. Built from the catalog by the first search (or
+# build()) and then kept in step with it on every reload, re-indexing only
+# the modules whose title or text changed. The last word of a query also matches as a prefix, so
+# results can follow the user as they type.
+import hashlib
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+from catalog import catalog
+from metrics import timed
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 3        # a title word counts as this many body words
+PREFIX_WEIGHT = 0.8     # a prefix completion scores below the exact word
+MAX_EXPANSIONS = 50     # completions tried for one prefix (most common first),
+PREFIX_POSTINGS = 15000  # stopping once their postings add up to this many
+SNIPPET_CHARS = 160
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def digest(*parts):
+    return hashlib.blake2b("\0".join(parts).encode("utf-8"), digest_size=16).digest()
+
+
+def _snippet(content, terms):
+    """About SNIPPET_CHARS of `content` around the first matched term."""
+    lowered = content.lower()
+    found = [i for i in (lowered.find(t) for t in terms) if i >= 0]
+    start = max(0, min(found) - SNIPPET_CHARS // 4) if found else 0
+    text = " ".join(content[start:start + SNIPPET_CHARS].split())
+    return ("…" if start else "") + text + ("…" if start + SNIPPET_CHARS < len(content) else "")
+
+
+# -------------------------------
+# BM25 over any documents
+# -------------------------------
+class BM25Index:
+    """
+    term -> {doc: term frequency} for documents given as term Counters,
+    keyed by any hashable id, plus the sorted vocabulary for prefix
+    lookups. Call commit() after a batch of add()/remove() calls. Not
+    thread-safe; callers hold their own lock.
+    """
+
+    def __init__(self, k1=K1, b=B):
+        self.k1, self.b = k1, b
+        self.postings = {}
+        self.terms = []
+        self._docs = {}         # doc -> (Counter of terms, length)
+        self._norm = {}         # doc -> BM25 length normalisation
+        self._total_length = 0
+        self._new_terms = []
+        self._removed_terms = []
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, doc):
+        return doc in self._docs
+
+    def __iter__(self):
+        return iter(self._docs)
+
+    def counts(self, doc):
+        return self._docs[doc][0]
+
+    def add(self, doc, counts):
+        if doc in self._docs:
+            self.remove(doc)
+        for term, tf in counts.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self._new_terms.append(term)
+            postings[doc] = tf
+        length = sum(counts.values())
+        self._docs[doc] = (counts, length)
+        self._total_length += length
+        self._dirty = True
+
+    def remove(self, doc):
+        counts, length = self._docs.pop(doc)
+        for term in counts:
+            postings = self.postings[term]
+            del postings[doc]
+            if not postings:
+                del self.postings[term]
+                self._removed_terms.append(term)
+        self._total_length -= length
+        self._dirty = True
+
+    def commit(self):
+        """Patch the vocabulary and length norms after add()/remove()."""
+        if not self._dirty:
+            return
+        if len(self._new_terms) + len(self._removed_terms) > 256:
+            self.terms = sorted(self.postings)
+        else:
+            terms = self.terms
+            for term in self._removed_terms:
+                if term not in self.postings:
+                    i = bisect_left(terms, term)
+                    if i < len(terms) and terms[i] == term:
+                        del terms[i]
+            for term in self._new_terms:
+                i = bisect_left(terms, term)
+                if i == len(terms) or terms[i] != term:
+                    terms.insert(i, term)
+        self._new_terms, self._removed_terms = [], []
+        avgdl = self._total_length / len(self._docs) if self._docs else 1.0
+        k1, b = self.k1, self.b
+        self._norm = {d: k1 * (1 - b + b * length / avgdl) for d, (_, length) in self._docs.items()}
+        self._dirty = False
+
+    def expand(self, prefix):
+        """Indexed terms starting with `prefix`: itself first, then the most common."""
+        terms = self.terms
+        i = bisect_left(terms, prefix)
+        matches = []
+        while i < len(terms) and terms[i].startswith(prefix):
+            matches.append(terms[i])
+            i += 1
+        matches.sort(key=lambda t: (t != prefix, -len(self.postings[t])))
+        expansions, postings = [], 0
+        for term in matches[:MAX_EXPANSIONS]:
+            if expansions and postings + len(self.postings[term]) > PREFIX_POSTINGS:
+                break
+            expansions.append(term)
+            postings += len(self.postings[term])
+        return expansions
+
+    def scores(self, tokens, partial=False, matched=None):
+        """
+        {doc: BM25 score} for the query `tokens`. With `partial`, the last
+        token is a prefix (see expand()). Terms that matched are added to
+        the `matched` set if one is given.
+        """
+        n = len(self._docs)
+        k1 = self.k1
+        norm = self._norm
+        scores = {}
+        for i, token in enumerate(tokens):
+            if partial and i == len(tokens) - 1:
+                terms = self.expand(token)
+            else:
+                terms = [token] if token in self.postings else []
+            best = {}       # one score per doc for this query word
+            for term in terms:
+                postings = self.postings[term]
+                df = len(postings)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                if term != token:
+                    idf *= PREFIX_WEIGHT
+                for doc, tf in postings.items():
+                    score = idf * tf * (k1 + 1) / (tf + norm[doc])
+                    if score > best.get(doc, 0.0):
+                        best[doc] = score
+                if matched is not None:
+                    matched.add(term)
+            for doc, score in best.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+        return scores
+
+
+# -------------------------------
+# Module search
+# -------------------------------
+class SearchIndex:
+    """
+    BM25Index with one document per module, built on first use so module
+    bodies stay unread until somebody searches. update(snapshot) applies a
+    catalog change in place; search() and update() share a lock, so a
+    query never sees half an update.
+    """
+
+    def __init__(self, source=catalog, k1=K1, b=B, title_weight=TITLE_WEIGHT):
+        self.source = source
+        self.title_weight = title_weight
+        self._index = BM25Index(k1, b)
+        self._digests = {}
+        self._snapshot = None
+        self._module_courses = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.build()._index)
+
+    @property
+    def terms(self):
+        return self.build()._index.terms
+
+    def build(self):
+        """Index the current catalog unless that was done already; returns self."""
+        if self._snapshot is None:
+            with self._build_lock:
+                if self._snapshot is None:
+                    self.update(self.source.snapshot())
+        return self
+
+    def on_reload(self, snapshot):
+        """Catalog listener: apply the change if the index has been built."""
+        with self._build_lock:
+            if self._snapshot is not None:
+                self.update(snapshot)
+
+    def _terms_of(self, module, content):
+        counts = Counter(tokenize(content))
+        for term in tokenize(module):
+            counts[term] += self.title_weight
+        return counts
+
+    def update(self, snapshot):
+        """
+        Bring the index in line with `snapshot`, re-tokenizing only new or
+        changed modules. Returns (modules re-indexed, modules dropped).
+        """
+        changed = []
+        for module in snapshot.modules:
+            content = snapshot.content(module)
+            key = digest(module, content)
+            if self._digests.get(module) != key:
+                changed.append((module, key, self._terms_of(module, content)))
+        module_courses = {}
+        for course, modules in snapshot.courses.items():
+            for module in modules:
+                module_courses.setdefault(module, []).append(course)
+
+        with self._lock:
+            gone = [m for m in self._digests if m not in snapshot.modules]
+            for module in gone:
+                self._index.remove(module)
+                del self._digests[module]
+            for module, key, counts in changed:
+                self._index.add(module, counts)
+                self._digests[module] = key
+            self._index.commit()
+            self._snapshot = snapshot
+            self._module_courses = module_courses
+        return len(changed), len(gone)
+
+    @timed("search")
+    def search(self, query, limit=10, prefix=True):
+        """
+        [{"module", "courses", "score", "snippet"}] best first. With
+        `prefix`, the last word also matches longer words starting with it
+        (unless the query ends with a space, i.e. the word is finished).
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        self.build()
+        partial = prefix and not query[-1:].isspace()
+        matched = set()
+        with self._lock:
+            scores = self._index.scores(tokens, partial, matched)
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+            snapshot, module_courses = self._snapshot, self._module_courses
+            terms_by_doc = {m: [t for t in matched if t in self._index.counts(m)] for m, _ in top}
+
+        return [{
+            "module": module,
+            "courses": module_courses.get(module, []),
+            "score": round(score, 4),
+            "snippet": _snippet(snapshot.content(module), terms_by_doc[module]),
+        } for module, score in top]
+
+
+search_index = SearchIndex()
+catalog.on_reload(search_index.on_reload)
@@ -0,0 +1,24 @@
+const box = document.getElementById("search");
+const list = document.getElementById("search-results");
+let timer = null, latest = 0;
+box.addEventListener("input", () => {
+  clearTimeout(timer);
+  timer = setTimeout(async () => {
+    const query = box.value, seq = ++latest;
+    if (!query.trim()) { list.innerHTML = ""; return; }
+    const res = await fetch("/search?limit=8&q=" + encodeURIComponent(query));
+    if (!res.ok || seq !== latest) return;
+    const data = await res.json();
+    list.innerHTML = "";
+    for (const r of data.results) {
+      const a = document.createElement("a");
+      a.href = r.url || "#";
+      const title = document.createElement("strong");
+      title.textContent = r.module + (r.courses.length ? " · " + r.courses.join(", ") : "");
+      const text = document.createElement("small");
+      text.textContent = r.snippet;
+      a.append(title, text);
+      list.append(a);
+    }
+  }, 120);
+});
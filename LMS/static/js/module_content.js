@@ -0,0 +1,61 @@
+const chatHeader = document.getElementById('chat-header');
+const chatBox = document.getElementById('chat-box');
+const chatMessages = document.getElementById('chat-messages');
+const input = document.getElementById('chat-input');
+const sendBtn = document.getElementById('chat-send');
+
+// Toggle Chat
+chatHeader.onclick = () => {
+  chatBox.classList.toggle('show');
+};
+
+// Send Message
+sendBtn.onclick = async () => {
+  const question = input.value.trim();
+  if (!question) return;
+
+  const userMsg = document.createElement('div');
+  userMsg.className = 'chat-msg user';
+  userMsg.textContent = question;
+  chatMessages.appendChild(userMsg);
+  chatMessages.scrollTop = chatMessages.scrollHeight;
+  input.value = '';
+
+  const typing = document.createElement('div');
+  typing.className = 'chat-msg bot';
+  typing.textContent = '🤖 AI is typing...';
+  chatMessages.appendChild(typing);
+  chatMessages.scrollTop = chatMessages.scrollHeight;
+
+  // Stream the answer (Server-Sent Events) into the bot bubble as it arrives
+  try {
+    const res = await fetch('/ask_ai/stream', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ message: question, module: chatBox.dataset.module })
+    });
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let started = false;
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let sep;
+      while ((sep = buffer.indexOf('\n\n')) !== -1) {
+        const frame = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+        if (frame.startsWith('event: done')) continue;
+        const data = frame.split('\n').filter(l => l.startsWith('data: ')).map(l => l.slice(6)).join('\n');
+        if (!data) continue;
+        if (!started) { typing.textContent = ''; started = true; }
+        typing.textContent += JSON.parse(data).text;
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+      }
+    }
+  } catch (err) {
+    typing.textContent = "⚠️ Couldn't reach the assistant. Please try again.";
+  }
+  input.focus();
+};
@@ -0,0 +1,38 @@
+const ctx = document.getElementById('progressChart');
+const chart = new Chart(ctx, {
+  type: 'bar',
+  data: {
+    labels: [],
+    datasets: [{
+      label: 'Module Scores (%)',
+      data: [],
+      backgroundColor: 'rgba(255, 206, 86, 0.8)',
+      borderColor: 'rgba(255, 255, 255, 1)',
+      borderWidth: 2,
+      borderRadius: 10
+    }]
+  },
+  options: {
+    scales: {
+      y: { beginAtZero: true, max: 100 }
+    },
+    plugins: {
+      legend: { labels: { color: 'white' } }
+    }
+  }
+});
+
+fetch(ctx.dataset.src)
+  .then((res) => res.ok ? res.json() : Promise.reject(res.status))
+  .then((stats) => {
+    chart.data.labels = stats.modules.map((m) => m.module);
+    chart.data.datasets[0].data = stats.modules.map((m) => m.score);
+    chart.update();
+    const mean = stats.mean_score === null ? "no quizzes yet" : `average score ${stats.mean_score}%`;
+    document.getElementById('progress-summary').textContent =
+      `${stats.completed}/${stats.total} modules (${stats.percent_complete}%), ` +
+      `${stats.completed_hours}/${stats.total_hours} hours, ${mean}`;
+  })
+  .catch(() => {
+    document.getElementById('progress-summary').textContent = 'Could not load progress.';
+  });
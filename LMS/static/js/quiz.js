@@ -0,0 +1,56 @@
+const form = document.getElementById("quiz-form");
+const popup = document.getElementById("success-popup");
+const progressBar = document.getElementById("progress-bar");
+const inputs = document.querySelectorAll(".form-control");
+
+inputs.forEach((input, index) => {
+  input.addEventListener("input", () => {
+    const filled = Array.from(inputs).filter((inp) => inp.value.trim() !== "").length;
+    const progress = (filled / inputs.length) * 100;
+    progressBar.style.width = `${progress}%`;
+  });
+});
+
+// Answers are graded in the background: post them, then long-poll the
+// grading job for the score before moving on. Without fetch (or if the
+// post fails) the form is submitted normally and the score shows up later.
+async function waitForGrade(statusUrl) {
+  for (let i = 0; i < 6; i++) {
+    const res = await fetch(`${statusUrl}?wait=20`, { headers: { Accept: "application/json" } });
+    if (!res.ok) return null;
+    const job = await res.json();
+    if (job.status === "done" || job.status === "failed") return job;
+  }
+  return null;
+}
+
+form.addEventListener("submit", async (e) => {
+  if (!window.fetch) return;
+  e.preventDefault();
+  const button = form.querySelector("button[type=submit]");
+  button.disabled = true;
+  popup.textContent = "✅ Quiz submitted! Grading your answers…";
+  popup.style.display = "block";
+
+  let job;
+  try {
+    const res = await fetch(form.action || window.location.href, {
+      method: "POST",
+      body: new FormData(form),
+      headers: { Accept: "application/json" },
+    });
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    job = await res.json();
+  } catch (err) {
+    form.submit();
+    return;
+  }
+
+  const graded = await waitForGrade(job.status_url).catch(() => null);
+  if (graded && graded.status === "done") {
+    popup.textContent = `🎯 Your score: ${graded.score}/100`;
+  } else {
+    popup.textContent = "⏳ Still grading; your score will appear in the summary.";
+  }
+  setTimeout(() => (window.location.href = job.next_url), 2500);
+});
@@ -0,0 +1,31 @@
+const chatHeader = document.querySelector(".chat-header");
+const chatBody = document.getElementById("chat-body");
+const chatInputDiv = document.querySelector(".chat-input");
+const input = document.getElementById("user-input");
+
+chatHeader.onclick = () => {
+  chatBody.style.display = chatBody.style.display === "block" ? "none" : "block";
+  chatInputDiv.style.display = chatInputDiv.style.display === "flex" ? "none" : "flex";
+}
+
+function sendMessage() {
+  const message = input.value.trim();
+  if(!message) return;
+
+  const userMsg = document.createElement("div");
+  userMsg.className = "user-msg";
+  userMsg.textContent = message;
+  chatBody.appendChild(userMsg);
+  chatBody.scrollTop = chatBody.scrollHeight;
+  input.value = "";
+
+  const botMsg = document.createElement("div");
+  botMsg.className = "bot-msg";
+  botMsg.textContent = "🤖 Thinking... AI will answer your question soon!";
+  chatBody.appendChild(botMsg);
+  chatBody.scrollTop = chatBody.scrollHeight;
+
+  setTimeout(() => {
+    botMsg.textContent = "💡 Here's a helpful explanation related to your course content (mock response).";
+  }, 1000);
+}
@@ -1,18 +1,38 @@
 # ai_utils.py
-from openai import OpenAI
+import os
+
+from catalog import catalog
+from curriculum import CurriculumGraph
+from embedding_store import EmbeddingStore, HashingEmbedder, module_texts, openai_embedder
+from ranking import ModuleRanker
 
 # -----------------------------
-# 1️⃣ OpenAI Client Setup
+# 1️⃣ Embeddings (OpenAI client created on first use, see ai_providers.py)
+# Vectors are cached on disk by hash of (model, text); set
+# LMS_EMBEDDER=hashing to use the deterministic offline embedder.
 # -----------------------------
-client = OpenAI(api_key="YOUR_OPENAI_API_KEY")
+_embedding_store = None
+
+def embedding_store():
+    """Return the process-wide embedding store, opening it on first use."""
+    global _embedding_store
+    if _embedding_store is None:
+        if os.environ.get("LMS_EMBEDDER", "openai") == "hashing":
+            embedder = HashingEmbedder()
+        else:
+            embedder = openai_embedder("text-embedding-3-small")
+        _embedding_store = EmbeddingStore(
+            os.environ.get("LMS_EMBEDDINGS_DIR", "embeddings"), embedder
+        )
+    return _embedding_store
 
 def get_embedding(text):
     """Return the embedding vector for a piece of text."""
-    resp = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=text
-    )
-    return resp.data[0].embedding
+    return embedding_store().get(text).tolist()
+
+def get_embeddings(texts):
+    """Return embedding vectors for many texts (misses fetched in one batch)."""
+    return embedding_store().get_many(list(texts))
 
 # -----------------------------
 # 2️⃣ Directed Graph for Learning Pathways
@@ -29,6 +49,20 @@ graph = {
     "Transactions": []
 }
 
+curriculum = CurriculumGraph(graph)
+
+def embed_modules(modules=None):
+    """
+    Embed each module's title and course notes (its catalog body, where the
+    catalog has one) in a single batch; rows follow `modules`, by default
+    curriculum.order. Vectors are kept on disk, so later runs make no
+    remote calls unless a module's text changed.
+    """
+    modules = curriculum.order if modules is None else list(modules)
+    content = catalog.module_content
+    texts = module_texts({m: content.get(m, {}) for m in modules})
+    return embedding_store().get_many([texts[m] for m in modules])
+
 # -----------------------------
 # 3️⃣ Hash Table to Track Progress
 # -----------------------------
@@ -39,51 +73,51 @@ def mark_module_complete(username, module):
     if username not in user_progress:
         user_progress[username] = {}
     user_progress[username][module] = True
+    curriculum.record_completion(username, module)
 
 def get_completed_modules(username):
     """Return list of completed modules for a user."""
     return [m for m, done in user_progress.get(username, {}).items() if done]
 
 # -----------------------------
-# 4️⃣ Dynamic Programming / DFS for Optimal Path
+# 4️⃣ DFS for Optimal Path (iterative, no recursion limit)
 # -----------------------------
 def find_learning_path(start):
     """Find the optimal path from the given module."""
-    path = []
-    visited = set()
-
-    def dfs(module):
-        visited.add(module)
-        path.append(module)
-        for next_module in graph.get(module, []):
-            if next_module not in visited:
-                dfs(next_module)
-
-    dfs(start)
-    return path
+    return curriculum.learning_path(start)
 
 # -----------------------------
-# 5️⃣ AI Recommendation (Mock + Embedding-ready)
+# 5️⃣ AI Recommendation (first unlocked, or ranked by embeddings)
 # -----------------------------
-def get_recommendations(username):
+_ranker = None
+
+def module_ranker():
+    """Embed every module's text once and keep the module x dim matrix."""
+    global _ranker
+    if _ranker is None:
+        _ranker = ModuleRanker(curriculum.order, embed_modules())
+    return _ranker
+
+def get_recommendations(username, mode="first", k=3):
     """
     Recommend the next module based on user's completed modules.
-    (You can extend this to use embeddings for personalized ranking.)
+    mode="ranked" returns the top-k unlocked modules as [(module, score)],
+    scored against the mean embedding of the user's completed modules.
     """
-    completed = set(get_completed_modules(username))
-    for module in graph:
-        prerequisites = [m for m, nexts in graph.items() if module in nexts]
-        if all(p in completed for p in prerequisites) and module not in completed:
-            return f"✅ Next recommended module: {module}"
+    load_completed = lambda: get_completed_modules(username)
+    if mode == "ranked":
+        ready, completed = curriculum.ready_modules(username, load_completed=load_completed)
+        return module_ranker().rank(ready, completed, k)
+    module = curriculum.next_module(username, load_completed=load_completed)
+    if module:
+        return f"✅ Next recommended module: {module}"
     return "🎉 All modules completed!"
 
 # -----------------------------
-# 6️⃣ Optional: Knowledge Tree
+# 6️⃣ Optional: Knowledge Tree (memoized; shared subtrees built once)
 # -----------------------------
 def build_knowledge_tree():
-    roots = [node for node in graph if not any(node in children for children in graph.values())]
-    tree = {root: build_subtree(root) for root in roots}
-    return tree
+    return curriculum.knowledge_tree()
 
 def build_subtree(node):
-    return {child: build_subtree(child) for child in graph[node]}
+    return curriculum.subtree(node)
@@ -0,0 +1,10 @@
+# conftest.py
+# The LMS modules import each other by bare name (run from the LMS
+# directory), so the tests put that directory on the path the same way.
+import os
+import sys
+
+LMS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if LMS_DIR not in sys.path:
+    sys.path.insert(0, LMS_DIR)
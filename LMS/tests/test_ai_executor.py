@@ -0,0 +1,124 @@
+# test_ai_executor.py
+import threading
+
+import pytest
+
+from ai_executor import (AIExecutor, AITimeoutError, CircuitBreaker, CircuitOpenError,
+                         QueueFullError)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise RuntimeError("upstream error")
+
+
+def make_executor(**kwargs):
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    return AIExecutor(breaker=breaker, **kwargs), clock
+
+
+def test_call_returns_result_and_reraises_errors():
+    executor, _ = make_executor()
+    assert executor.call(lambda: "answer") == "answer"
+    with pytest.raises(RuntimeError):
+        executor.call(fail)
+    assert executor.stats()["successes"] == 1
+    assert executor.stats()["failures"] == 1
+
+
+def test_slow_call_times_out_and_counts_as_a_failure():
+    executor, _ = make_executor(timeout=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(AITimeoutError):
+            executor.call(lambda: release.wait(5))
+    finally:
+        release.set()
+    stats = executor.stats()
+    assert stats["timeouts"] == 1
+    assert stats["failures"] == 1
+    assert stats["consecutive_failures"] == 1
+
+
+def test_late_result_after_timeout_is_not_counted_twice():
+    executor, _ = make_executor(max_workers=1, timeout=0.05)
+    release = threading.Event()
+    with pytest.raises(AITimeoutError):
+        executor.call(lambda: release.wait(5))
+    release.set()
+    executor.call(lambda: None, timeout=5)       # runs after the slow call returned
+    stats = executor.stats()
+    assert (stats["failures"], stats["successes"]) == (1, 1)
+
+
+def test_breaker_opens_probes_half_open_and_closes():
+    executor, clock = make_executor()
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            executor.call(fail)
+    assert executor.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        executor.call(lambda: "not called")
+    assert executor.stats()["short_circuited"] == 1
+
+    clock.now = 30
+    release = threading.Event()
+    probe = executor.submit(lambda: release.wait(5) and "probe")
+    assert executor.breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):       # only one probe at a time
+        executor.call(lambda: "not called")
+    release.set()
+    assert probe.result(5) == "probe"
+    assert executor.breaker.state == CircuitBreaker.CLOSED
+    assert executor.call(lambda: "ok") == "ok"
+
+
+def test_failed_probe_reopens_the_breaker():
+    executor, clock = make_executor()
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            executor.call(fail)
+    clock.now = 30
+    with pytest.raises(RuntimeError):
+        executor.call(fail)
+    assert executor.breaker.state == CircuitBreaker.OPEN
+    assert executor.breaker.opened_at == 30
+    clock.now = 59
+    with pytest.raises(CircuitOpenError):
+        executor.call(lambda: "not called")
+
+
+def test_success_resets_consecutive_failures():
+    executor, _ = make_executor()
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            executor.call(fail)
+    executor.call(lambda: None)
+    with pytest.raises(RuntimeError):
+        executor.call(fail)
+    assert executor.breaker.state == CircuitBreaker.CLOSED
+    assert executor.breaker.failures == 1
+
+
+def test_full_queue_rejects_at_once():
+    executor, _ = make_executor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = executor.submit(lambda: release.wait(5))
+        waiting = executor.submit(lambda: "queued")
+        with pytest.raises(QueueFullError):
+            executor.submit(lambda: "rejected")
+        assert executor.stats()["rejected"] == 1
+    finally:
+        release.set()
+    assert running.result(5) is True
+    assert waiting.result(5) == "queued"
+    assert executor.call(lambda: "room again") == "room again"
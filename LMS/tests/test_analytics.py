@@ -0,0 +1,40 @@
+# test_analytics.py
+from analytics import CohortAnalytics, CompletionMatrix, course_report
+from curriculum import CurriculumGraph
+from progress_store import MemoryProgressStore
+
+
+def test_stuck_follows_graph_order_not_course_order():
+    # "b" and "c" both unlock after "a"; graph order puts "b" first, the
+    # course lists "c" first.
+    curriculum = CurriculumGraph({"a": ["b", "c"], "b": [], "c": []})
+    rows = [("ann", "a", "X"), ("bob", "a", "X"), ("bob", "c", "X"), ("cid", "a", "X"),
+            ("cid", "b", "X"), ("cid", "c", "X")]
+    matrix = CompletionMatrix.from_rows(curriculum.order, rows)
+    report = course_report(matrix, curriculum, "X", ["c", "a", "b"])
+
+    assert [m["module"] for m in report["modules"]] == ["c", "a", "b"]
+    stuck = {m["module"]: m["stuck"] for m in report["modules"]}
+    assert stuck == {"a": 0, "b": 2, "c": 0}
+    assert next_module_for(curriculum, rows, "ann") == "b"
+    assert report["bottleneck"] == "b"
+    assert (report["users"], report["finished"], report["blocked"]) == (3, 1, 0)
+
+
+def next_module_for(curriculum, rows, username):
+    completed = [m for u, m, _ in rows if u == username]
+    return curriculum.next_module(username, None, lambda: completed)
+
+
+def test_pending_completions_are_capped_and_rebuilt_from_the_store():
+    curriculum = CurriculumGraph({"a": ["b"], "b": []})
+    store = MemoryProgressStore()
+    analytics = CohortAnalytics(lambda: store, lambda: curriculum, {"X": ["a", "b"]},
+                                max_age=0, max_pending=10)
+    assert analytics.report("X")["users"] == 0
+    for i in range(25):
+        store.mark_complete(f"user{i}", "a", "X")
+        analytics.record(f"user{i}", "a")
+    assert len(analytics._pending) <= 10
+    report = analytics.report("X")
+    assert (report["users"], report["modules"][0]["completed"]) == (25, 25)
@@ -0,0 +1,89 @@
+# test_curriculum.py
+import random
+
+import pytest
+
+from curriculum import CurriculumGraph
+from progress_store import MemoryProgressStore
+
+
+def original_recommendation(graph, completed):
+    """get_recommendations before the curriculum index (O(V²) per call)."""
+    for module, next_modules in graph.items():
+        prerequisites = [m for m, deps in graph.items() if module in deps]
+        if all(p in completed for p in prerequisites) and module not in completed:
+            return module
+    return None
+
+
+def random_graph(rng, n):
+    """A DAG in shuffled dict order, with duplicate edges and a dangling one."""
+    names = [f"m{i}" for i in range(n)]
+    graph = {}
+    for i in rng.sample(range(n), n):
+        later = names[i + 1:]
+        graph[names[i]] = [rng.choice(later) for _ in range(rng.randint(0, 3))] if later else []
+    if n:
+        graph[names[0]].append("not-in-graph")
+    return graph
+
+
+COURSES = (None, "A", "B")
+
+
+def check_run(seed, n, steps, refresh_share):
+    rng = random.Random(seed)
+    graph = random_graph(rng, n)
+    curriculum = CurriculumGraph(graph)
+    store = MemoryProgressStore()
+    users = ["ann", "bob"]
+    candidates = list(graph) + ["not-in-graph", "unknown"]
+
+    def check(username, course):
+        load = lambda: store.completed(username, course)
+        expected = original_recommendation(graph, set(load()))
+        if not refresh_share:
+            assert curriculum.next_module(username, course, load) == expected
+        assert curriculum.next_module(username, course, load, refresh=True) == expected
+
+    for _ in range(steps):
+        username, course = rng.choice(users), rng.choice(COURSES)
+        module = rng.choice(candidates)
+        store.mark_complete(username, module, course)
+        # Completions the frontier is not told about are only seen via refresh.
+        if rng.random() >= refresh_share:
+            curriculum.record_completion(username, module, course)
+        for course in COURSES:
+            check(username, course)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_next_module_matches_original_scan(seed):
+    check_run(seed, n=random.Random(seed).randint(0, 25), steps=30, refresh_share=0.0)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_refresh_folds_in_completions_recorded_elsewhere(seed):
+    check_run(seed, n=random.Random(seed).randint(1, 25), steps=30, refresh_share=0.5)
+
+
+def test_cold_frontier_is_seeded_from_store():
+    graph = {"a": ["b", "c"], "b": ["d"], "c": ["d"], "d": []}
+    store = MemoryProgressStore()
+    for module in ("a", "c"):
+        store.mark_complete("ann", module, "X")
+    curriculum = CurriculumGraph(graph)
+    assert curriculum.next_module("ann", "X", lambda: store.completed("ann", "X")) == "b"
+    assert curriculum.next_module("ann", "Y", lambda: store.completed("ann", "Y")) == "a"
+    curriculum.forget("ann")
+    store.mark_complete("ann", "b", "X")
+    assert curriculum.next_module("ann", "X", lambda: store.completed("ann", "X")) == "d"
+
+
+def test_course_completion_updates_the_all_courses_frontier():
+    graph = {"a": ["b"], "b": []}
+    curriculum = CurriculumGraph(graph)
+    assert curriculum.next_module("ann", None, lambda: []) == "a"
+    curriculum.record_completion("ann", "a", "X")
+    assert curriculum.next_module("ann", None) == "b"
+    assert curriculum.next_module("ann", "Y", lambda: []) == "a"
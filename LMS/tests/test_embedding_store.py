@@ -0,0 +1,23 @@
+# test_embedding_store.py
+import os
+
+from embedding_store import EmbeddingStore, HashingEmbedder
+
+
+def test_models_of_different_size_share_a_directory(tmp_path):
+    wide = EmbeddingStore(str(tmp_path), HashingEmbedder(dim=256))
+    assert wide.get_many(["loops", "variables"]).shape == (2, 256)
+    narrow = EmbeddingStore(str(tmp_path), HashingEmbedder(dim=64))
+    assert narrow.get_many(["loops", "functions"]).shape == (2, 64)
+    reopened = EmbeddingStore(str(tmp_path), HashingEmbedder(dim=256))
+    assert reopened.get_many(["loops", "variables"]).shape == (2, 256)
+    assert reopened.remote_calls == 0
+
+
+def test_missing_vectors_start_the_store_afresh(tmp_path):
+    store = EmbeddingStore(str(tmp_path), HashingEmbedder(dim=32))
+    store.get("loops")
+    os.remove(os.path.join(store.directory, "vectors.f32"))
+    store = EmbeddingStore(str(tmp_path), HashingEmbedder(dim=32))
+    assert len(store) == 0
+    assert store.get_many(["loops"]).shape == (1, 32)
@@ -0,0 +1,47 @@
+# test_event_journal.py
+import os
+
+from event_journal import EventJournal, read_events, segment_name, segments
+
+
+def test_writers_sharing_a_directory_never_write_behind_a_reader(tmp_path):
+    directory = str(tmp_path)
+    first = EventJournal(directory, segment_bytes=300, fsync=False)
+    second = EventJournal(directory, segment_bytes=300, fsync=False)
+    sealed = {}
+    for i in range(60):
+        journal = first if i % 3 else second
+        journal.append("view", user=f"u{i}", n=i)
+        journal.flush()
+        names = segments(directory)
+        for number, path in names[:-1]:
+            size = os.path.getsize(path)
+            # A segment with a successor is finished: nothing lands there later.
+            assert sealed.setdefault(number, size) == size
+    first.close()
+    second.close()
+    assert len(segments(directory)) > 3
+    assert sorted(e["n"] for e, _ in read_events(directory)) == list(range(60))
+
+
+def test_half_line_from_a_crashed_writer_is_cut(tmp_path):
+    directory = str(tmp_path)
+    with open(os.path.join(directory, segment_name(1)), "wb") as f:
+        f.write(b'{"type":"view","n":0}\n{"type":"vi')
+    journal = EventJournal(directory, fsync=False)
+    journal.append("view", n=1)
+    journal.close()
+    assert [e["n"] for e, _ in read_events(directory)] == [0, 1]
+
+
+def test_events_that_could_not_be_written_are_not_counted_as_written(tmp_path):
+    journal = EventJournal(str(tmp_path), fsync=False)
+    journal.append("view", n=0)
+    assert journal.flush()
+    journal._file.close()               # every later write fails
+    journal.append("view", n=1)
+    journal.append("view", n=2)
+    assert journal.flush() is False
+    stats = journal.stats()
+    assert (stats["written"], stats["failed"], stats["pending"]) == (1, 2, 0)
+    journal.close()
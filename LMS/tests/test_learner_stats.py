@@ -0,0 +1,112 @@
+# test_learner_stats.py
+import pytest
+
+from learner_stats import CourseLayout, LearnerStats
+from progress_store import CompactProgressStore, MemoryProgressStore, SQLiteProgressStore
+
+
+class Snapshot:
+    version = "v1"
+    courses = {"Basics": ["Variables", "Loops", "Functions"], "Other": ["Loops"]}
+    modules = {"Variables": {"hours": 2}, "Loops": {"hours": 3}, "Functions": {"hours": 4}}
+
+
+class Source:
+    def snapshot(self):
+        return Snapshot
+
+
+@pytest.fixture(params=["memory", "compact", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryProgressStore()
+    elif request.param == "compact":
+        store = CompactProgressStore(list(Snapshot.modules))
+    else:
+        store = SQLiteProgressStore(str(tmp_path / "progress.db"))
+    yield store
+    store.close()
+
+
+def test_summary_is_read_from_the_store(store):
+    stats = LearnerStats(Source(), lambda: store)
+    assert store.mark_complete("ann", "Variables", "Basics") is True
+    assert store.mark_complete("ann", "Variables", "Basics") is False
+    store.mark_many([("ann", "Loops", "Other"), ("bob", "Functions", "Basics")])
+    store.set_score("ann", "Loops", 60)
+    store.set_score("ann", "Loops", 90)
+    store.set_score("ann", "Variables", 70)
+
+    summary = stats.course_summary("ann", "Basics")
+    assert (summary["completed"], summary["total"], summary["percent_complete"]) == (2, 3, 66.7)
+    assert (summary["completed_hours"], summary["total_hours"]) == (5, 9)
+    assert summary["mean_score"] == 80.0
+    assert [row["score"] for row in summary["modules"]] == [70, 90, None]
+    assert stats.scores("ann", "Basics") == {"Variables": 70, "Loops": 90, "Functions": None}
+    assert stats.course_summary("ann", "Missing") is None
+    assert stats.course_summary("carl", "Basics")["completed"] == 0
+
+
+def test_sqlite_summaries_survive_restarts_and_are_shared(tmp_path):
+    path = str(tmp_path / "progress.db")
+    first = SQLiteProgressStore(path)
+    first.mark_complete("ann", "Loops", "Basics")
+    first.set_score("ann", "Loops", 75)
+    first.close()
+
+    worker_a, worker_b = SQLiteProgressStore(path), SQLiteProgressStore(path)
+    try:
+        summary = LearnerStats(Source(), lambda: worker_a).course_summary("ann", "Basics")
+        assert (summary["completed"], summary["mean_score"]) == (1, 75.0)
+        assert summary["modules"][1]["completed_at"] is not None
+        worker_b.mark_complete("ann", "Functions", "Basics")
+        worker_b.flush()
+        assert LearnerStats(Source(), lambda: worker_a).course_summary("ann", "Basics")["completed"] == 2
+    finally:
+        worker_a.close()
+        worker_b.close()
+
+
+def test_running_totals_match_a_rebuild(store):
+    stats = LearnerStats(Source(), lambda: store)
+    stats.attach()
+    store.mark_complete("ann", "Loops", None)
+    store.mark_complete("ann", "Loops", "Other")        # same module again: counted once
+    store.mark_many([("ann", "Functions", "Basics"), ("bob", "Loops", "Other")])
+    store.set_score("ann", "Loops", 50)
+    store.set_score("ann", "Loops", 100)
+    store.set_score("bob", "Variables", 40)
+    store.flush()
+    counted = {(u, c): store.course_totals(u, c) for u in ("ann", "bob") for c in Snapshot.courses}
+
+    class Renamed(Snapshot):
+        version = "v2"
+        courses = {"Basics": ["Variables", "Loops"], "Other": ["Loops", "Functions"]}
+
+    store.track_courses(CourseLayout(Renamed))
+    store.track_courses(CourseLayout(Snapshot))         # rebuilt from the stored rows
+    assert {(u, c): store.course_totals(u, c) for u in ("ann", "bob") for c in Snapshot.courses} == counted
+    assert counted[("ann", "Basics")] == {"completed": 2, "hours": 7, "score_sum": 100, "scored": 1}
+    assert counted[("bob", "Other")] == {"completed": 1, "hours": 3, "score_sum": 0, "scored": 0}
+
+
+def test_sqlite_workers_keep_one_set_of_totals(tmp_path):
+    path = str(tmp_path / "progress.db")
+    worker_a, worker_b = SQLiteProgressStore(path), SQLiteProgressStore(path)
+    try:
+        stats_a = LearnerStats(Source(), lambda: worker_a)
+        stats_b = LearnerStats(Source(), lambda: worker_b)
+        stats_a.attach()
+        stats_b.attach()
+        worker_a.mark_complete("ann", "Loops", "Basics")
+        worker_b.mark_complete("ann", "Loops", "Other")
+        worker_b.mark_complete("ann", "Variables", "Basics")
+        worker_a.set_score("ann", "Variables", 80)
+        worker_a.flush()
+        worker_b.flush()
+        for stats in (stats_a, stats_b):
+            summary = stats.course_summary("ann", "Basics")
+            assert (summary["completed"], summary["completed_hours"], summary["mean_score"]) == (2, 5, 80.0)
+    finally:
+        worker_a.close()
+        worker_b.close()
@@ -0,0 +1,55 @@
+# test_page_cache.py
+from flask import Flask
+
+from page_cache import PageCache
+
+
+def make_app(cache):
+    app = Flask(__name__)
+    renders = []
+
+    @app.route("/course/<name>")
+    def course(name):
+        def render():
+            renders.append(name)
+            return f"<h1>{name}</h1>"
+        return cache.page(("modules.html", name), render)
+
+    return app, renders
+
+
+def test_fragments_are_bounded_by_lru():
+    cache = PageCache(lambda: "v1", maxsize=4)
+    app, renders = make_app(cache)
+    client = app.test_client()
+    client.get("/course/keep")
+    for i in range(50):
+        client.get(f"/course/junk{i}")
+        client.get("/course/keep")          # recently used, so never evicted
+    assert len(cache) == 4
+    assert renders.count("keep") == 1
+
+
+def test_responses_are_private_and_conditional():
+    cache = PageCache(lambda: "v1")
+    app, renders = make_app(cache)
+    client = app.test_client()
+    first = client.get("/course/a")
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    again = client.get("/course/a", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.headers["Cache-Control"] == "private, no-cache"
+    assert renders == ["a"]
+
+
+def test_new_catalog_version_drops_fragments():
+    version = ["v1"]
+    cache = PageCache(lambda: version[0])
+    app, renders = make_app(cache)
+    client = app.test_client()
+    etag = client.get("/course/a").headers["ETag"]
+    version[0] = "v2"
+    response = client.get("/course/a", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert renders == ["a", "a"]
+    assert len(cache) == 1
@@ -0,0 +1,132 @@
+# test_quiz_grading.py
+import pytest
+
+from quiz_grading import DONE, FAILED, QUEUED, RUNNING, GradingQueue, job_id
+
+
+class Grader:
+    """Fails the first `failures` calls, then scores every answer 80."""
+
+    name = "fake"
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, module, questions, answers):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("upstream error")
+        return 80, ["ok"] * len(answers)
+
+
+def fallback(module, questions, answers):
+    return 10, []
+
+
+fallback.name = "keywords"
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(grade, **kwargs):
+        kwargs.setdefault("workers", 1)
+        kwargs.setdefault("backoff", 0.01)
+        queue = GradingQueue(str(tmp_path / "grading.db"), grade, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def submit(queue, key="submission-0001"):
+    return queue.submit("ann", "Basics", "Loops", ["What is a loop?"], ["repetition"], key=key)
+
+
+def test_graded_job_hands_the_score_over(make_queue):
+    graded = []
+    queue = make_queue(Grader(), on_graded=lambda *args: graded.append(args))
+    job = submit(queue)
+    queue.start()
+    job = queue.wait(job["id"], 5)
+    assert (job["status"], job["score"], job["grader"], job["attempts"]) == (DONE, 80, "fake", 1)
+    assert graded == [("ann", "Loops", 80)]
+
+
+def test_failed_grades_are_retried_with_backoff(make_queue):
+    grade = Grader(failures=2)
+    queue = make_queue(grade, max_attempts=3)
+    job = submit(queue)
+    queue.start()
+    job = queue.wait(job["id"], 5)
+    assert (job["status"], job["score"], job["attempts"]) == (DONE, 80, 3)
+    assert grade.calls == 3
+    assert queue.counts["retried"] == 2
+    # Waits of 0.01 then 0.02 seconds between the three attempts.
+    assert job["updated_at"] - job["created_at"] >= 0.03
+
+
+def test_keyword_fallback_after_the_last_attempt(make_queue):
+    grade = Grader(failures=99)
+    queue = make_queue(grade, fallback=fallback, max_attempts=2)
+    job = submit(queue)
+    queue.start()
+    job = queue.wait(job["id"], 5)
+    assert (job["status"], job["score"], job["grader"]) == (DONE, 10, "keywords")
+    assert grade.calls == 2
+    assert queue.counts["fallbacks"] == 1
+
+
+def test_resubmitted_form_finds_its_first_job(make_queue):
+    queue = make_queue(Grader())
+    first = submit(queue)
+    again = submit(queue)
+    assert first["id"] == again["id"] == job_id("ann", "submission-0001")
+    assert queue.size() == {QUEUED: 1}
+    assert queue.counts["duplicates"] == 1
+    assert queue.get(first["id"], username="bob") is None
+
+
+def test_job_left_running_is_reclaimed_after_its_lease(make_queue):
+    grade = Grader()
+    queue = make_queue(grade, lease=0, max_attempts=3)
+    job = submit(queue)
+    assert queue._claim()["id"] == job["id"]      # a worker that then died
+    assert queue.get(job["id"])["status"] == RUNNING
+    queue._process(queue._claim())
+    job = queue.get(job["id"])
+    assert (job["status"], job["attempts"]) == (DONE, 2)
+    assert grade.calls == 1
+
+
+def test_lease_running_out_on_the_last_attempt_uses_the_fallback(make_queue):
+    grade = Grader()
+    queue = make_queue(grade, fallback=fallback, lease=0, max_attempts=2)
+    job = submit(queue)
+    queue._claim()
+    queue._claim()
+    queue._process(queue._claim())
+    job = queue.get(job["id"])
+    assert (job["status"], job["grader"], job["attempts"]) == (DONE, "keywords", 3)
+    assert grade.calls == 0
+
+
+def test_on_graded_errors_retry_only_the_handover(make_queue):
+    grade = Grader()
+    calls = []
+
+    def on_graded(username, module, score):
+        calls.append(score)
+        raise OSError("disk full")
+
+    queue = make_queue(grade, on_graded=on_graded, max_attempts=3)
+    job = submit(queue)
+    queue.start()
+    job = queue.wait(job["id"], 5)
+    assert (job["status"], job["score"], job["attempts"]) == (FAILED, 80, 3)
+    assert calls == [80, 80, 80]
+    assert grade.calls == 1
@@ -0,0 +1,14 @@
+# test_ranking.py
+from ranking import ModuleRanker
+
+
+def test_rank_orders_by_similarity_and_keeps_graph_order_on_ties():
+    ranker = ModuleRanker(["a", "b", "c", "d"], [[1, 0], [1, 0.1], [0, 1], [0, 1]])
+    assert [m for m, _ in ranker.rank([1, 2, 3], [0], k=2)] == ["b", "c"]
+    assert [m for m, _ in ranker.rank([3, 2], [], k=2)] == ["c", "d"]
+
+
+def test_rank_with_no_room_returns_nothing():
+    ranker = ModuleRanker(["a", "b"], [[1, 0], [0, 1]])
+    assert ranker.rank([0, 1], [0], k=0) == []
+    assert ranker.rank([0, 1], [0], k=-1) == []
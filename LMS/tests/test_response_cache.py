@@ -0,0 +1,113 @@
+# test_response_cache.py
+import threading
+import time
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_single_flight_makes_one_call_for_concurrent_misses():
+    cache = ResponseCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        cache.get_or_compute("What is a loop?", "model", compute))) for _ in range(8)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Every follower has missed and is waiting on the leader's call.
+    deadline = time.monotonic() + 5
+    while cache.stats()["misses"] < 8 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert calls == [1]
+    assert results == ["answer"] * 8
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = ResponseCache()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def ask():
+        try:
+            cache.get_or_compute("q", "model", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=ask)
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=ask)
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert errors == ["upstream down"] * 2
+    assert cache.get("q", "model") is None
+    assert cache.get_or_compute("q", "model", lambda: "recovered") == "recovered"
+
+
+def test_prompts_are_normalized_and_keyed_by_model():
+    cache = ResponseCache()
+    cache.put("What  is a LOOP?", "a", "answer a")
+    assert cache.get("what is a loop?", "a") == "answer a"
+    assert cache.get("what is a loop?", "b") is None
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, clock=clock)
+    cache.put("q", "model", "old")
+    clock.now = 9.9
+    assert cache.get("q", "model") == "old"
+    clock.now = 10.0
+    assert cache.get("q", "model") is None
+    assert cache.get_or_compute("q", "model", lambda: "new") == "new"
+    assert cache.stats()["size"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(maxsize=2)
+    cache.put("a", "model", "A")
+    cache.put("b", "model", "B")
+    assert cache.get("a", "model") == "A"       # "b" is now the oldest
+    cache.put("c", "model", "C")
+    assert cache.get("b", "model") is None
+    assert cache.get("a", "model") == "A"
+    assert cache.get("c", "model") == "C"
+    assert cache.stats() == {"hits": 3, "misses": 1, "size": 2}
+
+
+@pytest.mark.parametrize("maxsize", [1, 3])
+def test_size_never_exceeds_maxsize(maxsize):
+    cache = ResponseCache(maxsize=maxsize)
+    for i in range(10):
+        cache.get_or_compute(f"q{i}", "model", lambda: "x")
+    assert cache.stats()["size"] == maxsize